@@ -0,0 +1,182 @@
+# scripts/batch_generate.py
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.story_generator import generate_story, save_story
+from src.frame_generator import generate_frames
+from src.utils import create_movie_directory, log_progress, error_exit
+from src.llm_config import create_llm_client, get_completion_model
+from src.llm_cache import configure_completion_cache
+from src.rate_limit import configure_rate_limiter
+from src.telemetry import TELEMETRY_FILE, configure_telemetry, call_tags
+from src.movie_pack import PACK_EXTENSION
+from src.job_queue import JobQueue
+
+# Generation options a JSONL job may set for itself, overriding the command line
+JOB_OPTIONS = ('keyframe_interval', 'batch_size', 'context', 'stream', 'pack', 'normalize', 'hold_threshold', 'stall_stop')
+
+def load_jobs(path):
+    """
+    Read jobs from a topics file (one topic per line, # for comments) or a JSONL file
+    whose objects have a "topic" (or "title") and optionally an "id" (or "request_id").
+
+    :return: List of (key, topic, options) tuples
+    """
+    name = os.path.basename(path)
+    jobs = []
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if path.endswith('.jsonl'):
+                entry = json.loads(line)
+                topic = entry.get('topic') or entry.get('title')
+                if not topic:
+                    error_exit(f"{name}:{line_number} has no topic or title")
+                key = str(entry.get('id') or entry.get('request_id') or f"{name}:{line_number}")
+                jobs.append((key, topic, {option: entry[option] for option in JOB_OPTIONS if option in entry}))
+            else:
+                jobs.append((f"{name}:{line_number}", line, {}))
+    return jobs
+
+def run_job(job, client, provider, data_dir, work_dir, queue, options):
+    model = get_completion_model(provider)
+    options = {**options, **job['options']}
+    pack = options.pop('pack', False)
+
+    story_file = os.path.join(job['movie_dir'], 'story.json') if job['movie_dir'] else None
+    if story_file and os.path.isfile(story_file):
+        # An earlier attempt got as far as the story: keep it and resume its frames
+        movie_dir = job['movie_dir']
+        with open(story_file, 'r') as f:
+            story_data = json.load(f)
+        resume = True
+    else:
+        job_dir = os.path.join(work_dir, f"job_{job['id']:05d}")
+        os.makedirs(job_dir, exist_ok=True)
+        story_data = generate_story(job_dir, client=client, model=model, provider=provider, topic=job['topic'])
+        movie_dir = create_movie_directory(data_dir, story_data['title'], unique=True)
+        save_story(story_data, movie_dir)
+        queue.set_movie(job['id'], movie_dir)
+        resume = False
+
+    pack_path = movie_dir + PACK_EXTENSION if pack else None
+    generate_frames(story_data, movie_dir, client=client, model=model, provider=provider, resume=resume, pack_path=pack_path, **options)
+    return movie_dir
+
+def worker(queue, client, provider, data_dir, work_dir, options, max_attempts):
+    # Each worker takes jobs until the queue has none pending
+    while True:
+        job = queue.claim()
+        if job is None:
+            return
+        log_progress(f"Job {job['id']} started (attempt {job['attempts']}/{max_attempts}): {job['topic']}")
+        try:
+            with call_tags(job=job['id']):
+                movie_dir = run_job(job, client, provider, data_dir, work_dir, queue, options)
+            queue.complete(job['id'])
+            log_progress(f"Job {job['id']} done: {movie_dir}")
+        except (Exception, SystemExit) as e:
+            # error_exit raises SystemExit after printing the reason
+            error = f"exited with status {e.code}" if isinstance(e, SystemExit) else str(e)
+            status = queue.fail(job['id'], error, max_attempts)
+            log_progress(f"Job {job['id']} failed ({error}), {'requeued' if status == 'pending' else 'giving up'}")
+
+def print_status(queue):
+    counts = queue.counts()
+    print(", ".join(f"{count} {status}" for status, count in counts.items()))
+    for job in queue.list_jobs():
+        detail = job['movie_dir'] or job['error'] or ''
+        print(f"{job['id']:>5}  {job['status']:<8} {job['attempts']:>2}  {job['topic'][:50]:<50}  {detail}")
+
+def main(inputs=(), queue_path=None, provider='ollama', workers=2, scene_workers=1, max_attempts=3, run=True, show_status=False,
+         retry_failed=False, cache_dir=None, rpm=None, tpm=None, **options):
+    data_dir = os.path.join(project_root, 'data', 'movies')
+    queue_path = queue_path or os.path.join(project_root, 'data', 'batch', 'queue.sqlite3')
+    work_dir = os.path.dirname(os.path.abspath(queue_path))
+    os.makedirs(work_dir, exist_ok=True)
+    queue = JobQueue(queue_path)
+
+    for path in inputs:
+        jobs = load_jobs(path)
+        added = sum(queue.add(key, topic, job_options) for key, topic, job_options in jobs)
+        log_progress(f"Queued {added} new jobs from {path} ({len(jobs) - added} already queued)")
+    if retry_failed:
+        log_progress(f"Requeued {queue.retry_failed()} failed jobs")
+    if show_status:
+        print_status(queue)
+        return
+    if not run:
+        return
+
+    recovered = queue.recover()
+    if recovered:
+        log_progress(f"Recovered {recovered} jobs interrupted by an earlier run")
+    if cache_dir:
+        configure_completion_cache(cache_dir)
+    if rpm is not None or tpm is not None:
+        configure_rate_limiter(provider, rpm, tpm)
+    telemetry = configure_telemetry()
+    telemetry.open(os.path.join(work_dir, TELEMETRY_FILE))
+
+    # One client and one rate limiter are shared by every worker, so the pool as a whole
+    # stays under the provider's limits
+    client = create_llm_client(provider)
+    options = {'workers': scene_workers, **options}
+    log_progress(f"Running {queue.counts()['pending']} pending jobs with {workers} workers, provider {provider}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker, queue, client, provider, data_dir, work_dir, options, max_attempts) for _ in range(workers)]
+        for future in futures:
+            future.result()
+
+    summary = telemetry.summary()
+    telemetry.close()
+    counts = queue.counts()
+    log_progress(f"Batch finished: {counts['done']} done, {counts['failed']} failed, {counts['pending']} pending")
+    log_progress(f"LLM calls: {summary['calls']} ({summary['errors']} failed, {summary['retries']} retries), p50 {summary['latency_p50_ms']:.0f} ms, p99 {summary['latency_p99_ms']:.0f} ms, {summary['prompt_tokens'] + summary['completion_tokens']} tokens")
+    log_progress(f"Per-call telemetry, tagged by job: {telemetry.path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queue and generate many ASCII movies with a pool of workers")
+    parser.add_argument("inputs", nargs="*", help="Topics files (one topic per line) or JSONL files to add to the queue")
+    parser.add_argument("--queue", help="Job queue database (default: data/batch/queue.sqlite3)")
+    parser.add_argument("--provider", choices=['ollama', 'openai', 'anthropic', 'mock'], default='ollama', help="LLM provider (default: ollama)")
+    parser.add_argument("--workers", type=int, default=2, help="Movies generated concurrently (default: 2)")
+    parser.add_argument("--scene-workers", type=int, default=1, help="Scenes generated concurrently within each movie (default: 1)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per job before it is marked failed (default: 3)")
+    parser.add_argument("--keyframe-interval", type=int, default=1, help="Interpolate between every Nth frame (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Frames requested per LLM call (default: 1)")
+    parser.add_argument("--context", choices=['full', 'rle'], default='full', help="Previous-frame context in frame prompts (default: full)")
+    parser.add_argument("--stream", action="store_true", help="Stream frames with early validation and abort")
+    parser.add_argument("--pack", action="store_true", help="Also write each movie as a .asciimov pack")
+    parser.add_argument("--normalize", action="store_true", help="Pad or crop frames to the exact frame size and regenerate malformed ones")
+    parser.add_argument("--hold-threshold", type=float, default=-1, help="With --normalize, fold frames changing at most this fraction of cells into holds (e.g. 0.005; default: keep every frame)")
+    parser.add_argument("--stall-stop", type=int, default=0, help="Stop a scene after this many unchanged frames in a row (default: 0, never)")
+    parser.add_argument("--cache-dir", help="Cache LLM completions on disk in this directory")
+    parser.add_argument("--rpm", type=int, help="Client-side limit on LLM requests per minute across all workers (default: $<PROVIDER>_RPM, unlimited if unset)")
+    parser.add_argument("--tpm", type=int, help="Client-side limit on LLM tokens per minute across all workers (default: $<PROVIDER>_TPM, unlimited if unset)")
+    parser.add_argument("--status", action="store_true", help="Show the queue and exit")
+    parser.add_argument("--retry-failed", action="store_true", help="Requeue jobs that used up their attempts")
+    parser.add_argument("--no-run", action="store_true", help="Only add the inputs to the queue")
+    args = parser.parse_args()
+    if args.batch_size > 1 and args.keyframe_interval > 1:
+        parser.error("--batch-size and --keyframe-interval cannot be combined")
+    if args.hold_threshold >= 0 and not args.normalize:
+        parser.error("--hold-threshold needs --normalize")
+    if args.stall_stop and args.hold_threshold < 0:
+        parser.error("--stall-stop needs --hold-threshold")
+
+    main(args.inputs, queue_path=args.queue, provider=args.provider, workers=args.workers, scene_workers=args.scene_workers,
+         max_attempts=args.max_attempts, run=not args.no_run, show_status=args.status, retry_failed=args.retry_failed,
+         cache_dir=args.cache_dir, rpm=args.rpm, tpm=args.tpm, keyframe_interval=args.keyframe_interval,
+         batch_size=args.batch_size, context=args.context, stream=args.stream, pack=args.pack,
+         normalize=args.normalize, hold_threshold=args.hold_threshold, stall_stop=args.stall_stop)
@@ -0,0 +1,163 @@
+# scripts/benchmark_codec.py
+
+import os
+import sys
+import lzma
+import time
+import zlib
+import struct
+import argparse
+import tempfile
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.frame_codec import RECORD_LENGTH, length_prefixed
+from src.movie_pack import PackedMovie, pack_movie_directory
+from src.movie_source import DirectoryMovie
+from src.utils import error_exit
+
+# A whole scene as a single stream, compressed in one piece, to compare with pack blocks
+STREAM_MAGIC = b'ASCD'
+STREAM_VERSION = 1
+
+# magic, version, compression
+STREAM_HEADER = struct.Struct('<4sBB')
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+COMPRESSION_NAMES = {'none': COMPRESSION_NONE, 'zlib': COMPRESSION_ZLIB, 'lzma': COMPRESSION_LZMA}
+
+def encode_frames(frames, compression='zlib'):
+    """
+    Encode a scene's frames as a single stream of length-prefixed frame records.
+
+    :param frames: List of frame strings, in order
+    :param compression: 'none', 'zlib' or 'lzma', applied to the whole stream
+    :return: Bytes of the encoded stream
+    """
+    body = length_prefixed(frames)
+    mode = COMPRESSION_NAMES[compression]
+    if mode == COMPRESSION_ZLIB:
+        body = zlib.compress(body, 9)
+    elif mode == COMPRESSION_LZMA:
+        body = lzma.compress(body)
+    return STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, mode) + body
+
+def decode_stream(chunks):
+    """
+    Decode an encoded stream incrementally, yielding each frame as soon as its record is complete.
+
+    :param chunks: Iterable of bytes, e.g. successive reads from a file or socket
+    :return: Generator of frame strings
+    """
+    header = b''
+    decompressor = None
+    buffer = bytearray()
+
+    for chunk in chunks:
+        if decompressor is None:
+            header += chunk
+            if len(header) < STREAM_HEADER.size:
+                continue
+            magic, version, mode = STREAM_HEADER.unpack_from(header, 0)
+            if magic != STREAM_MAGIC or version != STREAM_VERSION:
+                raise ValueError("Not a supported frame stream")
+            if mode == COMPRESSION_ZLIB:
+                decompressor = zlib.decompressobj()
+            elif mode == COMPRESSION_LZMA:
+                decompressor = lzma.LZMADecompressor()
+            else:
+                decompressor = False  # Uncompressed
+            chunk = header[STREAM_HEADER.size:]
+
+        buffer += decompressor.decompress(chunk) if decompressor else chunk
+
+        offset = 0
+        while len(buffer) - offset >= RECORD_LENGTH.size:
+            (length,) = RECORD_LENGTH.unpack_from(buffer, offset)
+            if len(buffer) - offset - RECORD_LENGTH.size < length:
+                break
+            start = offset + RECORD_LENGTH.size
+            offset = start + length
+            yield bytes(buffer[start:offset]).decode('utf-8')
+        del buffer[:offset]
+
+def decode_frames(data, chunk_size=65536):
+    # Convenience wrapper for a stream that is already in memory
+    return decode_stream(data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+
+def load_scenes(movie_dir):
+    movie = DirectoryMovie(movie_dir)
+    return [[movie.frame(scene, frame) for frame in movie.frame_numbers(scene)] for scene in movie.scene_numbers()]
+
+def time_decode(encoded_scenes, repeat):
+    frames = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for encoded in encoded_scenes:
+            for _ in decode_frames(encoded):
+                frames += 1
+    return frames / (time.perf_counter() - start)
+
+def time_pack_playback(pack_path, repeat):
+    pack = PackedMovie(pack_path)
+    frames = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for scene_number in pack.scene_numbers():
+            for frame_number in pack.frame_numbers(scene_number):
+                pack.frame(scene_number, frame_number)
+                frames += 1
+    elapsed = time.perf_counter() - start
+    pack.close()
+    return frames / elapsed
+
+def main(movie_name, gop, repeat):
+    movie_dir = os.path.join(project_root, 'data', 'movies', movie_name)
+    if not os.path.isfile(os.path.join(movie_dir, 'story.json')):
+        error_exit(f"Story file not found in {movie_dir}")
+
+    scenes = load_scenes(movie_dir)
+    frame_count = sum(len(frames) for frames in scenes)
+    raw_bytes = sum(len(frame.encode('utf-8')) for frames in scenes for frame in frames)
+
+    # Packs also hold the story and a frame index, which is the same for every encoding,
+    # so they are compared on the bytes of their frame payloads
+    print(f"Movie: {movie_name}, {len(scenes)} scenes, {frame_count} frames, GOP {gop or 'per scene'}")
+    print(f"{'encoding':<28}{'frame bytes':>12}{'ratio':>8}{'decode frames/s':>18}")
+    print(f"{'plain text frames':<28}{raw_bytes:>12}{1.0:>8.2f}{'':>18}")
+
+    per_frame_zlib = sum(len(zlib.compress(frame.encode('utf-8'), 9)) for frames in scenes for frame in frames)
+    print(f"{'zlib of each frame':<28}{per_frame_zlib:>12}{raw_bytes / per_frame_zlib:>8.2f}{'':>18}")
+    whole_zlib = sum(len(zlib.compress(''.join(frames).encode('utf-8'), 9)) for frames in scenes)
+    print(f"{'zlib of each scene':<28}{whole_zlib:>12}{raw_bytes / whole_zlib:>8.2f}{'':>18}")
+
+    for compression in ('none', 'zlib', 'lzma'):
+        encoded = [encode_frames(frames, compression) for frames in scenes]
+        for frames, data in zip(scenes, encoded):
+            if list(decode_frames(data)) != frames:
+                error_exit(f"Round trip mismatch with {compression} compression")
+        size = sum(len(data) for data in encoded)
+        print(f"{'stream, ' + compression:<28}{size:>12}{raw_bytes / size:>8.2f}{time_decode(encoded, repeat):>18.0f}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, options in (('pack, plain', {}), ('pack, zlib blocks', {'gop': gop, 'compress': 'zlib'}), ('pack, lzma blocks', {'gop': gop, 'compress': 'lzma'})):
+            pack_path = pack_movie_directory(movie_dir, os.path.join(tmp_dir, 'movie.asciimov'), **options)
+            pack = PackedMovie(pack_path)
+            if [[pack.frame(scene, frame) for frame in pack.frame_numbers(scene)] for scene in pack.scene_numbers()] != scenes:
+                error_exit(f"Round trip mismatch in {label}")
+            size = pack.payload_bytes
+            pack.close()
+            print(f"{label:<28}{size:>12}{raw_bytes / size:>8.2f}{time_pack_playback(pack_path, repeat):>18.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure compressed frame encoding size and decode throughput")
+    parser.add_argument("--movie", default="lost_city_of_atlantis", help="Movie directory name under data/movies (default: lost_city_of_atlantis)")
+    parser.add_argument("--gop", type=int, default=0, help="Frames per compressed pack block (default: 0, one block per scene)")
+    parser.add_argument("--repeat", type=int, default=20, help="Decode passes over the movie for timing (default: 20)")
+    args = parser.parse_args()
+
+    main(args.movie, args.gop, args.repeat)
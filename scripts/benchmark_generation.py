@@ -0,0 +1,115 @@
+# scripts/benchmark_generation.py
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.llm_cache import configure_completion_cache
+from src.llm_config import get_completion_model
+from src.mock_llm import MockLLMClient
+from src.story_generator import generate_story, save_story
+from src.frame_generator import generate_frames
+from src.utils import percentile
+
+def run_once(tmp_dir, run_number, topic, seed, latency, jitter, failure_rate, bad_frame_rate, options):
+    client = MockLLMClient(latency=latency, jitter=jitter, failure_rate=failure_rate, seed=seed, bad_frame_rate=bad_frame_rate)
+    model = get_completion_model('mock')
+    movie_dir = os.path.join(tmp_dir, f"run_{run_number:02d}")
+    os.makedirs(movie_dir)
+
+    failed = None
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        # Generation logs every frame; keep the benchmark output readable
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            story_data = generate_story(movie_dir, client=client, model=model, provider='mock', topic=topic)
+            save_story(story_data, movie_dir)
+            generate_frames(story_data, movie_dir, client=client, model=model, provider='mock', **options)
+    except SystemExit as e:
+        failed = f"generation exited with status {e.code}"
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+
+    frames = sum(
+        len([f for f in files if f.endswith('.txt')])
+        for root, _, files in os.walk(movie_dir)
+        if os.path.basename(root).startswith('scene_')
+    )
+    return {
+        'frames': frames,
+        'calls': client.calls,
+        'chars_sent': client.chars_sent,
+        'failures': client.failures,
+        'call_seconds': list(client.call_seconds),
+        'wall_seconds': wall_seconds,
+        'cpu_seconds': cpu_seconds,
+        'failed': failed,
+    }
+
+def main(runs=3, topic="Benchmarking", seed=0, latency=0.05, jitter=0.0, failure_rate=0.0, bad_frame_rate=0.0, workers=1, keyframe_interval=1, batch_size=1, pack=False, stream=False):
+    # Every call has to reach the mock client to be measured
+    configure_completion_cache(None)
+
+    print(f"Mock latency {latency * 1000:.0f} ms + up to {jitter * 1000:.0f} ms jitter, failure rate {failure_rate:.1%}, bad frame rate {bad_frame_rate:.1%}")
+    print(f"Workers {workers}, keyframe interval {keyframe_interval}, batch size {batch_size}, pack {'on' if pack else 'off'}, stream {'on' if stream else 'off'}")
+    print(f"{'run':<5}{'frames':>8}{'calls':>7}{'wall s':>9}{'frames/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'overhead s':>12}")
+
+    totals = {'frames': 0, 'chars_sent': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'call_seconds': []}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for run_number in range(1, runs + 1):
+            options = {'workers': workers, 'keyframe_interval': keyframe_interval, 'batch_size': batch_size, 'stream': stream}
+            if pack:
+                options['pack_path'] = os.path.join(tmp_dir, f"run_{run_number:02d}.asciimov")
+            result = run_once(tmp_dir, run_number, topic, seed, latency, jitter, failure_rate, bad_frame_rate, options)
+
+            latencies_ms = [seconds * 1000 for seconds in result['call_seconds']]
+            print(f"{run_number:<5}{result['frames']:>8}{result['calls']:>7}{result['wall_seconds']:>9.2f}"
+                  f"{result['frames'] / result['wall_seconds']:>10.1f}{percentile(latencies_ms, 0.50):>9.1f}"
+                  f"{percentile(latencies_ms, 0.99):>9.1f}{result['cpu_seconds']:>12.3f}")
+            if result['failed']:
+                print(f"      run stopped after {result['failures']} simulated failure(s); {result['failed']}")
+
+            totals['frames'] += result['frames']
+            totals['chars_sent'] += result['chars_sent']
+            totals['wall_seconds'] += result['wall_seconds']
+            totals['cpu_seconds'] += result['cpu_seconds']
+            totals['call_seconds'].extend(result['call_seconds'])
+
+    latencies_ms = [seconds * 1000 for seconds in totals['call_seconds']]
+    llm_seconds = sum(totals['call_seconds'])
+    print(f"\nOverall: {totals['frames'] / totals['wall_seconds']:.1f} frames/s, "
+          f"call latency p50 {percentile(latencies_ms, 0.50):.1f} ms / p99 {percentile(latencies_ms, 0.99):.1f} ms")
+    # The mock waits in time.sleep, so CPU time is the work done outside the LLM:
+    # prompt building, parsing, interpolation, file, pack and catalog writes
+    print(f"Overhead outside the LLM: {totals['cpu_seconds']:.3f} s CPU "
+          f"({totals['cpu_seconds'] / max(1, totals['frames']) * 1000:.2f} ms/frame), "
+          f"{llm_seconds:.2f} s spent in LLM calls")
+    print(f"Completion characters received: {totals['chars_sent']} ({totals['chars_sent'] / max(1, totals['frames']):.0f} per frame)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure end-to-end generation throughput against the mock LLM provider")
+    parser.add_argument("--runs", type=int, default=3, help="Number of movies to generate (default: 3)")
+    parser.add_argument("--topic", default="Benchmarking", help="Story topic passed to the mock provider (default: Benchmarking)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for mock output, latency and failures (default: 0)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock seconds per call (default: 0.05)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random mock seconds per call (default: 0)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of mock calls that fail (default: 0)")
+    parser.add_argument("--bad-frame-rate", type=float, default=0.0, help="Fraction of mock frames that are invalid (default: 0)")
+    parser.add_argument("--workers", type=int, default=1, help="Scenes generated concurrently (default: 1)")
+    parser.add_argument("--keyframe-interval", type=int, default=1, help="Interpolate between every Nth frame (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Frames requested per LLM call (default: 1)")
+    parser.add_argument("--pack", action="store_true", help="Also write a .asciimov pack while generating")
+    parser.add_argument("--stream", action="store_true", help="Stream frames with early validation and abort")
+    args = parser.parse_args()
+
+    main(runs=args.runs, topic=args.topic, seed=args.seed, latency=args.latency, jitter=args.jitter,
+         failure_rate=args.failure_rate, bad_frame_rate=args.bad_frame_rate, workers=args.workers,
+         keyframe_interval=args.keyframe_interval, batch_size=args.batch_size, pack=args.pack, stream=args.stream)
@@ -0,0 +1,81 @@
+# scripts/benchmark_imports.py
+
+import os
+import sys
+import argparse
+import subprocess
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points and the modules each must load quickly; the player must stay free of
+# the LLM stack and of NumPy, which only frame normalization uses
+TARGETS = {
+    'player': 'import play_movie',
+    'movie_player': 'import src.movie_player',
+    'generator': 'import generate_movie',
+}
+FORBIDDEN = {
+    'player': ('openai', 'anthropic', 'dotenv', 'src.llm_config', 'numpy'),
+    'movie_player': ('openai', 'anthropic', 'dotenv', 'src.llm_config', 'numpy'),
+}
+
+def measure_imports(statement):
+    """
+    Run statement in a fresh interpreter under -X importtime.
+
+    :return: List of (module, self_us, cumulative_us, depth) for every imported module
+    """
+    code = f"import sys; sys.path[:0] = [{project_root!r}, {os.path.join(project_root, 'scripts')!r}]; {statement}"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, cwd=project_root)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit status {result.returncode}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+def main(targets, runs=5, top=8, budget_ms=50.0):
+    # Startup modules (site, encodings, ...) load before -c runs and are left out
+    baseline = {module for module, _, _, _ in measure_imports('pass')}
+    failed = False
+
+    for target in targets:
+        samples = []
+        for _ in range(runs):
+            modules = [m for m in measure_imports(TARGETS[target]) if m[0] not in baseline]
+            samples.append((sum(cumulative for _, _, cumulative, depth in modules if depth == 0) / 1000, modules))
+        samples.sort(key=lambda sample: sample[0])
+        total_ms, modules = samples[len(samples) // 2]  # Median run
+
+        forbidden = sorted({name for name, _, _, _ in modules for prefix in FORBIDDEN.get(target, ()) if name == prefix or name.startswith(prefix + '.')})
+        over_budget = target in FORBIDDEN and total_ms > budget_ms
+        status = 'FAIL' if forbidden or over_budget else 'ok'
+        failed = failed or status == 'FAIL'
+
+        print(f"{target}: {TARGETS[target]!r} imports {len(modules)} modules in {total_ms:.1f} ms (median of {runs}) [{status}]")
+        for name, self_us, cumulative_us, _ in sorted(modules, key=lambda m: m[1], reverse=True)[:top]:
+            print(f"  {self_us / 1000:>8.2f} ms self {cumulative_us / 1000:>9.2f} ms cumulative  {name}")
+        if forbidden:
+            print(f"  must not import: {', '.join(forbidden)}")
+        if over_budget:
+            print(f"  over the {budget_ms:.0f} ms budget")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure module import time (python -X importtime) for the player and generator entry points")
+    parser.add_argument("targets", nargs="*", help=f"Entry points to measure (default: all of {', '.join(TARGETS)})")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per entry point; the median is reported (default: 5)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest modules to list by self time (default: 8)")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="Import budget for the playback entry points (default: 50)")
+    args = parser.parse_args()
+    unknown = sorted(set(args.targets) - set(TARGETS))
+    if unknown:
+        parser.error(f"unknown entry point: {', '.join(unknown)} (choose from {', '.join(TARGETS)})")
+
+    sys.exit(main(args.targets or list(TARGETS), runs=args.runs, top=args.top, budget_ms=args.budget_ms))
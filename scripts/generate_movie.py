@@ -10,10 +10,16 @@ from dotenv import load_dotenv
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from src.story_generator import generate_story, save_story
+from src.story_generator import generate_story, generate_story_hedged, save_story
 from src.frame_generator import generate_frames
+from src.pipeline import generate_movie_pipelined
 from src.utils import create_movie_directory, log_progress, error_exit
 from src.llm_config import create_llm_client, get_llm_completion
+from src.llm_cache import configure_completion_cache, get_completion_cache
+from src.movie_pack import PACK_EXTENSION
+from src.catalog import get_catalog
+from src.telemetry import TELEMETRY_FILE, configure_telemetry
+from src.rate_limit import configure_rate_limiter
 
 # Load environment variables
 load_dotenv()
@@ -25,10 +31,32 @@ def get_model_name(provider):
         return os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')
     elif provider == 'ollama':
         return os.getenv('OLLAMA_MODEL', 'llama3.1')
+    elif provider == 'mock':
+        return os.getenv('MOCK_LLM_MODEL', 'mock-ascii')
     else:
         raise ValueError(f"Unsupported provider: {provider}")
 
-def main(provider='ollama', resume=False, topic=None):
+def prompt_context(totals):
+    # Estimated prompt tokens as sent vs. with the full previous frame in every prompt
+    change = totals['prompt_estimate'] / totals['full_prompt_estimate'] - 1
+    return f"~{totals['prompt_estimate']} prompt tokens vs ~{totals['full_prompt_estimate']} with full frames ({change:+.0%})"
+
+def log_telemetry_summary(telemetry, scene_token_budget=None):
+    summary = telemetry.summary()
+    log_progress(f"LLM calls: {summary['calls']} ({summary['cached']} cached, {summary['errors']} failed, {summary['retries']} retries), {summary['llm_seconds']:.1f} s waiting on the LLM")
+    log_progress(f"Call latency: p50 {summary['latency_p50_ms']:.0f} ms, p99 {summary['latency_p99_ms']:.0f} ms")
+    log_progress(f"Tokens: {summary['prompt_tokens']} prompt ({summary['cached_prompt_tokens']} from the provider's prompt cache), {summary['completion_tokens']} completion ({summary['completion_tokens_per_second']:.1f} completion tokens/s)")
+    if summary['prompt_estimate'] != summary['full_prompt_estimate']:
+        log_progress(f"Prompt context: {prompt_context(summary)}")
+    for scene_number, scene in sorted(summary['scenes'].items()):
+        tokens = scene['prompt_tokens'] + scene['completion_tokens']
+        over_budget = " - over budget" if scene_token_budget and tokens > scene_token_budget else ""
+        context = f", {prompt_context(scene)}" if scene['prompt_estimate'] != scene['full_prompt_estimate'] else ""
+        log_progress(f"  Scene {scene_number}: {scene['calls']} calls, {scene['seconds']:.1f} s, {tokens} tokens{context}{over_budget}")
+    if telemetry.path:
+        log_progress(f"Per-call telemetry written to: {telemetry.path}")
+
+def main(provider='ollama', resume=False, topic=None, workers=1, cache_dir=None, cache_max_mb=256, keyframe_interval=1, batch_size=1, pack=False, scene_token_budget=None, rpm=None, tpm=None, stream=False, context='full', pipeline=False, story_hedge=1, story_providers=None, normalize=False, hold_threshold=-1, stall_stop=0):
     # Set up directories
     data_dir = os.path.join(project_root, 'data', 'movies')
     debug_dir = os.path.join(data_dir, 'debug_output')
@@ -36,17 +64,26 @@ def main(provider='ollama', resume=False, topic=None):
 
     model = get_model_name(provider)
     client = create_llm_client(provider)
+    telemetry = configure_telemetry()
+    if rpm is not None or tpm is not None:
+        configure_rate_limiter(provider, rpm, tpm)
+
+    if cache_dir:
+        configure_completion_cache(cache_dir, int(cache_max_mb * 1024 * 1024))
+    cache = get_completion_cache()
+    if cache is not None:
+        log_progress(f"Using completion cache: {cache.path}")
 
     # Log the provider and model
     log_progress(f"Using LLM provider: {provider}, Model: {model}")
 
     if resume:
-        # Find the most recent movie directory
-        movie_dirs = [d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)) and d != 'debug_output']
-        if not movie_dirs:
-            error_exit("No existing movie found to resume.")
-        latest_movie_dir = max(movie_dirs, key=lambda d: os.path.getmtime(os.path.join(data_dir, d)))
-        movie_dir = os.path.join(data_dir, latest_movie_dir)
+        # Resume the most recently updated movie that its journal doesn't mark complete
+        # (movies from before journaling go by the catalog's frame counts)
+        movie = get_catalog(data_dir).latest_unfinished_movie()
+        if movie is None:
+            error_exit("No unfinished movie found to resume.")
+        movie_dir = os.path.join(data_dir, movie['name'])
         
         # Load existing story
         story_file = os.path.join(movie_dir, 'story.json')
@@ -55,30 +92,85 @@ def main(provider='ollama', resume=False, topic=None):
         with open(story_file, 'r') as f:
             story_data = json.load(f)
         log_progress(f"Resuming movie generation for: {story_data['title']}")
+    elif pipeline:
+        log_progress("Streaming story and generating frames as scenes arrive...")
+        story_data, movie_dir = generate_movie_pipelined(
+            data_dir, debug_dir, client, model, provider, topic=topic, pack=pack, workers=workers,
+            keyframe_interval=keyframe_interval, batch_size=batch_size, stream=stream, context=context, normalize=normalize,
+            hold_threshold=hold_threshold, stall_stop=stall_stop
+        )
     else:
         log_progress("Generating new story...")
-        story_data = generate_story(debug_dir, client=client, model=model, provider=provider, topic=topic)
+        if story_hedge > 1 or story_providers:
+            providers = story_providers or [provider]
+            clients = [(name, client if name == provider else create_llm_client(name)) for name in providers]
+            story_data = generate_story_hedged(debug_dir, clients, topic=topic, hedges=max(story_hedge, len(clients)))
+        else:
+            story_data = generate_story(debug_dir, client=client, model=model, provider=provider, topic=topic)
         if not story_data:
             return  # Error message already printed in generate_story
         
         movie_dir = create_movie_directory(data_dir, story_data['title'])
         save_story(story_data, movie_dir)
     
-    log_progress("Generating frames...")
-    generate_frames(story_data, movie_dir, client=client, model=model, provider=provider, resume=resume)
+    telemetry.open(os.path.join(movie_dir, TELEMETRY_FILE))
+
+    pack_path = movie_dir + PACK_EXTENSION if pack else None
+    if resume or not pipeline:
+        log_progress("Generating frames...")
+        generate_frames(story_data, movie_dir, client=client, model=model, provider=provider, resume=resume, workers=workers, keyframe_interval=keyframe_interval, batch_size=batch_size, pack_path=pack_path, stream=stream, context=context, normalize=normalize, hold_threshold=hold_threshold, stall_stop=stall_stop)
     log_progress("All frames generated.")
+
+    if cache is not None:
+        stats = cache.stats()
+        log_progress(f"Completion cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions, {stats['entries']} entries ({stats['bytes'] / (1024 * 1024):.1f} MB)")
+
+    log_telemetry_summary(telemetry, scene_token_budget)
+    telemetry.close()
     
     log_progress(f"Movie generation complete. The movie is saved in: {movie_dir}")
+    if pack_path:
+        log_progress(f"Packed movie written to: {pack_path}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate ASCII movie")
-    parser.add_argument("--provider", choices=['ollama', 'openai', 'anthropic'], default='ollama', 
-                        help="Choose the LLM provider (default: ollama)")
+    parser.add_argument("--provider", choices=['ollama', 'openai', 'anthropic', 'mock'], default='ollama', 
+                        help="Choose the LLM provider (default: ollama; mock runs offline with canned output)")
     parser.add_argument("--resume", action="store_true", help="Resume the most recent movie generation")
     parser.add_argument("--topic", type=str, help="Specify a topic for the story generation")
+    parser.add_argument("--workers", type=int, default=1, help="Number of scenes to generate concurrently (default: 1)")
+    parser.add_argument("--keyframe-interval", type=int, default=1, help="Generate every Nth frame with the LLM and interpolate the frames in between (default: 1, every frame)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Request this many consecutive frames per LLM call (default: 1)")
+    parser.add_argument("--context", choices=['full', 'rle'], default='full',
+                        help="How the previous frame is sent in frame prompts: full text or run-length encoded (default: full)")
+    parser.add_argument("--stream", action="store_true", help="Stream frames and cancel requests whose output overruns the frame or turns into prose")
+    parser.add_argument("--pipeline", action="store_true", help="Stream the story and start each scene's frames as soon as that scene has arrived")
+    parser.add_argument("--story-hedge", type=int, default=1, help="Send this many story requests in parallel at different temperatures and keep the first valid story (default: 1)")
+    parser.add_argument("--story-providers", type=str, help="Comma-separated providers to spread hedged story requests over (default: --provider)")
+    parser.add_argument("--normalize", action="store_true", help="Pad or crop each scene's frames to the exact frame size and regenerate malformed frames")
+    parser.add_argument("--hold-threshold", type=float, default=-1,
+                        help="With --normalize, fold frames that change at most this fraction of cells (e.g. 0.005; 0 for identical frames only) into a hold of the frame before and delete their files (default: keep every frame)")
+    parser.add_argument("--stall-stop", type=int, default=0, help="Stop a scene after this many frames in a row without change and hold its last frame (default: 0, never)")
+    parser.add_argument("--pack", action="store_true", help="Also write the movie as a single-file .asciimov pack")
+    parser.add_argument("--cache-dir", type=str, help="Cache LLM completions on disk in this directory (default: $LLM_CACHE_DIR, disabled if unset)")
+    parser.add_argument("--cache-max-mb", type=float, default=256, help="Maximum completion cache size in MB before LRU eviction (default: 256)")
+    parser.add_argument("--rpm", type=int, help="Client-side limit on LLM requests per minute (default: $<PROVIDER>_RPM, unlimited if unset)")
+    parser.add_argument("--tpm", type=int, help="Client-side limit on LLM tokens per minute (default: $<PROVIDER>_TPM, unlimited if unset)")
+    parser.add_argument("--scene-token-budget", type=int, help="Flag scenes whose LLM calls use more tokens than this in the summary")
     args = parser.parse_args()
+    if args.batch_size > 1 and args.keyframe_interval > 1:
+        parser.error("--batch-size and --keyframe-interval cannot be combined")
+    story_providers = args.story_providers.split(',') if args.story_providers else None
+    if story_providers and not set(story_providers) <= {'ollama', 'openai', 'anthropic', 'mock'}:
+        parser.error("--story-providers accepts ollama, openai, anthropic and mock")
+    if args.pipeline and (args.story_hedge > 1 or story_providers):
+        parser.error("--pipeline cannot be combined with hedged story requests")
+    if args.hold_threshold >= 0 and not args.normalize:
+        parser.error("--hold-threshold needs --normalize")
+    if args.stall_stop and args.hold_threshold < 0:
+        parser.error("--stall-stop needs --hold-threshold")
 
     try:
-        main(provider=args.provider, resume=args.resume, topic=args.topic)
+        main(provider=args.provider, resume=args.resume, topic=args.topic, workers=args.workers, cache_dir=args.cache_dir, cache_max_mb=args.cache_max_mb, keyframe_interval=args.keyframe_interval, batch_size=args.batch_size, pack=args.pack, scene_token_budget=args.scene_token_budget, rpm=args.rpm, tpm=args.tpm, stream=args.stream, context=args.context, pipeline=args.pipeline, story_hedge=args.story_hedge, story_providers=story_providers, normalize=args.normalize, hold_threshold=args.hold_threshold, stall_stop=args.stall_stop)
     except Exception as e:
         error_exit(f"An unexpected error occurred: {str(e)}")
@@ -0,0 +1,145 @@
+# scripts/load_test_server.py
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.movie_server import MovieServer
+from src.utils import percentile, log_progress, error_exit
+
+def raise_file_limit():
+    # Each viewer is a socket (two when the server runs in-process)
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        return hard
+    except (ImportError, ValueError, OSError):
+        return None
+
+async def viewer(host, port, duration, stalled, results):
+    """
+    Connect and read until the server closes the connection or duration passes. A stalled
+    viewer stops reading after the first data, like a frozen terminal.
+    """
+    start = time.perf_counter()
+    result = {'stalled': stalled, 'connected': False, 'first_byte': None, 'bytes': 0, 'closed_by_server': False}
+    results.append(result)
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=10)
+    except (OSError, asyncio.TimeoutError):
+        return
+    result['connected'] = True
+    deadline = start + duration
+    try:
+        while time.perf_counter() < deadline:
+            if stalled and result['bytes']:
+                await asyncio.sleep(deadline - time.perf_counter())
+                # Catch up on what was buffered to see whether the server hung up meanwhile
+                catch_up_until = time.perf_counter() + 2
+                while time.perf_counter() < catch_up_until:
+                    try:
+                        data = await asyncio.wait_for(reader.read(65536), timeout=1)
+                    except asyncio.TimeoutError:
+                        break
+                    if not data:
+                        result['closed_by_server'] = True
+                        break
+                break
+            try:
+                data = await asyncio.wait_for(reader.read(65536), timeout=max(0.01, deadline - time.perf_counter()))
+            except asyncio.TimeoutError:
+                break
+            if not data:
+                result['closed_by_server'] = True
+                break
+            if result['first_byte'] is None:
+                result['first_byte'] = time.perf_counter() - start
+            result['bytes'] += len(data)
+    except (ConnectionError, OSError):
+        result['closed_by_server'] = True
+    finally:
+        writer.close()
+
+async def run(host, port, clients, ramp, duration, stalled_fraction, movie_paths, frame_delay, max_buffer_kb, drop_after):
+    server = None
+    if movie_paths:
+        server = MovieServer(movie_paths, frame_delay, card_seconds=frame_delay, loop=True, max_buffer=int(max_buffer_kb * 1024), drop_after=drop_after)
+        port = await server.start('127.0.0.1', 0)
+        host = '127.0.0.1'
+        log_progress(f"Started an in-process server on port {port}")
+
+    results = []
+    stalled_every = round(1 / stalled_fraction) if stalled_fraction else 0
+    tasks = []
+    started = time.perf_counter()
+    for index in range(clients):
+        stalled = bool(stalled_every) and index % stalled_every == 0
+        tasks.append(asyncio.ensure_future(viewer(host, port, duration, stalled, results)))
+        if ramp:
+            await asyncio.sleep(ramp / clients)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    if server is not None:
+        server_stats = server.stats()
+        await server.close()
+    else:
+        server_stats = None
+    return results, elapsed, server_stats
+
+def report(results, elapsed, server_stats):
+    connected = [r for r in results if r['connected']]
+    for label, group in (("readers", [r for r in connected if not r['stalled']]), ("stalled", [r for r in connected if r['stalled']])):
+        if not group:
+            continue
+        first_bytes = [r['first_byte'] * 1000 for r in group if r['first_byte'] is not None]
+        log_progress(
+            f"{len(group)} {label}: first byte p50 {percentile(first_bytes, 0.50):.1f} ms / p99 {percentile(first_bytes, 0.99):.1f} ms, "
+            f"{sum(r['bytes'] for r in group) / len(group) / 1024:.1f} KB received each, "
+            f"{sum(r['closed_by_server'] for r in group)} disconnected by the server"
+        )
+    log_progress(f"{len(results) - len(connected)} of {len(results)} connections failed; {sum(r['bytes'] for r in connected) / elapsed / 1024:.0f} KB/s received in total over {elapsed:.1f} s")
+    if server_stats is not None:
+        log_progress(
+            f"Server: peak {server_stats['peak_viewers']} viewers, {server_stats['frames_sent']} frames sent, "
+            f"{server_stats['frames_skipped']} skipped, {server_stats['viewers_dropped']} viewers dropped"
+        )
+
+def main(host='127.0.0.1', port=2323, clients=100, ramp=1.0, duration=10.0, stalled_fraction=0.0, serve=None, frame_delay=0.1, max_buffer_kb=64, drop_after=3.0):
+    limit = raise_file_limit()
+    if limit is not None and clients * (2 if serve else 1) + 64 > limit:
+        log_progress(f"Warning: {clients} viewers may exceed the open file limit ({limit})")
+
+    movie_paths = None
+    if serve:
+        data_dir = os.path.join(project_root, 'data', 'movies')
+        movie_paths = [name if os.path.exists(name) else os.path.join(data_dir, name) for name in serve]
+        for path in movie_paths:
+            if not os.path.exists(path):
+                error_exit(f"Movie not found: {path}")
+
+    results, elapsed, server_stats = asyncio.run(run(host, port, clients, ramp, duration, stalled_fraction, movie_paths, frame_delay, max_buffer_kb, drop_after))
+    report(results, elapsed, server_stats)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the movie server with many concurrent viewers")
+    parser.add_argument("--host", default="127.0.0.1", help="Server address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=2323, help="Server port (default: 2323)")
+    parser.add_argument("--clients", type=int, default=100, help="Number of concurrent viewers (default: 100)")
+    parser.add_argument("--ramp", type=float, default=1.0, help="Seconds over which viewers connect (default: 1)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds each viewer stays connected (default: 10)")
+    parser.add_argument("--stalled", type=float, default=0.0, help="Fraction of viewers that stop reading, to exercise skipping and dropping (default: 0)")
+    parser.add_argument("--serve", nargs="+", metavar="MOVIE", help="Start an in-process server for these movies instead of connecting to --host/--port")
+    parser.add_argument("--delay", type=float, default=0.1, help="Frame delay of the in-process server (default: 0.1)")
+    parser.add_argument("--max-buffer-kb", type=float, default=64, help="Per-viewer buffer of the in-process server (default: 64)")
+    parser.add_argument("--drop-after", type=float, default=3.0, help="Drop timeout of the in-process server (default: 3)")
+    args = parser.parse_args()
+
+    main(args.host, args.port, args.clients, args.ramp, args.duration, args.stalled, args.serve, args.delay, args.max_buffer_kb, args.drop_after)
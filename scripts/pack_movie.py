@@ -0,0 +1,44 @@
+# scripts/pack_movie.py
+
+import os
+import sys
+import argparse
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.movie_pack import PackedMovie, pack_movie_directory
+from src.utils import log_progress, error_exit
+
+def main(movie_names=None, gop=0, compress=None):
+    data_dir = os.path.join(project_root, 'data', 'movies')
+    if not movie_names:
+        movie_names = sorted(
+            d for d in os.listdir(data_dir)
+            if d != 'debug_output' and os.path.isfile(os.path.join(data_dir, d, 'story.json'))
+        )
+    if not movie_names:
+        error_exit("No movies found in the data directory.")
+
+    for movie_name in movie_names:
+        movie_dir = os.path.join(data_dir, movie_name)
+        if not os.path.isfile(os.path.join(movie_dir, 'story.json')):
+            error_exit(f"Story file not found in {movie_dir}")
+
+        pack_path = pack_movie_directory(movie_dir, gop=gop, compress=compress)
+        pack = PackedMovie(pack_path)
+        log_progress(f"Packed {movie_name}: {pack.frame_count} frames in {len(pack.scene_numbers())} scenes, {os.path.getsize(pack_path)} bytes -> {pack_path}")
+        pack.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert movie directories into single-file .asciimov packs")
+    parser.add_argument("movies", nargs="*", help="Movie directory names under data/movies (default: all movies)")
+    parser.add_argument("--compress", choices=['zlib', 'lzma'], help="Compress each scene's frames together as one block")
+    parser.add_argument("--gop", type=int, default=0, help="Frames per compressed block with --compress (default: 0, one block per scene)")
+    args = parser.parse_args()
+
+    try:
+        main(args.movies, gop=args.gop, compress=args.compress)
+    except Exception as e:
+        error_exit(f"An unexpected error occurred: {str(e)}")
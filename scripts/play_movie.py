@@ -3,158 +3,121 @@
 import os
 import sys
 import argparse
-import json
 import textwrap
 import time
-import re
 
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 from src.utils import log_progress, error_exit
-from src.llm_config import create_llm_client  # Import for potential future use
+from src.terminal import TerminalRenderer, clear_screen, open_output
+from src.prefetch import FramePrefetcher
+from src.playback_clock import PlaybackClock
+from src.movie_source import open_movie
+from src.movie_pack import is_pack_file
+from src.catalog import get_catalog
+from src.compositor import get_compositor, compose_scene_intro, compose_goodbye
 
-def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+def format_info(text, width=68):
+    return '\n'.join(["="*width, textwrap.fill(text, width).center(width), "="*width])
 
 def display_info(text, width=68):
-    print("="*width)
-    print(textwrap.fill(text, width).center(width))
-    print("="*width)
+    print(format_info(text, width))
 
 def wrap_text(text, width=68):
     return '\n'.join(textwrap.wrap(text, width))
 
-def read_frame(file_path):
-    with open(file_path, 'r') as f:
-        return f.read()
-
-def play_movie(movie_dir, frame_delay=0.6, frame_height=15, frame_width=70):
-    # Load movie information
+def play_movie(movie_dir, frame_delay=0.6, frame_height=15, frame_width=70, prefetch_frames=32, prompt=True, output=None):
+    # Load movie information from a movie directory or a packed .asciimov file
     story_file = os.path.join(movie_dir, 'story.json')
-    if not os.path.exists(story_file):
+    if not is_pack_file(movie_dir) and not os.path.exists(story_file):
         error_exit(f"Story file not found: {story_file}")
     
-    with open(story_file, 'r') as f:
-        story_data = json.load(f)
-    
-    clear_screen()
-    display_info(f"Movie: {story_data['title']}", width=frame_width)
-    print(f"\n{wrap_text('Synopsis: ' + story_data['synopsis'], width=frame_width)}\n")
-    input("Press Enter to start the movie...")
+    movie = open_movie(movie_dir)
+    story_data = movie.story
 
-    scene_dirs = sorted([d for d in os.listdir(movie_dir) if os.path.isdir(os.path.join(movie_dir, d)) and d.startswith('scene_')])
-    
+    # Bordered frames are composed once per frame file and kept as bytes, so replays and
+    # loops only write; the prefetch thread composes what isn't cached yet
+    compositor = get_compositor(frame_width, frame_height)
+    cache_before = compositor.stats()
+    previous_frames = {}
+    holds = {}
+
+    def compose_frame(scene_number, frame_number):
+        # Held frames come once with their tick count; the clock keeps them on screen
+        if scene_number not in holds:
+            holds[scene_number] = movie.frame_holds(scene_number)
+        composed = compositor.frame(movie, scene_number, frame_number, previous_frames.get(scene_number))
+        previous_frames[scene_number] = composed
+        return composed, holds[scene_number].get(frame_number, 1)
+
+    # Load frames in the background while the intro and each frame are on screen
+    prefetcher = FramePrefetcher(movie.scene_numbers(), movie.frame_numbers, compose_frame, depth=prefetch_frames).start()
+
+    clock = PlaybackClock(frame_delay)
+    renderer = TerminalRenderer(output)
+    renderer.open()
+    compose_seconds = 0.0  # Laying out cards; frames are timed by the compositor
     try:
-        for scene_index, scene_dir in enumerate(scene_dirs):
-            scene_number = int(re.search(r'scene_(\d+)', scene_dir).group(1))
+        movie_info = format_info(f"Movie: {story_data['title']}", width=frame_width)
+        renderer.show(f"{movie_info}\n\n{wrap_text('Synopsis: ' + story_data['synopsis'], width=frame_width)}\n")
+        if prompt:
+            input("Press Enter to start the movie...")
+
+        for scene_index, (scene_number, frames) in enumerate(prefetcher.scenes()):
             scene_data = story_data['scenes'][scene_index]
             
-            clear_screen()
-            
-            # Prepare the content for the scene intro
-            scene_title = f"Scene {scene_number}: {scene_data['name']}"
-            description = wrap_text(scene_data['description'], width=frame_width)
-            caption = wrap_text(scene_data['caption'], width=frame_width)
-            
-            # Create the scene intro frame
-            adjusted_intro = ['+' + '-' * frame_width + '+']  # Top border
-            adjusted_intro.append('|' + scene_title.center(frame_width)[:frame_width] + '|')  # Centered Scene title
-            adjusted_intro.append('|' + '-' * frame_width + '|')  # Border line under the scene title
-            
-            # Calculate how many lines the description and caption take
-            scene_intro_lines = description.split('\n') + [''] + caption.split('\n')
-            total_lines = len(scene_intro_lines)
-            
-            # Truncate lines if they exceed the frame height
-            if total_lines > (frame_height - 3):  # -3 for title, border, and padding
-                scene_intro_lines = scene_intro_lines[:(frame_height - 3)]
-                total_lines = len(scene_intro_lines)
-            
-            # Calculate padding to center the description/caption
-            padding_top = (frame_height - total_lines - 3) // 2  # -3 for title, border, and bottom padding
-            padding_bottom = frame_height - total_lines - padding_top - 3
-            
-            # Add top padding
-            for _ in range(padding_top):
-                adjusted_intro.append('|' + ' ' * frame_width + '|')
-            
-            # Add the description and caption
-            for line in scene_intro_lines:
-                adjusted_intro.append('|' + line.center(frame_width)[:frame_width] + '|')
+            compose_start = time.perf_counter()
+            scene_intro = compose_scene_intro(f"Scene {scene_number}: {scene_data['name']}", scene_data['description'],
+                                              scene_data['caption'], frame_width, frame_height)
+            compose_seconds += time.perf_counter() - compose_start
             
-            # Add bottom padding
-            for _ in range(padding_bottom):
-                adjusted_intro.append('|' + ' ' * frame_width + '|')
-            
-            adjusted_intro.append('+' + '-' * frame_width + '+')  # Bottom border
-            
-            print('\n'.join(adjusted_intro))
-            input("Press Enter to start the scene...")
+            renderer.show(scene_intro)
+            if prompt:
+                input("Press Enter to start the scene...")
 
-            scene_path = os.path.join(movie_dir, scene_dir)
-            frame_files = sorted([f for f in os.listdir(scene_path) if f.endswith('.txt') and f.startswith(f'scene_{scene_number:02d}_frame_')])
-            
-            for frame_file in frame_files:
-                clear_screen()
-                frame_content = read_frame(os.path.join(scene_path, frame_file))
-                
-                # Ensure consistent frame size with border and dialogue at the bottom
-                frame_lines = frame_content.split('\n')
-                
-                # Truncate lines if they exceed the frame height
-                if len(frame_lines) > frame_height:
-                    frame_lines = frame_lines[:frame_height]
-                
-                adjusted_frame = ['+' + '-' * frame_width + '+']  # Top border
-                
-                # Calculate padding above the dialogue
-                padding_lines = frame_height - len(frame_lines)
-                
-                # Add padding lines
-                for _ in range(padding_lines):
-                    adjusted_frame.append('|' + ' ' * frame_width + '|')
-                
-                # Add the actual content
-                for line in frame_lines:
-                    adjusted_frame.append('|' + line.ljust(frame_width)[:frame_width] + '|')
-                
-                adjusted_frame.append('+' + '-' * frame_width + '+')  # Bottom border
-                
-                print('\n'.join(adjusted_frame))
-                time.sleep(frame_delay)
+            clock.start()
+            for frame, ticks in frames:
+                if not clock.wait_for_next_frame(ticks):
+                    continue  # Behind schedule: skip this frame rather than drift
+                renderer.render_composed(frame)
+            clock.finish()
         
         # Display goodbye frame
-        clear_screen()
-        goodbye_frame = [
-            "+" + "-" * frame_width + "+",
-            "|" + " " * frame_width + "|",
-            "|" + "The End".center(frame_width) + "|",
-            "|" + " " * frame_width + "|",
-            "|" + f"Thank you for watching".center(frame_width) + "|",
-            "|" + f"{story_data['title']}".center(frame_width) + "|",
-            "|" + " " * frame_width + "|",
-            "+" + "-" * frame_width + "+",
-        ]
-        
-        # Pad the goodbye frame to match frame_height
-        while len(goodbye_frame) < frame_height + 2:  # +2 for top and bottom border
-            if len(goodbye_frame) == frame_height + 1:
-                goodbye_frame.insert(-1, "|" + "-" * frame_width + "|")  # Adjust before the bottom border
-            else:
-                goodbye_frame.insert(-2, "|" + " " * frame_width + "|")
-        
-        print('\n'.join(goodbye_frame))
+        compose_start = time.perf_counter()
+        goodbye = compose_goodbye(story_data['title'], frame_width, frame_height)
+        compose_seconds += time.perf_counter() - compose_start
+        renderer.render(goodbye)
+        renderer.close()
         
     except KeyboardInterrupt:
+        renderer.close(keep_last=False)
         print("\nPlayback interrupted. Exiting...")
     except IndexError:
+        renderer.close(keep_last=False)
         error_exit("Error: Mismatch between number of scene directories and scenes in story data.")
+    finally:
+        renderer.close(keep_last=False)  # No-op unless playback ended with an error
+        prefetcher.stop()
+        movie.close()
+
+    cache_after = compositor.stats()
+    cache = {
+        'hits': cache_after['hits'] - cache_before['hits'],
+        'misses': cache_after['misses'] - cache_before['misses'],
+        'compose_seconds': cache_after['compose_seconds'] - cache_before['compose_seconds']
+    }
+    render = {
+        'bytes_written': renderer.bytes_written,
+        'compose_seconds': compose_seconds + renderer.compose_seconds + cache['compose_seconds'],
+        'write_seconds': renderer.write_seconds
+    }
+    return {'prefetch': prefetcher.stats(), 'playback': clock.report(), 'render': render, 'cache': cache}
 
 def list_movies(data_dir):
-    movies = [d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)) and d != 'debug_output']
-    return sorted(movies, key=lambda x: os.path.getmtime(os.path.join(data_dir, x)), reverse=True)
+    # The catalog is kept up to date by generation and only rescans when movies are added or removed
+    return [movie['name'] for movie in get_catalog(data_dir).list_movies()]
 
 def select_movie(movies):
     clear_screen()
@@ -175,14 +138,71 @@ def select_movie(movies):
         except ValueError:
             print("Invalid input. Please enter a number or 'q' to quit.")
 
-def main(frame_delay=0.6):
+def log_playback_stats(stats, prefetch_stats=False):
+    playback = stats['playback']
+    log_progress(
+        f"Playback: {playback['achieved_fps']:.1f} fps achieved, {playback['frames_presented']} frames shown, "
+        f"{playback['frames_dropped']} dropped, jitter p50 {playback['jitter_p50_ms']:.1f} ms / "
+        f"p95 {playback['jitter_p95_ms']:.1f} ms / p99 {playback['jitter_p99_ms']:.1f} ms"
+    )
+    if prefetch_stats:
+        prefetch = stats['prefetch']
+        log_progress(
+            f"Prefetch: {prefetch['frames_played']} frames played, {prefetch['stalls']} stalls "
+            f"({prefetch['stall_seconds'] * 1000:.1f} ms), queue depth mean {prefetch['mean_queue_depth']:.1f} / "
+            f"max {prefetch['max_queue_depth']} of {prefetch['depth']}"
+        )
+
+def bench_library(data_dir, movies, frame_delay=0.0, prefetch_frames=32, sink='null', repeat=1):
+    """
+    Play every movie without prompts and report throughput and where the time goes:
+    load (reading frames, on the prefetch thread), compose (bordering and diffing) and
+    write (output to the sink). With repeat, the library is played several times in a
+    row; passes after the first play from the precomposed frame cache.
+    """
+    for play in range(1, repeat + 1):
+        totals = {'frames': 0, 'seconds': 0.0, 'bytes': 0, 'load': 0.0, 'compose': 0.0, 'write': 0.0, 'hits': 0, 'misses': 0}
+        for movie_name in movies:
+            output = open_output(sink)
+            try:
+                start = time.perf_counter()
+                stats = play_movie(os.path.join(data_dir, movie_name), frame_delay, prefetch_frames=prefetch_frames, prompt=False, output=output)
+                seconds = time.perf_counter() - start
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+
+            frames = stats['playback']['frames_presented']
+            render = stats['render']
+            cache = stats['cache']
+            # Frames are composed on the prefetch thread, inside its load time
+            load = stats['prefetch']['load_seconds'] - cache['compose_seconds']
+            for key, value in (('frames', frames), ('seconds', seconds), ('bytes', render['bytes_written']), ('load', load),
+                               ('compose', render['compose_seconds']), ('write', render['write_seconds']),
+                               ('hits', cache['hits']), ('misses', cache['misses'])):
+                totals[key] += value
+            log_progress(f"{movie_name}: {frames} frames in {seconds * 1000:.1f} ms ({frames / seconds:.0f} frames/s), {render['bytes_written'] / 1024:.1f} KB written")
+
+        frames = max(1, totals['frames'])
+        label = f"Library (pass {play} of {repeat})" if repeat > 1 else "Library"
+        log_progress(f"{label}: {len(movies)} movies, {totals['frames']} frames in {totals['seconds']:.2f} s ({totals['frames'] / totals['seconds']:.0f} frames/s), {totals['bytes'] / (1024 * 1024):.2f} MB written")
+        for stage in ('load', 'compose', 'write'):
+            log_progress(f"  {stage}: {totals[stage] * 1000:.1f} ms total, {totals[stage] / frames * 1e6:.1f} us per frame")
+        log_progress(f"  frame cache: {totals['hits']} hits, {totals['misses']} misses")
+
+def main(frame_delay=0.6, prefetch_frames=32, prefetch_stats=False, movie_name=None, prompt=True, sink='stdout', bench=False, repeat=1):
     data_dir = os.path.join(project_root, 'data', 'movies')
     movies = list_movies(data_dir)
     
     if not movies:
         error_exit("No movies found in the data directory.")
+
+    if bench:
+        bench_library(data_dir, [movie_name] if movie_name else movies, frame_delay, prefetch_frames, sink, repeat)
+        return
     
-    movie_name = select_movie(movies)
+    if movie_name is None:
+        movie_name = select_movie(movies)
     if movie_name is None:
         log_progress("Movie selection cancelled.")
         return
@@ -190,21 +210,45 @@ def main(frame_delay=0.6):
     movie_dir = os.path.join(data_dir, movie_name)
     log_progress(f"Playing movie: {movie_name}")
     
+    output = open_output(sink)
     try:
-        play_movie(movie_dir, frame_delay)
+        for _ in range(repeat):
+            stats = play_movie(movie_dir, frame_delay, prefetch_frames=prefetch_frames, prompt=prompt, output=output)
+            log_playback_stats(stats, prefetch_stats)
     except KeyboardInterrupt:
         log_progress("Movie playback interrupted.")
     except FileNotFoundError as e:
         error_exit(f"Error: {str(e)}")
+    finally:
+        if output is not sys.stdout:
+            output.close()
     
     #log_progress("Movie playback complete.")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Play an ASCII movie")
-    parser.add_argument("--delay", type=float, default=0.6, help="Delay between frames in seconds (default: 0.6)")
+    timing = parser.add_mutually_exclusive_group()
+    timing.add_argument("--delay", type=float, help="Delay between frames in seconds, 0 for as fast as possible (default: 0.6, or 0 with --bench)")
+    timing.add_argument("--fps", type=float, help="Frames per second, as an alternative to --delay")
+    parser.add_argument("--movie", help="Play this movie (a name from data/movies) instead of choosing from a list")
+    parser.add_argument("--no-prompt", action="store_true", help="Don't wait for Enter before the movie and each scene")
+    parser.add_argument("--sink", help="Where to render: stdout, null, or a file path (default: stdout, or null with --bench)")
+    parser.add_argument("--bench", action="store_true", help="Play every movie (or --movie) headless and report frames/sec, bytes written and load/compose/write timings")
+    parser.add_argument("--repeat", type=int, default=1, help="Play the movie (or the --bench library) this many times; replays come from the frame cache (default: 1)")
+    parser.add_argument("--prefetch", type=int, default=32, help="Number of frames to load ahead of playback (default: 32)")
+    parser.add_argument("--prefetch-stats", action="store_true", help="Report prefetch queue depth and stalls after playback")
     args = parser.parse_args()
 
+    if args.fps:
+        frame_delay = 1 / args.fps
+    elif args.delay is not None:
+        frame_delay = args.delay
+    else:
+        frame_delay = 0.0 if args.bench else 0.6
+    sink = args.sink or ('null' if args.bench else 'stdout')
+
     try:
-        main(args.delay)
+        main(frame_delay, prefetch_frames=args.prefetch, prefetch_stats=args.prefetch_stats, movie_name=args.movie,
+             prompt=not args.no_prompt, sink=sink, bench=args.bench, repeat=max(1, args.repeat))
     except Exception as e:
         error_exit(f"An unexpected error occurred: {str(e)}")
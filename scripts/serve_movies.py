@@ -0,0 +1,71 @@
+# scripts/serve_movies.py
+
+import os
+import sys
+import asyncio
+import argparse
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.movie_server import MovieServer
+from src.catalog import get_catalog
+from src.utils import log_progress, error_exit
+
+def resolve_movies(data_dir, movie_names):
+    if not movie_names:
+        # Directories only: a packed copy of the same movie would otherwise play twice
+        return [os.path.join(data_dir, movie['name']) for movie in get_catalog(data_dir).list_movies(include_packs=False)]
+    paths = []
+    for name in movie_names:
+        path = name if os.path.exists(name) else os.path.join(data_dir, name)
+        if not os.path.exists(path):
+            error_exit(f"Movie not found: {name}")
+        paths.append(path)
+    return paths
+
+async def serve(server, host, port, stats_interval):
+    port = await server.start(host, port)
+    log_progress(f"Serving on {host}:{port} (connect with: telnet {host if host != '0.0.0.0' else 'localhost'} {port})")
+    reporter = asyncio.ensure_future(server.report(stats_interval)) if stats_interval else None
+    try:
+        await asyncio.Event().wait()  # Until interrupted
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        await server.close()
+
+def main(movie_names=None, host='0.0.0.0', port=2323, frame_delay=0.4, card_seconds=3.0, loop=False, max_buffer_kb=64, drop_after=10.0, stats_interval=10.0):
+    data_dir = os.path.join(project_root, 'data', 'movies')
+    movie_paths = resolve_movies(data_dir, movie_names)
+    if not movie_paths:
+        error_exit("No movies found in the data directory.")
+
+    server = MovieServer(movie_paths, frame_delay, card_seconds, loop=loop, max_buffer=int(max_buffer_kb * 1024), drop_after=drop_after)
+    for movie in server.movies:
+        log_progress(f"Loaded {movie.title}: {len(movie.screens)} screens, {movie.duration:.0f} s, {movie.bytes / 1024:.0f} KB precomposed")
+
+    try:
+        asyncio.run(serve(server, host, port, stats_interval))
+    except KeyboardInterrupt:
+        stats = server.stats()
+        log_progress(f"Server stopped after {stats['connections']} connections (peak {stats['peak_viewers']} viewers), {stats['frames_sent']} frames sent, {stats['frames_skipped']} skipped, {stats['viewers_dropped']} viewers dropped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream ASCII movies to telnet/TCP viewers")
+    parser.add_argument("movies", nargs="*", help="Movie names under data/movies, or paths (default: every movie, most recent first)")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=2323, help="Port to listen on (default: 2323)")
+    timing = parser.add_mutually_exclusive_group()
+    timing.add_argument("--delay", type=float, default=0.4, help="Delay between frames in seconds (default: 0.4)")
+    timing.add_argument("--fps", type=float, help="Frames per second, as an alternative to --delay")
+    parser.add_argument("--card-seconds", type=float, default=3.0, help="Seconds each title, scene and end card is shown (default: 3)")
+    parser.add_argument("--loop", action="store_true", help="Play the movies again instead of disconnecting at the end")
+    parser.add_argument("--max-buffer-kb", type=float, default=64, help="Unsent output per viewer before their frames are skipped (default: 64)")
+    parser.add_argument("--drop-after", type=float, default=10.0, help="Disconnect viewers that have been skipping frames this many seconds (default: 10)")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between viewer statistics, 0 to disable (default: 10)")
+    args = parser.parse_args()
+
+    frame_delay = 1 / args.fps if args.fps else args.delay
+    main(args.movies, args.host, args.port, frame_delay, args.card_seconds, args.loop, args.max_buffer_kb, args.drop_after, args.stats_interval)
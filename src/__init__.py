@@ -1,18 +1,28 @@
 # src/__init__.py
 
-from .story_generator import generate_story, save_story
-from .frame_generator import generate_frames
-from .movie_player import play_movie
-from .utils import sanitize_dirname, create_movie_directory
-from .llm_config import create_llm_client, get_llm_completion
+import importlib
 
-__all__ = [
-    'generate_story',
-    'save_story',
-    'generate_frames',
-    'play_movie',
-    'sanitize_dirname',
-    'create_movie_directory',
-    'create_llm_client',
-    'get_llm_completion'
-]
+# Submodules are imported on first attribute access, so importing one module of the
+# package (e.g. the player's) doesn't load the generation stack and the provider SDKs
+_exports = {
+    'generate_story': '.story_generator',
+    'save_story': '.story_generator',
+    'generate_frames': '.frame_generator',
+    'play_movie': '.movie_player',
+    'sanitize_dirname': '.utils',
+    'create_movie_directory': '.utils',
+    'create_llm_client': '.llm_config',
+    'get_llm_completion': '.llm_config',
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_exports[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,253 @@
+# src/catalog.py
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from .movie_pack import PACK_EXTENSION, PackedMovie
+from .scene_manifest import read_manifest
+from .journal import JOURNAL_FILE, get_journal
+
+# Kept in its own subdirectory so catalog writes don't touch the data directory's mtime,
+# which refresh() uses to notice added or removed movies
+CATALOG_DIR = '.catalog'
+CATALOG_FILE = 'catalog.sqlite3'
+IGNORED_ENTRIES = {'debug_output'}
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+class MovieCatalog:
+    """
+    Persistent index of the movies in a data directory.
+
+    Keeps each movie's title, location, scene and frame counts, completeness (by frame
+    counts and, for journaled movies, by their generation journal) and modification time
+    in SQLite. Generation updates it as stories and frames are saved, so listing and
+    resuming don't have to scan every movie directory or read every journal.
+
+    :param data_dir: Directory holding the movies (e.g. data/movies)
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(data_dir, CATALOG_DIR), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(data_dir, CATALOG_DIR, CATALOG_FILE), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS movies (
+                name TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                path TEXT NOT NULL,
+                is_pack INTEGER NOT NULL DEFAULT 0,
+                scene_count INTEGER NOT NULL DEFAULT 0,
+                frame_count INTEGER NOT NULL DEFAULT 0,
+                expected_frames INTEGER NOT NULL DEFAULT 0,
+                complete INTEGER NOT NULL DEFAULT 0,
+                journal_complete INTEGER,
+                mtime REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS movies_mtime ON movies (mtime);
+            CREATE TABLE IF NOT EXISTS scenes (
+                name TEXT NOT NULL,
+                scene_number INTEGER NOT NULL,
+                frame_count INTEGER NOT NULL DEFAULT 0,
+                expected_frames INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (name, scene_number)
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def _update_totals(self, name, mtime):
+        scene_count, frame_count, expected_frames, incomplete = self._conn.execute("""
+            SELECT COUNT(*), COALESCE(SUM(frame_count), 0), COALESCE(SUM(expected_frames), 0),
+                   COALESCE(SUM(frame_count < expected_frames), 0)
+            FROM scenes WHERE name = ?
+        """, (name,)).fetchone()
+        self._conn.execute("""
+            UPDATE movies SET scene_count = ?, frame_count = ?, expected_frames = ?, complete = ?, mtime = ?
+            WHERE name = ?
+        """, (scene_count, frame_count, expected_frames, int(scene_count > 0 and incomplete == 0), mtime, name))
+
+    def record_story(self, movie_path, story_data, mtime=None):
+        # Add or refresh a movie's story; frame counts already recorded are kept
+        name = os.path.basename(movie_path.rstrip(os.sep))
+        mtime = mtime or time.time()
+        journal_complete = journal_state(movie_path)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("""
+                INSERT INTO movies (name, title, path, is_pack, journal_complete, mtime) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET title = excluded.title, path = excluded.path, is_pack = excluded.is_pack,
+                                                 journal_complete = excluded.journal_complete
+            """, (name, story_data.get('title', name), movie_path, int(name.endswith(PACK_EXTENSION)), journal_complete, mtime))
+            self._conn.execute("DELETE FROM scenes WHERE name = ? AND scene_number > ?", (name, len(story_data['scenes'])))
+            for scene_number, scene in enumerate(story_data['scenes'], 1):
+                self._conn.execute("""
+                    INSERT INTO scenes (name, scene_number, expected_frames) VALUES (?, ?, ?)
+                    ON CONFLICT (name, scene_number) DO UPDATE SET expected_frames = excluded.expected_frames
+                """, (name, scene_number, scene.get('num_frames', 0)))
+            self._update_totals(name, mtime)
+            self._conn.execute("COMMIT")
+
+    def record_frame(self, movie_path, scene_number, frame_number):
+        # Frames within a scene are saved in order, so the highest frame number is the count
+        name = os.path.basename(movie_path.rstrip(os.sep))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("""
+                INSERT INTO scenes (name, scene_number, frame_count) VALUES (?, ?, ?)
+                ON CONFLICT (name, scene_number) DO UPDATE SET frame_count = MAX(frame_count, excluded.frame_count)
+            """, (name, scene_number, frame_number))
+            self._update_totals(name, time.time())
+            self._conn.execute("COMMIT")
+
+    def record_journal(self, movie_path, complete):
+        # Kept in step with the journal's 'story' and 'complete' events by frame generation
+        name = os.path.basename(movie_path.rstrip(os.sep))
+        with self._lock:
+            self._conn.execute("UPDATE movies SET journal_complete = ?, mtime = ? WHERE name = ?", (int(complete), time.time(), name))
+
+    def _scan_movie(self, name):
+        path = os.path.join(self.data_dir, name)
+        if name.endswith(PACK_EXTENSION):
+            pack = PackedMovie(path)
+            try:
+                story_data = pack.story
+                # Held frames count once per tick, like a scene's num_frames
+                frame_counts = {
+                    scene: sum(pack.frame_holds(scene).get(frame_number, 1) for frame_number in pack.frame_numbers(scene))
+                    for scene in pack.scene_numbers()
+                }
+            finally:
+                pack.close()
+        else:
+            story_file = os.path.join(path, 'story.json')
+            if not os.path.isfile(story_file):
+                return
+            with open(story_file, 'r') as f:
+                story_data = json.load(f)
+            frame_counts = {}
+            for scene_number in range(1, len(story_data['scenes']) + 1):
+                scene_dir = os.path.join(path, f"scene_{scene_number:02d}")
+                manifest = read_manifest(path, scene_number)
+                if manifest is not None:
+                    frame_counts[scene_number] = sum(ticks for _, ticks in manifest)
+                elif os.path.isdir(scene_dir):
+                    frame_counts[scene_number] = len([f for f in os.listdir(scene_dir) if re.fullmatch(r'scene_\d+_frame_\d+\.txt', f)])
+
+        mtime = os.path.getmtime(path)
+        self.record_story(path, story_data, mtime)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for scene_number, frame_count in frame_counts.items():
+                self._conn.execute("""
+                    INSERT INTO scenes (name, scene_number, frame_count) VALUES (?, ?, ?)
+                    ON CONFLICT (name, scene_number) DO UPDATE SET frame_count = excluded.frame_count
+                """, (name, scene_number, frame_count))
+            self._update_totals(name, mtime)
+            self._conn.execute("COMMIT")
+
+    def refresh(self, force=False):
+        """
+        Bring the catalog in line with the data directory.
+
+        Only runs when the data directory itself changed (a movie was added, removed or
+        renamed), and then only scans the entries the catalog doesn't know yet.
+
+        :param force: Bool, rescan every movie
+        """
+        dir_mtime = repr(os.path.getmtime(self.data_dir))
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'data_dir_mtime'").fetchone()
+            known = {name for (name,) in self._conn.execute("SELECT name FROM movies")}
+        if not force and row is not None and row[0] == dir_mtime:
+            return
+
+        entries = {
+            d for d in os.listdir(self.data_dir)
+            if d not in IGNORED_ENTRIES and not d.startswith('.')
+            and (d.endswith(PACK_EXTENSION) or os.path.isdir(os.path.join(self.data_dir, d)))
+        }
+        for name in sorted(entries if force else entries - known):
+            self._scan_movie(name)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for name in known - entries:
+                self._conn.execute("DELETE FROM movies WHERE name = ?", (name,))
+                self._conn.execute("DELETE FROM scenes WHERE name = ?", (name,))
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('data_dir_mtime', ?)", (dir_mtime,))
+            self._conn.execute("COMMIT")
+
+    def list_movies(self, include_packs=True):
+        """
+        Return catalog entries, most recently modified first.
+
+        :return: List of dictionaries with name, title, path, is_pack, scene_count,
+                 frame_count, expected_frames, complete, journal_complete (None for
+                 packs and movies from before journaling) and mtime
+        """
+        self.refresh()
+        query = "SELECT * FROM movies" + ("" if include_packs else " WHERE is_pack = 0") + " ORDER BY mtime DESC"
+        with self._lock:
+            cursor = self._conn.execute(query)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def latest_movie(self, include_packs=False):
+        movies = self.list_movies(include_packs=include_packs)
+        return movies[0] if movies else None
+
+    def latest_unfinished_movie(self):
+        # Journaled movies go by their journal, older ones by their frame counts
+        self.refresh()
+        with self._lock:
+            cursor = self._conn.execute("""
+                SELECT * FROM movies WHERE is_pack = 0 AND COALESCE(journal_complete, complete) = 0
+                ORDER BY mtime DESC LIMIT 1
+            """)
+            columns = [column[0] for column in cursor.description]
+            row = cursor.fetchone()
+        return dict(zip(columns, row)) if row else None
+
+def journal_state(movie_path):
+    # 1 or 0 for a journaled movie directory, None for packs and movies from before journaling
+    if movie_path.endswith(PACK_EXTENSION) or not os.path.isfile(os.path.join(movie_path, JOURNAL_FILE)):
+        return None
+    return int(get_journal(movie_path).complete)
+
+def get_catalog(data_dir):
+    # One catalog per data directory, shared across threads
+    data_dir = os.path.abspath(data_dir)
+    with _catalogs_lock:
+        if data_dir not in _catalogs:
+            _catalogs[data_dir] = MovieCatalog(data_dir)
+        return _catalogs[data_dir]
+
+def get_movie_catalog(movie_path):
+    return get_catalog(os.path.dirname(os.path.abspath(movie_path.rstrip(os.sep))))
+
+def catalog_story(movie_path, story_data):
+    # Catalog updates during generation are best effort; the files on disk stay authoritative
+    try:
+        get_movie_catalog(movie_path).record_story(movie_path, story_data)
+    except sqlite3.Error as e:
+        print(f"Warning: could not update movie catalog: {str(e)}")
+
+def catalog_journal(movie_path, complete):
+    try:
+        get_movie_catalog(movie_path).record_journal(movie_path, complete)
+    except sqlite3.Error as e:
+        print(f"Warning: could not update movie catalog: {str(e)}")
+
+def catalog_frame(movie_path, scene_number, frame_number):
+    try:
+        get_movie_catalog(movie_path).record_frame(movie_path, scene_number, frame_number)
+    except sqlite3.Error as e:
+        print(f"Warning: could not update movie catalog: {str(e)}")
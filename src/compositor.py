@@ -0,0 +1,207 @@
+# src/compositor.py
+
+import time
+import textwrap
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from .terminal import diff_rows, move_to, HIDE_CURSOR
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+_compositors = {}
+_compositors_lock = threading.Lock()
+
+def border_frame(content, frame_width=70, frame_height=15):
+    """
+    Lay out a frame inside a border, padded from the top so its last lines (the dialogue)
+    sit at the bottom.
+
+    :param content: String, the frame as generated
+    :return: String of frame_height + 2 lines, each frame_width + 2 characters wide
+    """
+    frame_lines = content.split('\n')
+
+    # Truncate lines if they exceed the frame height
+    if len(frame_lines) > frame_height:
+        frame_lines = frame_lines[:frame_height]
+
+    adjusted_frame = ['+' + '-' * frame_width + '+']  # Top border
+
+    # Add padding lines above the content
+    for _ in range(frame_height - len(frame_lines)):
+        adjusted_frame.append('|' + ' ' * frame_width + '|')
+
+    for line in frame_lines:
+        adjusted_frame.append('|' + line.ljust(frame_width)[:frame_width] + '|')
+
+    adjusted_frame.append('+' + '-' * frame_width + '+')  # Bottom border
+    return '\n'.join(adjusted_frame)
+
+@lru_cache(maxsize=256)
+def compose_scene_intro(scene_title, description, caption, frame_width=70, frame_height=15):
+    """
+    Lay out a scene's title, description and caption as a bordered card.
+    """
+    adjusted_intro = ['+' + '-' * frame_width + '+']  # Top border
+    adjusted_intro.append('|' + scene_title.center(frame_width)[:frame_width] + '|')  # Centered Scene title
+    adjusted_intro.append('|' + '-' * frame_width + '|')  # Border line under the scene title
+
+    description = '\n'.join(textwrap.wrap(description, frame_width))
+    caption = '\n'.join(textwrap.wrap(caption, frame_width))
+    scene_intro_lines = description.split('\n') + [''] + caption.split('\n')
+
+    # Truncate lines if they exceed the frame height (-3 for title, border, and padding)
+    if len(scene_intro_lines) > (frame_height - 3):
+        scene_intro_lines = scene_intro_lines[:(frame_height - 3)]
+    total_lines = len(scene_intro_lines)
+
+    # Calculate padding to center the description/caption
+    padding_top = (frame_height - total_lines - 3) // 2
+    padding_bottom = frame_height - total_lines - padding_top - 3
+
+    for _ in range(padding_top):
+        adjusted_intro.append('|' + ' ' * frame_width + '|')
+    for line in scene_intro_lines:
+        adjusted_intro.append('|' + line.center(frame_width)[:frame_width] + '|')
+    for _ in range(padding_bottom):
+        adjusted_intro.append('|' + ' ' * frame_width + '|')
+
+    adjusted_intro.append('+' + '-' * frame_width + '+')  # Bottom border
+    return '\n'.join(adjusted_intro)
+
+@lru_cache(maxsize=64)
+def compose_goodbye(title, frame_width=70, frame_height=15):
+    """
+    Lay out the closing card, padded to the height of a bordered frame.
+    """
+    goodbye_frame = [
+        "+" + "-" * frame_width + "+",
+        "|" + " " * frame_width + "|",
+        "|" + "The End".center(frame_width) + "|",
+        "|" + " " * frame_width + "|",
+        "|" + "Thank you for watching".center(frame_width) + "|",
+        "|" + f"{title}".center(frame_width) + "|",
+        "|" + " " * frame_width + "|",
+        "+" + "-" * frame_width + "+",
+    ]
+
+    # Pad the goodbye frame to match frame_height
+    while len(goodbye_frame) < frame_height + 2:  # +2 for top and bottom border
+        if len(goodbye_frame) == frame_height + 1:
+            goodbye_frame.insert(-1, "|" + "-" * frame_width + "|")  # Adjust before the bottom border
+        else:
+            goodbye_frame.insert(-2, "|" + " " * frame_width + "|")
+    return '\n'.join(goodbye_frame)
+
+class ComposedFrame:
+    """
+    A bordered frame ready to be written: its text and rows for the renderer's state, the
+    full repaint as bytes and, once known, the change from the frame played before it as
+    a (previous key, bytes) pair.
+    """
+
+    __slots__ = ('key', 'text', 'rows', 'full', 'change')
+
+    def __init__(self, key, text):
+        self.key = key
+        self.text = text
+        self.rows = text.split('\n')
+        self.full = (HIDE_CURSOR + diff_rows(None, self.rows) + move_to(len(self.rows))).encode('utf-8')
+        self.change = None
+
+    def size(self):
+        return len(self.full) + (len(self.change[1]) if self.change else 0) + 2 * len(self.text)
+
+class FrameCompositor:
+    """
+    Bordered frames for one frame size, composed once and cached as bytes.
+
+    Entries are keyed by the movie source's frame_key (path, size and mtime of the frame
+    file, or of the pack), so a regenerated frame is composed again while replays and
+    loops only write what is cached. The least recently used entries are evicted beyond
+    max_bytes.
+
+    :param frame_width: Int, width inside the border
+    :param frame_height: Int, height inside the border
+    :param max_bytes: Int, approximate memory limit of the cache
+    """
+
+    def __init__(self, frame_width=70, frame_height=15, max_bytes=DEFAULT_CACHE_BYTES):
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.compose_seconds = 0.0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def _store(self, entry):
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.pop(entry.key, None)
+            if previous is not None:
+                self._bytes -= previous.size()
+            self._entries[entry.key] = entry
+            self._bytes += entry.size()
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size()
+
+    def frame(self, movie, scene_number, frame_number, previous=None):
+        """
+        Get a movie frame bordered and precomposed.
+
+        :param movie: Movie source from movie_source.open_movie
+        :param previous: ComposedFrame played just before this one, to precompose the change
+        :return: ComposedFrame
+        """
+        key = movie.frame_key(scene_number, frame_number)
+        entry = self._lookup(key)
+        if entry is None:
+            content = movie.frame(scene_number, frame_number)
+            start = time.perf_counter()
+            entry = ComposedFrame(key, border_frame(content, self.frame_width, self.frame_height))
+            self.compose_seconds += time.perf_counter() - start
+            self._store(entry)
+
+        if previous is not None and (entry.change is None or entry.change[0] != previous.key):
+            start = time.perf_counter()
+            change = (HIDE_CURSOR + diff_rows(previous.rows, entry.rows) + move_to(len(entry.rows))).encode('utf-8')
+            with self._lock:
+                if entry.key in self._entries:
+                    self._bytes -= entry.size()
+                    entry.change = (previous.key, change)
+                    self._bytes += entry.size()
+                else:
+                    entry.change = (previous.key, change)
+            self.compose_seconds += time.perf_counter() - start
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'compose_seconds': self.compose_seconds
+            }
+
+def get_compositor(frame_width=70, frame_height=15):
+    # One compositor per frame size, shared by every playback in the process
+    with _compositors_lock:
+        key = (frame_width, frame_height)
+        if key not in _compositors:
+            _compositors[key] = FrameCompositor(frame_width, frame_height)
+        return _compositors[key]
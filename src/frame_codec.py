@@ -0,0 +1,80 @@
+# src/frame_codec.py
+
+import lzma
+import zlib
+import struct
+
+# Length of each frame in a block's body
+RECORD_LENGTH = struct.Struct('<I')
+
+# Flags byte that starts a block record
+RECORD_BLOCK = 0x01
+RECORD_ZLIB = 0x02
+RECORD_LZMA = 0x04
+
+# Consecutive frames are nearly identical, and a compressor that sees a run of them in
+# one stream stores each frame as little more than back-references to the one before.
+# Compressing frames (or cell-level deltas between them) one at a time throws that away,
+# so frames are only ever compressed together, in blocks of frames.
+
+def length_prefixed(frames):
+    # Frames as one body of UTF-8 records, each preceded by its length
+    return b''.join(RECORD_LENGTH.pack(len(data)) + data for data in (frame.encode('utf-8') for frame in frames))
+
+def split_length_prefixed(body):
+    frames = []
+    offset = 0
+    while offset < len(body):
+        (length,) = RECORD_LENGTH.unpack_from(body, offset)
+        offset += RECORD_LENGTH.size
+        frames.append(bytes(body[offset:offset + length]).decode('utf-8'))
+        offset += length
+    return frames
+
+def encode_block(frames, compress='zlib'):
+    """
+    Encode a run of consecutive frames as one compressed block.
+
+    :param frames: List of frame strings, in order
+    :param compress: 'zlib' or 'lzma'
+    :return: Bytes of the block record: a flags byte followed by the compressed
+             length-prefixed frames
+    """
+    body = length_prefixed(frames)
+    if compress == 'lzma':
+        return bytes([RECORD_BLOCK | RECORD_LZMA]) + lzma.compress(body)
+    return bytes([RECORD_BLOCK | RECORD_ZLIB]) + zlib.compress(body, 9)
+
+def is_block_record(record):
+    return len(record) > 0 and bool(record[0] & RECORD_BLOCK)
+
+def decode_block(record):
+    """
+    Decode a block record.
+
+    :return: List of the block's frame strings, in order
+    """
+    flags, body = record[0], record[1:]
+    if flags & RECORD_LZMA:
+        body = lzma.decompress(body)
+    elif flags & RECORD_ZLIB:
+        body = zlib.decompress(body)
+    return split_length_prefixed(body)
+
+def encode_blocks(frames, gop=0, compress='zlib'):
+    """
+    Encode a scene's frames as one compressed block per group of pictures.
+
+    :param frames: List of frame strings, in order
+    :param gop: Int, frames per block (0: a single block for the scene)
+    :param compress: 'zlib' or 'lzma'
+    :return: List of records, one per frame: each group's first frame carries the block
+             and the other frames of the group get an empty record
+    """
+    size = gop if gop > 0 else max(1, len(frames))
+    records = []
+    for start in range(0, len(frames), size):
+        group = frames[start:start + size]
+        records.append(encode_block(group, compress))
+        records.extend(b'' for _ in group[1:])
+    return records
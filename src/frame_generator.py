@@ -2,9 +2,21 @@
 
 import os
 import json
+import re
 import time
-from .llm_config import get_llm_completion, get_ollama_json_completion
-from .utils import log_progress, error_exit
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .llm_config import get_llm_completion, get_ollama_json_completion, stream_llm_completion, StreamAborted
+from .frame_validator import FrameStreamValidator
+from .prompt_context import FrameContext
+from .rate_limit import estimate_tokens
+from .interpolation import interpolate_frames
+from .movie_pack import MoviePackWriter, pack_movie_directory
+from .catalog import catalog_frame, catalog_journal
+from .telemetry import call_tags
+from .journal import get_journal
+from .scene_manifest import manifest_path, manifest_content
+from .utils import atomic_write, log_progress, error_exit
 
 def create_frame_prompt(scene, frame_number, total_frames, ascii_art_height, frame_width, previous_frame=None):
     if frame_number == 1:
@@ -72,27 +84,103 @@ ASCII Art Guidelines:
 Only return the ASCII art frame, nothing else. No explanations or additional text.
 """
 
-def generate_and_save_frame(client, model, provider, scene, frame_number, total_frames, frame_width, frame_height, scene_number, caption, previous_frame):
-    caption_height = 2  # Reserve 2 lines for the caption
-    ascii_art_height = frame_height - caption_height
+def create_batch_frame_prompt(scene, first_frame_number, frame_count, total_frames, ascii_art_height, frame_width, previous_frame=None):
+    last_frame_number = first_frame_number + frame_count - 1
+    if previous_frame is None:
+        context = "This batch starts the animation, so the first frame sets up the scene in full detail."
+    else:
+        context = f"Previous frame:\n{previous_frame}"
+
+    return f"""Generate {frame_count} consecutive frames of a detailed ASCII art animation based on the following:
+
+{context}
+
+Scene: {scene['name']}
+Description: {scene['description']}
+Frames {first_frame_number} to {last_frame_number} of {total_frames}
+
+ASCII Art Guidelines:
+1. Each frame must be exactly {ascii_art_height} lines tall and {frame_width} characters wide.
+2. Use a variety of ASCII characters (@, #, $, %, &, *, =, +, :, ., -) for depth, texture and shading.
+3. Keep the composition and style consistent from one frame to the next.
+4. Make subtle changes between consecutive frames to create a smooth animation effect.
+5. Preserve the sense of foreground, midground, and background.
+6. Do not include any caption or text at the bottom of the ASCII art.
+
+Return only a JSON object of this form, with exactly {frame_count} frames in order:
+{{"frames": [["line 1 of frame {first_frame_number}", "line 2 of frame {first_frame_number}", ...], ...]}}
+Each frame is a list of its lines. No explanations or additional text.
+"""
+
+def create_frame_messages(scene, frame_number, total_frames, ascii_art_height, frame_width, previous_frame=None, context=None):
+    """
+    Build the messages for one frame, compacting the previous frame when a context is given.
 
+    :param context: FrameContext for the scene, or None for the full previous frame
+    :return: Tuple of (messages, estimated prompt tokens with the full previous frame)
+    """
     prompt = create_frame_prompt(scene, frame_number, total_frames, ascii_art_height, frame_width, previous_frame)
-    messages = [{"role": "user", "content": prompt}]
+    if context is None or context.mode == 'full' or previous_frame is None:
+        return [{"role": "user", "content": prompt}], estimate_tokens(prompt)
+    return context.messages(scene, frame_number, total_frames, ascii_art_height, frame_width, previous_frame), estimate_tokens(prompt)
+
+def stream_frame_art(client, provider, messages, frame_number, frame_width, ascii_art_height, scene_number, prompt_tags=None, refresh=False):
+    """
+    Stream a frame, cancelling the request as soon as the output overruns the frame
+    height, gets too wide or turns into prose, and retrying with a fresh request.
+    Frames are streamed as plain text on every provider, Ollama included: the validator
+    checks the art line by line, which it can't do inside a JSON string.
+
+    :param refresh: Bool, bypass the completion cache (see get_llm_completion)
+    :return: Validated ASCII art, or None if every attempt was aborted
+    """
+    attempts = int(os.getenv('LLM_STREAM_ATTEMPTS', '3'))
+    for attempt in range(1, attempts + 1):
+        validator = FrameStreamValidator(ascii_art_height, frame_width)
+        try:
+            # The last line is checked before the completion is cached, so a rejected
+            # frame isn't replayed by the next attempt or the non-streamed fallback
+            with call_tags(stage='frame', frame=frame_number, attempt=attempt, **(prompt_tags or {})):
+                stream_llm_completion(client, provider, messages, validator.feed, refresh=refresh, on_done=lambda content: validator.close())
+            return validator.art()
+        except StreamAborted as e:
+            reason = e.reason
+        log_progress(f"Frame {frame_number} of scene {scene_number} rejected after {validator.received} characters ({reason}), attempt {attempt}/{attempts}")
+    return None
+
+def generate_frame_art(client, provider, scene, frame_number, total_frames, frame_width, ascii_art_height, scene_number, previous_frame, stream=False, context=None, refresh=False):
+    messages, full_prompt_tokens = create_frame_messages(scene, frame_number, total_frames, ascii_art_height, frame_width, previous_frame, context)
+    # Estimated prompt size as sent, and as it would be with the full previous frame,
+    # for the telemetry summary
+    prompt_tags = {
+        'prompt_estimate': sum(estimate_tokens(m['content']) for m in messages),
+        'full_prompt_estimate': full_prompt_tokens
+    }
+
+    if stream:
+        try:
+            ascii_art = stream_frame_art(client, provider, messages, frame_number, frame_width, ascii_art_height, scene_number, prompt_tags, refresh)
+        except Exception as e:
+            error_exit(f"Error generating frame {frame_number} for scene {scene_number}: {str(e)}")
+        if ascii_art is not None:
+            return ascii_art
+        log_progress(f"Falling back to a non-streamed request for frame {frame_number} of scene {scene_number}")
     
     try:
-        if provider == 'ollama':
-            response = get_ollama_json_completion(client, messages)
-            #print(f"Raw Ollama response for frame {frame_number}:")
-            #print(json.dumps(response, indent=2))
-            
-            if isinstance(response, dict) and 'frame' in response:
-                ascii_art = response['frame']
-            elif isinstance(response, str):
-                ascii_art = response
+        with call_tags(stage='frame', frame=frame_number, **prompt_tags):
+            if provider == 'ollama':
+                response = get_ollama_json_completion(client, messages, refresh=refresh)
+                #print(f"Raw Ollama response for frame {frame_number}:")
+                #print(json.dumps(response, indent=2))
+
+                if isinstance(response, dict) and 'frame' in response:
+                    ascii_art = response['frame']
+                elif isinstance(response, str):
+                    ascii_art = response
+                else:
+                    raise ValueError(f"Unexpected response format from Ollama: {type(response)}")
             else:
-                raise ValueError(f"Unexpected response format from Ollama: {type(response)}")
-        else:
-            ascii_art = get_llm_completion(client, provider, messages)
+                ascii_art = get_llm_completion(client, provider, messages, refresh=refresh)
 
         #print(f"Generated ASCII art for frame {frame_number}:")
         #print(ascii_art)
@@ -102,53 +190,391 @@ def generate_and_save_frame(client, model, provider, scene, frame_number, total_
 
     # Remove triple backticks if present at the start of any line
     ascii_art_lines = ascii_art.splitlines()
-    cleaned_ascii_art = "\n".join(line for line in ascii_art_lines if not line.strip().startswith('```'))
+    return "\n".join(line for line in ascii_art_lines if not line.strip().startswith('```'))
 
+def compose_frame(ascii_art, frame_width, scene_number, caption):
     # Add caption at the bottom
     caption_line = f"Scene {scene_number}: {caption}"
     separator_line = "-" * frame_width
-    full_frame = f"{cleaned_ascii_art}\n{separator_line}\n{caption_line.center(frame_width)}"
+    return f"{ascii_art}\n{separator_line}\n{caption_line.center(frame_width)[:frame_width]}"
+
+def frame_art(frame):
+    # The ASCII art of a composed frame, without the separator and caption lines
+    return '\n'.join(frame.split('\n')[:-2])
 
-    filename = f"scene_{scene_number:02d}_frame_{frame_number:03d}.txt"
-    file_path = os.path.join(scene['output_dir'], filename)
+def frame_path(output_dir, scene_number, frame_number):
+    return os.path.join(output_dir, f"scene_{scene_number:02d}", f"scene_{scene_number:02d}_frame_{frame_number:03d}.txt")
+
+def save_frame(scene, scene_number, frame_number, full_frame, pack_writer=None, quiet=False):
+    movie_dir = os.path.dirname(scene['output_dir'])
+    file_path = frame_path(movie_dir, scene_number, frame_number)
+    filename = os.path.basename(file_path)
 
     try:
-        with open(file_path, "w") as f:
-            f.write(full_frame)
-        log_progress(f"Saved frame {frame_number} to {filename}")
+        # Only a frame that is completely on disk gets into the journal
+        atomic_write(file_path, full_frame)
+        get_journal(movie_dir).record_frame(scene_number, frame_number, file_path, full_frame)
+        if pack_writer is not None:
+            pack_writer.add_frame(scene_number, frame_number, full_frame)
+        if not quiet:
+            log_progress(f"Saved frame {frame_number} to {filename}")
     except IOError as e:
         error_exit(f"Error saving frame {frame_number} for scene {scene_number}: {str(e)}")
 
+    catalog_frame(movie_dir, scene_number, frame_number)
+
+def generate_and_save_frame(client, model, provider, scene, frame_number, total_frames, frame_width, frame_height, scene_number, caption, previous_frame, pack_writer=None, stream=False, context=None, refresh=False):
+    caption_height = 2  # Reserve 2 lines for the caption
+    ascii_art_height = frame_height - caption_height
+
+    ascii_art = generate_frame_art(client, provider, scene, frame_number, total_frames, frame_width, ascii_art_height, scene_number, previous_frame, stream, context, refresh)
+    full_frame = compose_frame(ascii_art, frame_width, scene_number, caption)
+    save_frame(scene, scene_number, frame_number, full_frame, pack_writer)
+
     return full_frame
 
-def generate_frames(story_data, output_dir, client, model, provider, frame_width=68, frame_height=14, resume=False):
-    for scene_number, scene in enumerate(story_data['scenes'], 1):
-        scene['output_dir'] = os.path.join(output_dir, f"scene_{scene_number:02d}")
-        os.makedirs(scene['output_dir'], exist_ok=True)
+def request_frame_batch(client, provider, scene, first_frame_number, frame_count, ascii_art_height, frame_width, previous_frame):
+    """
+    Request several consecutive frames in one structured response.
+
+    :return: List of frame_count cleaned ASCII art strings, or None if the batch is unusable
+    """
+    prompt = create_batch_frame_prompt(scene, first_frame_number, frame_count, scene['num_frames'], ascii_art_height, frame_width, previous_frame)
+    messages = [{"role": "user", "content": prompt}]
 
-        log_progress(f"Starting Scene {scene_number}: {scene['name']}")
-        log_progress(f"Number of frames: {scene['num_frames']}")
+    try:
+        with call_tags(stage='batch', frame=first_frame_number, frames=frame_count):
+            if provider == 'ollama':
+                response = get_ollama_json_completion(client, messages)
+            else:
+                content = get_llm_completion(client, provider, messages)
+                json_match = re.search(r'(\{.*\})', content, re.DOTALL)
+                response = json.loads(json_match.group(1)) if json_match else None
+    except Exception as e:
+        log_progress(f"Frame batch request failed: {str(e)}")
+        return None
+
+    if not isinstance(response, dict) or not isinstance(response.get('frames'), list):
+        return None
+    if len(response['frames']) < frame_count:
+        return None
+
+    frames = []
+    for frame in response['frames'][:frame_count]:
+        if isinstance(frame, list) and all(isinstance(line, str) for line in frame):
+            lines = frame
+        elif isinstance(frame, str):
+            lines = frame.splitlines()
+        else:
+            return None
+        lines = [line for line in lines if not line.strip().startswith('```')]
+        if not any(line.strip() for line in lines):
+            return None
+        frames.append("\n".join(lines[:ascii_art_height]))
+
+    return frames
+
+def generate_batched_scene(client, model, provider, scene, start_frame, frame_width, frame_height, scene_number, previous_frame, batch_size, pack_writer=None, stream=False, context=None):
+    caption_height = 2  # Reserve 2 lines for the caption
+    ascii_art_height = frame_height - caption_height
+    total_frames = scene['num_frames']
+
+    frame_number = start_frame
+    while frame_number <= total_frames:
+        frame_count = min(batch_size, total_frames - frame_number + 1)
+        frames = request_frame_batch(client, provider, scene, frame_number, frame_count, ascii_art_height, frame_width, previous_frame)
+
+        if frames is None:
+            log_progress(f"Batch for frames {frame_number}-{frame_number + frame_count - 1} of scene {scene_number} was unusable, falling back to single-frame calls")
+            for single_frame_number in range(frame_number, frame_number + frame_count):
+                frame = generate_and_save_frame(
+                    client, model, provider, scene, single_frame_number,
+                    total_frames, frame_width, frame_height,
+                    scene_number, scene['caption'], previous_frame, pack_writer, stream, context
+                )
+                previous_frame = frame_art(frame)
+        else:
+            for batch_frame_number, ascii_art in enumerate(frames, frame_number):
+                save_frame(scene, scene_number, batch_frame_number, compose_frame(ascii_art, frame_width, scene_number, scene['caption']), pack_writer)
+            previous_frame = frames[-1]
+
+        frame_number += frame_count
+
+def generate_keyframed_scene(client, provider, scene, start_frame, frame_width, frame_height, scene_number, previous_frame, keyframe_interval, pack_writer=None, stream=False, context=None):
+    caption_height = 2  # Reserve 2 lines for the caption
+    ascii_art_height = frame_height - caption_height
+    total_frames = scene['num_frames']
+
+    if start_frame == 1:
+        previous_frame = generate_frame_art(client, provider, scene, 1, total_frames, frame_width, ascii_art_height, scene_number, None, stream, context)
+        save_frame(scene, scene_number, 1, compose_frame(previous_frame, frame_width, scene_number, scene['caption']), pack_writer)
+        start_frame = 2
+
+    # Only every keyframe_interval-th frame comes from the LLM; the frames between two
+    # keyframes are interpolated locally and saved in order before the later keyframe,
+    # so a resume always restarts right after the last saved frame.
+    anchor_number = start_frame - 1
+    while anchor_number < total_frames:
+        keyframe_number = min(anchor_number + keyframe_interval, total_frames)
+        keyframe = generate_frame_art(client, provider, scene, keyframe_number, total_frames, frame_width, ascii_art_height, scene_number, previous_frame, stream, context)
+
+        steps = keyframe_number - anchor_number - 1
+        in_betweens = interpolate_frames(previous_frame, keyframe, steps, ascii_art_height, frame_width, seed=scene_number * 1000 + anchor_number)
+        for frame_number, ascii_art in enumerate(in_betweens, anchor_number + 1):
+            save_frame(scene, scene_number, frame_number, compose_frame(ascii_art, frame_width, scene_number, scene['caption']), pack_writer)
+        save_frame(scene, scene_number, keyframe_number, compose_frame(keyframe, frame_width, scene_number, scene['caption']), pack_writer)
+
+        previous_frame, anchor_number = keyframe, keyframe_number
+
+def normalize_scene_frames(scene, scene_number, frame_width, frame_height, regenerate=None, pack_writer=None, frame_count=None):
+    """
+    Bring a scene's saved frames to exactly frame_height lines of frame_width characters,
+    so players can draw them without fixing up lines, and regenerate malformed ones.
+
+    The scene's art is checked as one grid (see frame_normalizer.normalize_frames). A
+    frame that is blank, overruns the frame, isn't ASCII or contains prose is generated
+    again up to FRAME_REGENERATE_ATTEMPTS times (default 2), then kept as normalized.
+    Frames whose content changes are rewritten and journaled again.
+
+    :param regenerate: Callable(frame_number, previous_frame) generating and saving a
+                       replacement frame, or None to only pad and crop
+    :param frame_count: Int, number of frames saved (default: the scene's num_frames)
+    :return: List of the scene's normalized ASCII art, from frame 1
+    """
+    # NumPy is only needed here, so importing the generator or the player doesn't load it
+    from .frame_normalizer import normalize_frames
+
+    caption_height = 2  # Reserve 2 lines for the caption
+    ascii_art_height = frame_height - caption_height
+    movie_dir = os.path.dirname(scene['output_dir'])
+
+    contents = []
+    for frame_number in range(1, (frame_count or scene['num_frames']) + 1):
+        with open(frame_path(movie_dir, scene_number, frame_number), 'r') as f:
+            contents.append(f.read())
+    arts = [frame_art(content) for content in contents]
+    normalized, reasons = normalize_frames(arts, ascii_art_height, frame_width)
+
+    regenerated = 0
+    attempts = int(os.getenv('FRAME_REGENERATE_ATTEMPTS', '2')) if regenerate is not None else 0
+    for index, reason in enumerate(reasons):
+        frame_number = index + 1
+        if reason is not None and attempts:
+            regenerated += 1  # Frames, however many attempts they took
+        for attempt in range(1, attempts + 1):
+            if reason is None:
+                break
+            log_progress(f"Frame {frame_number} of scene {scene_number} is malformed ({reason}), regenerating, attempt {attempt}/{attempts}")
+            contents[index] = regenerate(frame_number, normalized[index - 1] if index else None)
+            (normalized[index],), (reason,) = normalize_frames([frame_art(contents[index])], ascii_art_height, frame_width)
+        if reason is not None:
+            log_progress(f"Keeping malformed frame {frame_number} of scene {scene_number} padded and cropped ({reason})")
+
+    rewritten = 0
+    for index, art in enumerate(normalized):
+        full_frame = compose_frame(art, frame_width, scene_number, scene['caption'])
+        if full_frame != contents[index]:
+            save_frame(scene, scene_number, index + 1, full_frame, pack_writer, quiet=True)
+            rewritten += 1
+    log_progress(f"Normalized scene {scene_number} to {frame_height}x{frame_width}: {rewritten} frames rewritten, {regenerated} regenerated")
+    return normalized
+
+def collapse_scene_holds(scene, scene_number, arts, frame_width, frame_height, hold_threshold=0):
+    """
+    Fold runs of near-identical frames into holds in the scene's manifest and delete the
+    frame files that are no longer played.
+
+    Frames the scene didn't get to (when generation stopped on a stalled model) are added
+    to the last frame's hold, so the scene keeps its length.
+
+    :param arts: List of the scene's normalized ASCII art, from frame 1
+    :param hold_threshold: Float, fraction of changed cells at or below which a frame is
+                           folded into the one before it (0: identical frames only)
+    :return: List of (frame number, ticks) pairs
+    """
+    from .frame_normalizer import load_art_grid, hold_runs
 
-        existing_frames = os.listdir(scene['output_dir']) if resume else []
-        start_frame = len(existing_frames) + 1 if resume else 1
+    caption_height = 2  # Reserve 2 lines for the caption
+    movie_dir = os.path.dirname(scene['output_dir'])
+    grid = load_art_grid(arts, frame_height - caption_height, frame_width)[0]
+    runs = [(index + 1, ticks) for index, ticks in hold_runs(grid, hold_threshold)]
+    last_frame, last_ticks = runs[-1]
+    runs[-1] = (last_frame, last_ticks + scene['num_frames'] - len(arts))
+
+    # The manifest is journaled before any frame is deleted, so a crash in between
+    # leaves extra files behind rather than a scene with missing frames
+    path = manifest_path(movie_dir, scene_number)
+    content = manifest_content(runs, hold_threshold)
+    try:
+        atomic_write(path, content)
+        get_journal(movie_dir).record_manifest(scene_number, path, content)
+    except IOError as e:
+        error_exit(f"Error saving the manifest for scene {scene_number}: {str(e)}")
 
-        previous_frame = None
-        if start_frame > 1:
+    kept = {frame_number for frame_number, _ in runs}
+    for frame_number in range(1, len(arts) + 1):
+        if frame_number not in kept:
             try:
-                with open(os.path.join(scene['output_dir'], f"scene_{scene_number:02d}_frame_{start_frame-1:03d}.txt"), 'r') as f:
-                    previous_frame = '\n'.join(f.read().split('\n')[:-3])  # Exclude the separator and caption
-            except IOError as e:
-                error_exit(f"Error reading previous frame for scene {scene_number}: {str(e)}")
-
-        for frame_number in range(start_frame, scene['num_frames'] + 1):
-            frame = generate_and_save_frame(
-                client, model, provider, scene, frame_number, 
-                scene['num_frames'], frame_width, frame_height, 
-                scene_number, scene['caption'], previous_frame
-            )
-            previous_frame = '\n'.join(frame.split('\n')[:-3])  # Exclude the separator and caption when passing to the next iteration
-
-        log_progress(f"Completed Scene {scene_number}: {scene['name']}")
+                os.remove(frame_path(movie_dir, scene_number, frame_number))
+            except FileNotFoundError:
+                pass
+    catalog_frame(movie_dir, scene_number, scene['num_frames'])
+
+    log_progress(f"Scene {scene_number}: {len(runs)} of {scene['num_frames']} frames stored, {scene['num_frames'] - len(runs)} shown as holds")
+    return runs
+
+def generate_scene_frames(story_data, output_dir, scene_number, client, model, provider, frame_width=68, frame_height=14, resume=False, keyframe_interval=1, batch_size=1, pack_writer=None, stream=False, context='full', normalize=False, hold_threshold=-1, stall_stop=0):
+    scene = story_data['scenes'][scene_number - 1]
+    scene['output_dir'] = os.path.join(output_dir, f"scene_{scene_number:02d}")
+    os.makedirs(scene['output_dir'], exist_ok=True)
+
+    if resume and get_journal(output_dir).scene_finished(scene_number):
+        log_progress(f"Scene {scene_number} is already complete")
+        return
+
+    log_progress(f"Starting Scene {scene_number}: {scene['name']}")
+    log_progress(f"Number of frames: {scene['num_frames']}")
+
+    start_frame, previous_frame = 1, None
+    if resume:
+        # Restart right after the last frame the journal vouches for; anything written
+        # after it (or a frame whose content no longer matches) is generated again
+        last_frame, content = get_journal(output_dir).last_good_frame(scene_number)
+        if last_frame:
+            log_progress(f"Resuming scene {scene_number} after frame {last_frame}")
+            previous_frame = frame_art(content)
+        start_frame = last_frame + 1
+
+    frame_context = FrameContext(context)
+    frame_count = scene['num_frames']  # Frames saved; fewer if a stalled model is stopped early
+
+    # Tag this scene's LLM calls for telemetry
+    with call_tags(scene=scene_number):
+        if keyframe_interval > 1:
+            generate_keyframed_scene(client, provider, scene, start_frame, frame_width, frame_height, scene_number, previous_frame, keyframe_interval, pack_writer, stream, frame_context)
+        elif batch_size > 1:
+            generate_batched_scene(client, model, provider, scene, start_frame, frame_width, frame_height, scene_number, previous_frame, batch_size, pack_writer, stream, frame_context)
+        else:
+            # Stopping early needs the manifest hold to keep the scene's length
+            stall_stop = stall_stop if normalize and hold_threshold >= 0 else 0
+            if stall_stop:
+                from .frame_normalizer import changed_fraction
+            unchanged, run_art = 0, None
+            for frame_number in range(start_frame, scene['num_frames'] + 1):
+                frame = generate_and_save_frame(
+                    client, model, provider, scene, frame_number, 
+                    scene['num_frames'], frame_width, frame_height, 
+                    scene_number, scene['caption'], previous_frame, pack_writer, stream, frame_context
+                )
+                if stall_stop:
+                    # The model keeps returning the same picture: stop paying for it and
+                    # hold the last frame for the rest of the scene instead
+                    # Compared with the frame the unchanged run started at, as holds are
+                    art = frame_art(frame)
+                    if run_art is not None and changed_fraction(run_art, art, frame_height - 2, frame_width) <= hold_threshold:
+                        unchanged += 1
+                    else:
+                        unchanged, run_art = 0, art
+                    if unchanged >= stall_stop and frame_number < scene['num_frames']:
+                        log_progress(f"Scene {scene_number} stalled after frame {frame_number} ({unchanged} frames without change), holding it for the remaining {scene['num_frames'] - frame_number} frames")
+                        frame_count = frame_number
+                        break
+                previous_frame = frame_art(frame)
+
+        if normalize:
+            def regenerate(frame_number, previous_frame):
+                # A cached completion would hand back the same malformed frame
+                return generate_and_save_frame(
+                    client, model, provider, scene, frame_number,
+                    scene['num_frames'], frame_width, frame_height,
+                    scene_number, scene['caption'], previous_frame, pack_writer, stream, frame_context, refresh=True
+                )
+            arts = normalize_scene_frames(scene, scene_number, frame_width, frame_height, regenerate, pack_writer, frame_count)
+            if hold_threshold >= 0 and arts:
+                collapse_scene_holds(scene, scene_number, arts, frame_width, frame_height, hold_threshold)
+
+    log_progress(f"Completed Scene {scene_number}: {scene['name']}")
+
+def adopt_legacy_frames(story_data, output_dir, journal):
+    # Movies started before journaling: trust the consecutive frame files from frame 1 of
+    # each scene once, so they resume where they stopped instead of starting over
+    adopted = 0
+    for scene_number, scene in enumerate(story_data['scenes'], 1):
+        for frame_number in range(1, scene['num_frames'] + 1):
+            file_path = frame_path(output_dir, scene_number, frame_number)
+            if not os.path.isfile(file_path):
+                break
+            with open(file_path, 'r') as f:
+                journal.record_frame(scene_number, frame_number, file_path, f.read())
+            adopted += 1
+    log_progress(f"No generation journal found, started one from {adopted} existing frames")
+
+def generate_frames(story_data, output_dir, client, model, provider, frame_width=68, frame_height=14, resume=False, workers=1, keyframe_interval=1, batch_size=1, pack_path=None, stream=False, context='full', scene_numbers=None, normalize=False, hold_threshold=-1, stall_stop=0):
+    """
+    Generate and save the frames of every scene.
+
+    :param scene_numbers: Iterable of scene numbers to generate, in order (default: all
+                          scenes). It may block until a scene is ready, so scenes can be
+                          generated while the rest of the story is still streaming in.
+    :param normalize: Bool, pad or crop each finished scene's frames to exactly
+                      frame_height x frame_width and regenerate malformed frames
+                      (default: frames are kept as generated)
+    :param hold_threshold: Float, fraction of changed cells at or below which a normalized
+                           frame is folded into a hold of the one before it and its file
+                           deleted (default: negative, every frame is kept)
+    :param stall_stop: Int, stop a scene after this many consecutive unchanged frames and
+                       hold the last one (0: never; single-frame generation only)
+    """
+    pack_writer = None
+    if pack_path:
+        if resume and not os.path.exists(pack_path):
+            pack_movie_directory(output_dir, pack_path)  # Bring frames from earlier runs into the pack
+        elif not resume and os.path.exists(pack_path):
+            os.remove(pack_path)  # A fresh run must not inherit an earlier run's story and frames
+        pack_writer = MoviePackWriter(pack_path, story_data)
+
+    journal = get_journal(output_dir)
+    if not resume:
+        journal.record_story(story_data)
+    elif journal.legacy:
+        adopt_legacy_frames(story_data, output_dir, journal)
+    catalog_journal(output_dir, complete=False)  # Lets --resume find the movie without reading its journal
+
+    if scene_numbers is None:
+        scene_numbers = range(1, len(story_data['scenes']) + 1)
+    scene_options = {'resume': resume, 'keyframe_interval': keyframe_interval, 'batch_size': batch_size, 'pack_writer': pack_writer, 'stream': stream, 'context': context,
+                     'normalize': normalize, 'hold_threshold': hold_threshold, 'stall_stop': stall_stop}
+
+    try:
+        if workers <= 1:
+            for scene_number in scene_numbers:
+                generate_scene_frames(story_data, output_dir, scene_number, client, model, provider, frame_width, frame_height, **scene_options)
+        else:
+            # Frames within a scene chain through previous_frame, but scenes are independent,
+            # so each scene runs as its own task and keeps its frames in order. Each task
+            # runs in a copy of the caller's context to keep its telemetry tags (e.g. job).
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(contextvars.copy_context().run, generate_scene_frames, story_data, output_dir, scene_number, client, model, provider, frame_width, frame_height, **scene_options)
+                    for scene_number in scene_numbers
+                ]
+                try:
+                    for future in as_completed(futures):
+                        future.result()  # Re-raise errors (including error_exit) from worker threads
+                except BaseException:
+                    # Don't start scenes still queued behind the failed one
+                    executor.shutdown(cancel_futures=True)
+                    raise
+        journal.record_complete()
+        catalog_journal(output_dir, complete=True)
+    finally:
+        if pack_writer is not None:
+            pack_writer.close()
+
+    if pack_path and normalize and hold_threshold >= 0:
+        # Frames went into the pack as they were generated; pack again so held frames are
+        # stored once and the pack carries the scenes' holds
+        pack_movie_directory(output_dir, pack_path)
 
     return output_dir
 
@@ -0,0 +1,124 @@
+# src/frame_normalizer.py
+
+import numpy as np
+from .frame_validator import is_prose
+
+SPACE = ord(' ')
+REPLACEMENT = ord('?')
+
+def load_art_grid(arts, height, width):
+    """
+    Load ASCII art blocks into one frames x rows x cols grid of character codes, padded
+    with spaces and cropped to height x width.
+
+    Empty lines before the art starts are dropped, as the stream validator does, and
+    tabs are expanded. Control characters become spaces and anything outside printable
+    ASCII becomes '?', so the grid fits in uint8.
+
+    :param arts: List of ASCII art strings
+    :return: Tuple of (grid, widths, extra_rows, replaced): grid is a uint8 array of shape
+             (frames, height, width), widths each row's width before cropping, extra_rows
+             the number of non-blank lines beyond height per frame, and replaced the
+             number of non-ASCII characters per frame
+    """
+    codes = np.full((len(arts), height, width), SPACE, dtype=np.uint32)
+    widths = np.zeros((len(arts), height), dtype=np.int64)
+    extra_rows = np.zeros(len(arts), dtype=np.int64)
+
+    for index, art in enumerate(arts):
+        lines = art.split('\n')
+        while lines and not lines[0]:
+            lines.pop(0)
+        extra_rows[index] = sum(1 for line in lines[height:] if line.strip())
+        for row, line in enumerate(lines[:height]):
+            line = line.rstrip('\r').expandtabs()
+            widths[index, row] = len(line.rstrip())
+            if line:
+                row_codes = np.frombuffer(line[:width].encode('utf-32-le'), dtype=np.uint32)
+                codes[index, row, :len(row_codes)] = row_codes
+
+    non_ascii = codes > 126
+    replaced = non_ascii.sum(axis=(1, 2))
+    codes = np.where(non_ascii, REPLACEMENT, codes)
+    codes = np.where(codes < SPACE, SPACE, codes)
+    return codes.astype(np.uint8), widths, extra_rows, replaced
+
+def grid_to_arts(grid):
+    # Each frame back to text, every line exactly as wide as the grid
+    frames, height, width = grid.shape
+    newlines = np.full((frames, height, 1), ord('\n'), dtype=np.uint8)
+    lines = np.concatenate([grid, newlines], axis=2)
+    return [lines[index].tobytes()[:-1].decode('ascii') for index in range(frames)]
+
+def validate_grid(grid, widths, extra_rows, replaced, arts, width_slack=None, max_replaced=0.1):
+    """
+    Find frames too malformed to keep after padding and cropping.
+
+    A frame is rejected if it is blank, has a line much wider than the grid or non-blank
+    lines below it, more than max_replaced of its characters outside ASCII, or a line of
+    prose. The limits match frame_validator.FrameStreamValidator.
+
+    :param arts: List of the ASCII art strings the grid was loaded from, for the prose check
+    :param width_slack: Int, extra characters tolerated per line (default: 10% of the width)
+    :return: List with a reason for each rejected frame, or None for frames that are fine
+    """
+    frames, height, width = grid.shape
+    width_slack = max(2, width // 10) if width_slack is None else width_slack
+
+    filled = (grid != SPACE).sum(axis=(1, 2))
+    widest_row = widths.argmax(axis=1)
+    widest = widths.max(axis=1)
+
+    reasons = []
+    for index in range(frames):
+        if filled[index] == 0:
+            reasons.append("blank frame")
+        elif widest[index] > width + width_slack:
+            reasons.append(f"line {widest_row[index] + 1} is {widest[index]} characters wide, expected {width}")
+        elif extra_rows[index]:
+            reasons.append(f"more than {height} lines")
+        elif replaced[index] > max_replaced * filled[index]:
+            reasons.append(f"{replaced[index]} characters outside ASCII")
+        else:
+            prose = next((line for line in arts[index].split('\n') if is_prose(line)), None)
+            reasons.append(f"prose instead of art: {prose.strip()[:40]!r}" if prose else None)
+    return reasons
+
+def changed_fraction(previous_art, art, height, width):
+    # Fraction of the grid's cells that differ between two ASCII art blocks
+    grid = load_art_grid([previous_art, art], height, width)[0]
+    return float((grid[0] != grid[1]).mean())
+
+def hold_runs(grid, threshold):
+    """
+    Fold near-identical consecutive frames into holds.
+
+    A frame joins the run before it if at most threshold of its cells differ from the
+    frame that started the run. Comparing with the start of the run, rather than with
+    the previous frame, keeps slow changes from disappearing one small step at a time.
+
+    :param grid: uint8 array of shape (frames, height, width), see load_art_grid
+    :param threshold: Float, fraction of changed cells
+    :return: List of (index of the frame shown, ticks it is held) pairs covering every frame
+    """
+    runs = []
+    for index in range(len(grid)):
+        if runs and (grid[index] != grid[runs[-1][0]]).mean() <= threshold:
+            runs[-1][1] += 1
+        else:
+            runs.append([index, 1])
+    return [(index, ticks) for index, ticks in runs]
+
+def normalize_frames(arts, height, width):
+    """
+    Bring ASCII art blocks to exactly height lines of width characters and check them.
+
+    :param arts: List of ASCII art strings, e.g. one scene's frames
+    :return: Tuple of (list of normalized ASCII art strings, list of rejection reasons
+             or None, as from validate_grid)
+    """
+    if not arts:
+        return [], []
+    grid, widths, extra_rows, replaced = load_art_grid(arts, height, width)
+    normalized = grid_to_arts(grid)
+    return normalized, validate_grid(grid, widths, extra_rows, replaced, arts)
@@ -0,0 +1,81 @@
+# src/frame_validator.py
+
+import re
+
+# Openers models use when they talk about the art instead of drawing it
+PROSE_OPENERS = re.compile(
+    r"^(here('s| is| are)\b|sure\b|certainly\b|of course\b|in this (frame|scene)\b|"
+    r"this (frame|ascii|art|scene|animation)\b|i('ve| have| hope| created)\b|note:|explanation:)",
+    re.IGNORECASE
+)
+
+def is_prose(line):
+    """
+    Heuristically decide whether a line is a sentence rather than a row of ASCII art.
+
+    Art rows are dominated by symbols and spacing; lettering in art (e.g. "C E N T U R Y")
+    is spaced out and doesn't read as words.
+    """
+    stripped = line.strip()
+    if not stripped:
+        return False
+    if PROSE_OPENERS.match(stripped):
+        return True
+    words = re.findall(r"[A-Za-z]{2,}", stripped)
+    letters = sum(1 for c in stripped if c.isalpha() or c in " ,'")
+    return len(words) >= 6 and letters >= 0.9 * len(stripped) and stripped[-1] in '.!?:'
+
+class FrameStreamValidator:
+    """
+    Check ASCII art line by line while a completion streams in.
+
+    feed() returns a reason as soon as the output can no longer become a valid frame:
+    a non-blank line beyond the frame height, a line much wider than the frame, or prose.
+    Code fence lines are ignored, as are empty lines before the art starts.
+
+    :param height: Int, lines of art in the frame
+    :param width: Int, characters per line
+    :param width_slack: Int, extra characters tolerated per line (default: 10% of the width)
+    """
+
+    def __init__(self, height, width, width_slack=None):
+        self.height = height
+        self.width = width
+        self.width_slack = max(2, width // 10) if width_slack is None else width_slack
+        self.lines = []
+        self.received = 0
+        self._pending = ''
+
+    def _check_line(self, line):
+        line = line.rstrip('\r')
+        if line.strip().startswith('```') or (not line and not self.lines):
+            return None
+        if is_prose(line):
+            return f"prose instead of art: {line.strip()[:40]!r}"
+        if len(line.rstrip()) > self.width + self.width_slack:
+            return f"line {len(self.lines) + 1} is {len(line.rstrip())} characters wide, expected {self.width}"
+        if line.strip() and len(self.lines) >= self.height:
+            return f"more than {self.height} lines"
+        self.lines.append(line)
+        return None
+
+    def feed(self, text):
+        self.received += len(text)
+        self._pending += text
+        *complete, self._pending = self._pending.split('\n')
+        for line in complete:
+            reason = self._check_line(line)
+            if reason:
+                return reason
+        # An unfinished line can already be too wide
+        if len(self._pending.rstrip()) > self.width + self.width_slack:
+            return f"line {len(self.lines) + 1} is wider than {self.width} characters"
+        return None
+
+    def close(self):
+        # Check the last line, which has no trailing newline
+        pending, self._pending = self._pending, ''
+        return self._check_line(pending) if pending else None
+
+    def art(self):
+        return "\n".join(self.lines[:self.height])
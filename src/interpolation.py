@@ -0,0 +1,64 @@
+# src/interpolation.py
+
+import random
+
+# Characters ordered from lightest to densest, used to blend shading between keyframes
+DENSITY_RAMP = " .:-=+*#%@"
+DENSITY_LEVELS = {char: level for level, char in enumerate(DENSITY_RAMP)}
+
+def to_grid(frame, height, width):
+    # Pad or crop the art block to an exact height x width character grid
+    lines = frame.split('\n')[:height] if frame else []
+    lines += [''] * (height - len(lines))
+    return [list(line.ljust(width)[:width]) for line in lines]
+
+def blend_cell(start_char, end_char, t, threshold):
+    start_level = DENSITY_LEVELS.get(start_char)
+    end_level = DENSITY_LEVELS.get(end_char)
+    if start_level is not None and end_level is not None:
+        # Both characters are shading: step through the intermediate densities
+        return DENSITY_RAMP[round(start_level + (end_level - start_level) * t)]
+    # Anything else dissolves from one character to the other at its own threshold
+    return end_char if t >= threshold else start_char
+
+def interpolate_frames(start_frame, end_frame, steps, height, width, seed=0):
+    """
+    Compute in-between frames for two keyframes on a character grid.
+
+    Only cells that differ between the keyframes change. Shading characters blend along
+    DENSITY_RAMP, other characters cross-fade as a dissolve in a fixed pseudo-random order
+    so each cell changes once and the transition stays stable from frame to frame.
+
+    :param start_frame: String, ASCII art of the earlier keyframe
+    :param end_frame: String, ASCII art of the later keyframe
+    :param steps: Int, number of in-between frames to produce
+    :param height: Int, lines in the art block
+    :param width: Int, characters per line in the art block
+    :param seed: Int, seed for the dissolve order
+    :return: List of ASCII art strings, excluding both keyframes
+    """
+    if steps <= 0:
+        return []
+
+    start_grid = to_grid(start_frame, height, width)
+    end_grid = to_grid(end_frame, height, width)
+
+    changed_cells = [
+        (row, col)
+        for row in range(height)
+        for col in range(width)
+        if start_grid[row][col] != end_grid[row][col]
+    ]
+    order = list(range(len(changed_cells)))
+    random.Random(seed).shuffle(order)
+    thresholds = {cell: (order[i] + 0.5) / len(changed_cells) for i, cell in enumerate(changed_cells)}
+
+    frames = []
+    for step in range(1, steps + 1):
+        t = step / (steps + 1)
+        grid = [row[:] for row in start_grid]
+        for (row, col), threshold in thresholds.items():
+            grid[row][col] = blend_cell(start_grid[row][col], end_grid[row][col], t, threshold)
+        frames.append('\n'.join(''.join(row).rstrip() for row in grid))
+
+    return frames
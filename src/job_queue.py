@@ -0,0 +1,127 @@
+# src/job_queue.py
+
+import json
+import time
+import sqlite3
+import threading
+
+JOB_STATUSES = ('pending', 'running', 'done', 'failed')
+
+class JobQueue:
+    """
+    Persistent queue of movie generation jobs in SQLite.
+
+    Each job keeps its status, attempt count, last error and, once its story exists, the
+    movie directory, so a job interrupted by a crash resumes its movie instead of starting
+    a new story. Every state change is a single transaction, so the queue survives the
+    runner being killed at any point.
+
+    :param path: Path of the queue database
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL UNIQUE,
+                topic TEXT NOT NULL,
+                options TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                movie_dir TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+        """)
+
+    def _execute(self, query, params=()):
+        # The connection is shared between worker threads, so results are read under the lock
+        with self._lock:
+            return self._conn.execute(query, params).rowcount
+
+    def _query(self, query, params=()):
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def add(self, key, topic, options=None):
+        """
+        Queue a job unless one with the same key exists, so re-adding an input file is harmless.
+
+        :return: True if the job was added
+        """
+        now = time.time()
+        return self._execute(
+            "INSERT OR IGNORE INTO jobs (key, topic, options, created, updated) VALUES (?, ?, ?, ?, ?)",
+            (key, topic, json.dumps(options or {}), now, now)
+        ) == 1
+
+    def recover(self):
+        # Jobs left running by a runner that died go back to the queue; their movie_dir is kept
+        return self._execute("UPDATE jobs SET status = 'pending', updated = ? WHERE status = 'running'", (time.time(),))
+
+    def retry_failed(self):
+        return self._execute("UPDATE jobs SET status = 'pending', attempts = 0, updated = ? WHERE status = 'failed'", (time.time(),))
+
+    def claim(self):
+        """
+        Atomically move the oldest pending job to running.
+
+        :return: Job dictionary, or None when nothing is pending
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT id FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated = ? WHERE id = ?",
+                        (time.time(), row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row[0]) if row is not None else None
+
+    def get(self, job_id):
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        job = rows[0]
+        job['options'] = json.loads(job['options'])
+        return job
+
+    def set_movie(self, job_id, movie_dir):
+        self._execute("UPDATE jobs SET movie_dir = ?, updated = ? WHERE id = ?", (movie_dir, time.time(), job_id))
+
+    def complete(self, job_id):
+        self._execute("UPDATE jobs SET status = 'done', error = NULL, updated = ? WHERE id = ?", (time.time(), job_id))
+
+    def fail(self, job_id, error, max_attempts=3):
+        # Requeue until the job has used up its attempts
+        self._execute(
+            "UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, error = ?, updated = ? WHERE id = ?",
+            (max_attempts, error, time.time(), job_id)
+        )
+        return self.get(job_id)['status']
+
+    def counts(self):
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update((row['status'], row['count']) for row in self._query("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status"))
+        return counts
+
+    def list_jobs(self, status=None):
+        query = "SELECT id, key, topic, status, attempts, movie_dir, error FROM jobs"
+        return self._query(query + (" WHERE status = ?" if status else "") + " ORDER BY id", (status,) if status else ())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,143 @@
+# src/journal.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+JOURNAL_FILE = 'journal.jsonl'
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class GenerationJournal:
+    """
+    Append-only record of a movie's generation progress.
+
+    Each line is one event: 'story' when a new story starts the movie, 'frame' once a
+    frame file has been written (with its path and a SHA-256 of its content), 'manifest'
+    once a scene is finished and its holds are written (see scene_manifest) and
+    'complete' when every scene is done. Events are fsynced before the call returns, so
+    the journal never claims a frame that isn't on disk; a torn last line from a crash is
+    ignored on load.
+
+    :param movie_dir: Directory of the movie
+    """
+
+    def __init__(self, movie_dir):
+        self.movie_dir = movie_dir
+        self.path = os.path.join(movie_dir, JOURNAL_FILE)
+        # Movies generated before journaling have frames but no journal
+        self.legacy = not os.path.exists(self.path)
+        self.frames = {}
+        self.manifests = {}
+        self.complete = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if self.legacy:
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partially written line
+                self._apply(event)
+
+    def _apply(self, event):
+        if event['event'] == 'story':
+            self.frames = {}
+            self.manifests = {}
+            self.complete = False
+        elif event['event'] == 'frame':
+            self.frames[(event['scene'], event['frame'])] = (event['path'], event['sha256'])
+            self.manifests.pop(event['scene'], None)  # The scene is being changed again
+        elif event['event'] == 'manifest':
+            self.manifests[event['scene']] = (event['path'], event['sha256'])
+        elif event['event'] == 'complete':
+            self.complete = True
+
+    def _append(self, event):
+        event = {'time': round(time.time(), 3), **event}
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(event) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.legacy = False
+            self._apply(event)
+
+    def record_story(self, story_data):
+        # A new story replaces whatever was generated in this directory before
+        self._append({'event': 'story', 'sha256': content_hash(json.dumps(story_data, sort_keys=True))})
+
+    def record_frame(self, scene_number, frame_number, path, content):
+        self._append({
+            'event': 'frame',
+            'scene': scene_number,
+            'frame': frame_number,
+            'path': os.path.relpath(path, self.movie_dir),
+            'sha256': content_hash(content)
+        })
+
+    def record_manifest(self, scene_number, path, content):
+        self._append({
+            'event': 'manifest',
+            'scene': scene_number,
+            'path': os.path.relpath(path, self.movie_dir),
+            'sha256': content_hash(content)
+        })
+
+    def record_complete(self):
+        self._append({'event': 'complete'})
+
+    def last_good_frame(self, scene_number):
+        """
+        Find where a scene can resume: the longest run of frames from frame 1 that are
+        recorded in the journal and whose files still match their recorded hash.
+
+        :return: Tuple of (last good frame number or 0, content of that frame or None)
+        """
+        with self._lock:
+            frames = dict(self.frames)
+
+        frame_number, content = 0, None
+        while (scene_number, frame_number + 1) in frames:
+            path, expected_hash = frames[(scene_number, frame_number + 1)]
+            try:
+                with open(os.path.join(self.movie_dir, path), 'r') as f:
+                    frame = f.read()
+            except IOError:
+                break
+            if content_hash(frame) != expected_hash:
+                break
+            frame_number, content = frame_number + 1, frame
+        return frame_number, content
+
+    def scene_finished(self, scene_number):
+        # A scene is done once its manifest is journaled and still on disk as recorded;
+        # frames folded into holds are deleted then, so last_good_frame would stop early
+        with self._lock:
+            entry = self.manifests.get(scene_number)
+        if entry is None:
+            return False
+        path, expected_hash = entry
+        try:
+            with open(os.path.join(self.movie_dir, path), 'r') as f:
+                return content_hash(f.read()) == expected_hash
+        except IOError:
+            return False
+
+def get_journal(movie_dir):
+    # One journal per movie directory, shared by the threads generating its scenes
+    movie_dir = os.path.abspath(movie_dir)
+    with _journals_lock:
+        if movie_dir not in _journals:
+            _journals[movie_dir] = GenerationJournal(movie_dir)
+        return _journals[movie_dir]
@@ -0,0 +1,129 @@
+# src/llm_cache.py
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_cache = None
+_cache_configured = False
+_configure_lock = threading.Lock()
+
+def normalize_messages(messages):
+    # Role case, surrounding whitespace and line endings don't change what the model sees
+    return [
+        {
+            'role': str(m.get('role', '')).strip().lower(),
+            'content': '\n'.join(line.rstrip() for line in str(m.get('content', '')).replace('\r\n', '\n').split('\n')).strip()
+        }
+        for m in messages
+    ]
+
+def make_cache_key(provider, model, temperature, messages, **options):
+    payload = {
+        'provider': provider,
+        'model': model,
+        'temperature': round(float(temperature), 4),
+        'messages': normalize_messages(messages),
+        'options': options
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+class CompletionCache:
+    """
+    SQLite-backed completion cache with size-based LRU eviction.
+
+    :param cache_dir: Directory holding the cache database
+    :param max_bytes: Int, total payload size kept before least recently used entries are evicted
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'completions.sqlite3')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS completions_lru ON completions (last_access)")
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        encoded = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, encoded, len(encoded), time.time())
+            )
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size
+        }
+
+def configure_completion_cache(cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Enable (or, with cache_dir=None, disable) the process-wide completion cache.
+
+    :param cache_dir: Directory for the cache database, or None
+    :param max_bytes: Int, size limit for LRU eviction
+    :return: CompletionCache or None
+    """
+    global _cache, _cache_configured
+    _cache = CompletionCache(cache_dir, max_bytes) if cache_dir else None
+    _cache_configured = True
+    return _cache
+
+def get_completion_cache():
+    # Fall back to LLM_CACHE_DIR / LLM_CACHE_MAX_MB when nothing was configured explicitly
+    with _configure_lock:
+        if not _cache_configured:
+            max_mb = float(os.getenv('LLM_CACHE_MAX_MB', DEFAULT_MAX_BYTES / (1024 * 1024)))
+            configure_completion_cache(os.getenv('LLM_CACHE_DIR') or None, int(max_mb * 1024 * 1024))
+    return _cache
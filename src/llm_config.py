@@ -1,103 +1,391 @@
 # src/llm_config.py
 
 import os
+import time
+import random
 import argparse
 import json
-from openai import OpenAI
-from anthropic import Anthropic
-from dotenv import load_dotenv
+from types import SimpleNamespace
+from email.utils import parsedate_to_datetime
+from .llm_cache import get_completion_cache, make_cache_key
+from .mock_llm import MockLLMClient
+from .telemetry import get_telemetry, usage_tokens, cached_prompt_tokens
+from .rate_limit import get_rate_limiter, estimate_tokens
+from .utils import log_progress
 
-# Load environment variables from .env file
-load_dotenv()
+_env_loaded = False
+
+class StreamAborted(Exception):
+    """A streamed completion was cancelled because its content failed validation."""
+
+    def __init__(self, reason, received):
+        super().__init__(f"Stream aborted after {received} characters: {reason}")
+        self.reason = reason
+        self.received = received
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors and overload
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+def load_environment():
+    # Load the .env file on first use rather than at import, so importing this module
+    # (e.g. from the player) doesn't pull in python-dotenv
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
 
 def create_llm_client(provider):
     """
     Create and return an LLM client based on the given provider.
+    Provider SDKs are imported here, on first use, since each takes hundreds of
+    milliseconds to import.
     
-    :param provider: String, 'openai', 'anthropic', or 'ollama'
+    :param provider: String, 'openai', 'anthropic', 'ollama', or 'mock'
     :return: LLM client
     """
+    load_environment()
     if provider == 'openai':
-        return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        from openai import OpenAI
+        # Retries are handled by call_llm, so the SDKs' own retries are turned off
+        return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
     elif provider == 'anthropic':
-        return Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        from anthropic import Anthropic
+        return Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0)
     elif provider == 'ollama':
+        from openai import OpenAI
         return OpenAI(
             base_url=os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434/v1'),
-            api_key='ollama'  # required, but unused for Ollama
+            api_key='ollama',  # required, but unused for Ollama
+            max_retries=0
         )
+    elif provider == 'mock':
+        return MockLLMClient()
     else:
         raise ValueError(f"Unsupported provider: {provider}")
 
-def get_llm_completion(client, provider, messages, temperature=0.7):
+def get_completion_model(provider):
+    """
+    Return the model name used for completions with the given provider.
+
+    :param provider: String, 'openai', 'anthropic', 'ollama', or 'mock'
+    :return: Model name
+    """
+    load_environment()
+    if provider == 'openai':
+        return os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    elif provider == 'anthropic':
+        return os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')
+    elif provider == 'ollama':
+        return os.getenv('OLLAMA_MODEL', 'llama2')
+    elif provider == 'mock':
+        return os.getenv('MOCK_LLM_MODEL', 'mock-ascii')
+    else:
+        raise ValueError(f"Unsupported provider: {provider}")
+
+def record_llm_call(provider, model, start, response=None, cached=False, error=None, retries=0):
+    # Telemetry is optional; scripts turn it on with configure_telemetry()
+    telemetry = get_telemetry()
+    if telemetry is None:
+        return
+    prompt_tokens, completion_tokens = usage_tokens(response) if response is not None else (None, None)
+    telemetry.record(provider, model, time.perf_counter() - start, prompt_tokens, completion_tokens, retries=retries, cached=cached, error=error,
+                     cached_prompt_tokens=cached_prompt_tokens(response) if response is not None else None)
+
+def get_retry_after(error):
+    """
+    Read the wait requested by the provider from a failed call's Retry-After headers.
+
+    :return: Float seconds, or None if the response didn't ask for one
+    """
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms') is not None:
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(error):
+    status_code = getattr(error, 'status_code', None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS
+    # SDK timeout and connection errors carry no status code
+    name = type(error).__name__
+    return 'Timeout' in name or 'Connection' in name
+
+def call_llm(provider, model, request, estimated_tokens):
+    """
+    Run one LLM request under the provider's rate limits, retrying transient failures.
+
+    Retryable errors (rate limits, timeouts, server errors) are retried with full-jitter
+    exponential backoff, waiting at least as long as the provider's Retry-After.
+    Each attempt is bounded by LLM_TIMEOUT seconds.
+
+    :param provider: String, 'openai', 'anthropic', 'ollama', or 'mock'
+    :param model: Model name, for telemetry
+    :param request: Function taking the timeout in seconds and returning the SDK response
+    :param estimated_tokens: Int, tokens reserved against the tokens/min limit before the call
+    :return: SDK response
+    """
+    max_retries = int(os.getenv('LLM_MAX_RETRIES', '5'))
+    timeout = float(os.getenv('LLM_TIMEOUT', '120'))
+    backoff_base = float(os.getenv('LLM_BACKOFF_BASE', '1'))
+    backoff_max = float(os.getenv('LLM_BACKOFF_MAX', '60'))
+    limiter = get_rate_limiter(provider)
+
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        limiter.acquire(estimated_tokens)
+        try:
+            response = request(timeout)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                record_llm_call(provider, model, start, error=str(e), retries=attempt)
+                raise
+            retry_after = get_retry_after(e)
+            delay = random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt))
+            if retry_after is not None:
+                limiter.pause(retry_after)
+                delay = max(delay, retry_after)
+            attempt += 1
+            log_progress(f"{provider} call failed ({str(e)}), retry {attempt}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        prompt_tokens, completion_tokens = usage_tokens(response)
+        if prompt_tokens is not None:
+            limiter.settle(estimated_tokens, prompt_tokens + (completion_tokens or 0))
+        record_llm_call(provider, model, start, response, retries=attempt)
+        return response
+
+def anthropic_request(messages):
+    """
+    Build the system and messages arguments for an Anthropic request.
+
+    System messages become the system prompt; the rest of the conversation is sent as a
+    single user turn.
+    """
+    system = [m for m in messages if m['role'] == 'system']
+    conversation = [m for m in messages if m['role'] != 'system']
+    prompt = "\n\n".join([f"{m['role'].capitalize()}: {m['content']}" for m in conversation])
+    request = {'messages': [{"role": "user", "content": prompt + "\n\nAssistant: "}]}
+    if system:
+        request['system'] = "\n\n".join(m['content'] for m in system)
+    return request
+
+def _cached_completion(cache, cache_key, refresh=False):
+    # A refresh drops the entry, so a rejected completion isn't replayed by later calls either
+    if refresh:
+        cache.delete(cache_key)
+        return None
+    return cache.get(cache_key)
+
+def get_llm_completion(client, provider, messages, temperature=0.7, refresh=False):
     """
     Get a completion from the LLM using the provided client.
+    Completions are served from the on-disk cache when one is configured.
     
-    :param client: LLM client (OpenAI, Anthropic, or Ollama)
-    :param provider: String, 'openai', 'anthropic', or 'ollama'
+    :param client: LLM client (OpenAI, Anthropic, Ollama, or mock)
+    :param provider: String, 'openai', 'anthropic', 'ollama', or 'mock'
     :param messages: List of message dictionaries
     :param temperature: Float, temperature for generation
+    :param refresh: Bool, evict the cached completion and ask the model again
     :return: Generated content
     """
-    if provider == 'openai':
-        model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
-        response = client.chat.completions.create(
+    model = get_completion_model(provider)
+    start = time.perf_counter()
+    cache = get_completion_cache()
+    if cache is not None:
+        cache_key = make_cache_key(provider, model, temperature, messages)
+        cached = _cached_completion(cache, cache_key, refresh)
+        if cached is not None:
+            record_llm_call(provider, model, start, cached=True)
+            return cached
+
+    prompt_tokens = sum(estimate_tokens(str(m['content'])) for m in messages)
+    if provider in ('openai', 'ollama', 'mock'):
+        response = call_llm(provider, model, lambda timeout: client.chat.completions.create(
             model=model,
             messages=messages,
-            temperature=temperature
-        )
-        return response.choices[0].message.content
+            temperature=temperature,
+            timeout=timeout
+        ), prompt_tokens)
+        content = response.choices[0].message.content
     elif provider == 'anthropic':
-        model = os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')
-        prompt = "\n\n".join([f"{m['role'].capitalize()}: {m['content']}" for m in messages])
-        prompt += "\n\nAssistant: "
-        response = client.messages.create(
+        max_tokens = int(os.getenv('ANTHROPIC_MAX_TOKENS', '1000'))
+        response = call_llm(provider, model, lambda timeout: client.messages.create(
             model=model,
-            max_tokens=int(os.getenv('ANTHROPIC_MAX_TOKENS', '1000')),
+            max_tokens=max_tokens,
             temperature=temperature,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.content[0].text
-    elif provider == 'ollama':
-        model = os.getenv('OLLAMA_MODEL', 'llama2')
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature
-        )
-        return response.choices[0].message.content
+            timeout=timeout,
+            **anthropic_request(messages)
+        ), prompt_tokens + max_tokens)
+        content = response.content[0].text
+
+    if cache is not None:
+        cache.put(cache_key, content)
+    return content
+
+def _stream_text(provider, stream, usage):
+    # Yield text deltas from an SDK stream, collecting token usage as it is reported
+    if provider == 'anthropic':
+        for event in stream:
+            if event.type == 'message_start':
+                usage['prompt_tokens'] = event.message.usage.input_tokens
+                usage['cache_read_input_tokens'] = getattr(event.message.usage, 'cache_read_input_tokens', None)
+            elif event.type == 'content_block_delta' and getattr(event.delta, 'text', None):
+                yield event.delta.text
+            elif event.type == 'message_delta':
+                usage['completion_tokens'] = event.usage.output_tokens
     else:
-        raise ValueError(f"Unsupported provider: {provider}")
+        for chunk in stream:
+            if getattr(chunk, 'usage', None) is not None:
+                usage['prompt_tokens'] = chunk.usage.prompt_tokens
+                usage['completion_tokens'] = chunk.usage.completion_tokens
+                usage['prompt_tokens_details'] = getattr(chunk.usage, 'prompt_tokens_details', None)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+def _close_stream(stream):
+    # openai's Stream (1.3.0) has no close(); closing its HTTP response is what stops it
+    close = getattr(stream, 'close', None)
+    if close is None:
+        close = stream.response.close
+    close()
 
-def get_ollama_json_completion(client, messages, temperature=0.7):
+def stream_llm_completion(client, provider, messages, on_text, temperature=0.7, json_mode=False, refresh=False, on_done=None):
+    """
+    Stream a completion, handing each piece of text to on_text as it arrives.
+    If on_text returns a reason, the request is cancelled and StreamAborted is raised,
+    so no more tokens are generated or paid for. Only completions that ran to the end
+    and that on_done accepted are cached.
+
+    :param client: LLM client (OpenAI, Anthropic, Ollama, or mock)
+    :param provider: String, 'openai', 'anthropic', 'ollama', or 'mock'
+    :param messages: List of message dictionaries
+    :param on_text: Function taking a text delta and returning None or an abort reason
+    :param temperature: Float, temperature for generation
+    :param json_mode: Bool, ask Ollama for a JSON object as get_ollama_json_completion
+                      does (other providers are prompted for JSON instead)
+    :param refresh: Bool, evict the cached completion and ask the model again
+    :param on_done: Function taking the whole content and returning None or a reason to
+                    reject it, which raises StreamAborted
+    :return: Generated content
+    """
+    model = get_completion_model(provider)
+    start = time.perf_counter()
+    response_format = {"type": "json_object"} if json_mode and provider == 'ollama' else None
+    cache = get_completion_cache()
+    if cache is not None:
+        # get_ollama_json_completion caches the parsed object, so streamed JSON gets its own key
+        options = {'response_format': 'json_object', 'streamed': True} if response_format else {}
+        cache_key = make_cache_key(provider, model, temperature, messages, **options)
+        cached = _cached_completion(cache, cache_key, refresh)
+        if cached is not None:
+            reason = on_text(cached) or (on_done(cached) if on_done else None)
+            if reason:
+                cache.delete(cache_key)
+                raise StreamAborted(reason, len(cached))
+            record_llm_call(provider, model, start, cached=True)
+            return cached
+
+    max_tokens = int(os.getenv('ANTHROPIC_MAX_TOKENS', '1000')) if provider == 'anthropic' else 0
+
+    def request(timeout):
+        if provider == 'anthropic':
+            stream = client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                timeout=timeout,
+                **anthropic_request(messages)
+            )
+        else:
+            options = {'response_format': response_format} if response_format else {}
+            stream = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                timeout=timeout,
+                **options
+            )
+
+        parts = []
+        usage = {}
+        try:
+            for text in _stream_text(provider, stream, usage):
+                parts.append(text)
+                reason = on_text(text)
+                if reason:
+                    raise StreamAborted(reason, sum(len(part) for part in parts))
+        finally:
+            _close_stream(stream)  # Closing the connection is what stops generation server-side
+        return SimpleNamespace(content=''.join(parts), usage=SimpleNamespace(**usage) if usage else None)
+
+    prompt_tokens = sum(estimate_tokens(str(m['content'])) for m in messages)
+    content = call_llm(provider, model, request, prompt_tokens + max_tokens).content
+    reason = on_done(content) if on_done else None
+    if reason:
+        raise StreamAborted(reason, len(content))
+
+    if cache is not None:
+        cache.put(cache_key, content)
+    return content
+
+def get_ollama_json_completion(client, messages, temperature=0.7, refresh=False):
     """
     Get a JSON completion from Ollama using the provided client.
+    Completions are served from the on-disk cache when one is configured.
     
     :param client: OpenAI client configured for Ollama
     :param messages: List of message dictionaries
     :param temperature: Float, temperature for generation
+    :param refresh: Bool, evict the cached completion and ask the model again
     :return: Generated JSON content or string
     """
-    model = os.getenv('OLLAMA_MODEL', 'llama2')
-    response = client.chat.completions.create(
+    model = get_completion_model('ollama')
+    start = time.perf_counter()
+    cache = get_completion_cache()
+    if cache is not None:
+        cache_key = make_cache_key('ollama', model, temperature, messages, response_format='json_object')
+        cached = _cached_completion(cache, cache_key, refresh)
+        if cached is not None:
+            record_llm_call('ollama', model, start, cached=True)
+            return cached
+
+    prompt_tokens = sum(estimate_tokens(str(m['content'])) for m in messages)
+    response = call_llm('ollama', model, lambda timeout: client.chat.completions.create(
         model=model,
         messages=messages,
         temperature=temperature,
-        response_format={"type": "json_object"}
-    )
+        response_format={"type": "json_object"},
+        timeout=timeout
+    ), prompt_tokens)
     content = response.choices[0].message.content
     try:
-        return json.loads(content)
+        result = json.loads(content)
     except json.JSONDecodeError:
         print("Warning: Ollama response is not valid JSON. Returning raw string.")
         print(content)
-        return content
+        return content  # Don't cache output that failed to parse
+
+    if cache is not None:
+        cache.put(cache_key, result)
+    return result
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Generate a movie script using an LLM.")
-    parser.add_argument("--provider", choices=['openai', 'anthropic', 'ollama'], required=True, help="LLM provider to use")
+    parser.add_argument("--provider", choices=['openai', 'anthropic', 'ollama', 'mock'], required=True, help="LLM provider to use")
     parser.add_argument("--topic", required=True, help="Topic for the movie script")
     return parser.parse_args()
 
@@ -0,0 +1,246 @@
+# src/mock_llm.py
+
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from .rate_limit import estimate_tokens
+
+# Characters used for the generated art, from background to foreground
+MOCK_PALETTE = " .:-=+*#%@"
+
+class _ErrorResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+class MockLLMError(Exception):
+    """Simulated provider failure, shaped like an SDK error with an HTTP status and response headers."""
+
+    def __init__(self, message, status_code=503, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = _ErrorResponse({} if retry_after is None else {'retry-after': str(retry_after)})
+
+class _Message:
+    def __init__(self, content):
+        self.role = 'assistant'
+        self.content = content
+
+class _Choice:
+    def __init__(self, content):
+        self.index = 0
+        self.message = _Message(content)
+        self.finish_reason = 'stop'
+
+class _Usage:
+    def __init__(self, prompt_tokens, completion_tokens):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = prompt_tokens + completion_tokens
+
+class _Delta:
+    def __init__(self, content):
+        self.content = content
+
+class _StreamChoice:
+    def __init__(self, content):
+        self.index = 0
+        self.delta = _Delta(content)
+
+class _Chunk:
+    def __init__(self, content=None, usage=None):
+        self.choices = [_StreamChoice(content)] if content is not None else []
+        self.usage = usage
+
+class _Stream:
+    """Chunked response: a short wait for the first token, then the rest of the latency spread across lines."""
+
+    def __init__(self, client, content, prompt_tokens, delay, start):
+        self._client = client
+        self._content = content
+        self._prompt_tokens = prompt_tokens
+        self._delay = delay
+        self._start = start
+        self._closed = False
+        self.chars_sent = 0
+
+    def __iter__(self):
+        pieces = self._content.splitlines(keepends=True) or ['']
+        time.sleep(self._delay * 0.2)
+        for piece in pieces:
+            if self._closed:
+                return
+            time.sleep(self._delay * 0.8 / len(pieces))
+            self.chars_sent += len(piece)
+            yield _Chunk(piece)
+        yield _Chunk(usage=_Usage(self._prompt_tokens, estimate_tokens(self._content)))
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._client._stream_closed(self, self._start)
+
+class _Response:
+    def __init__(self, model, content, prompt_tokens):
+        self.model = model
+        self.choices = [_Choice(content)]
+        self.usage = _Usage(prompt_tokens, estimate_tokens(content))
+
+def mock_art(seed, frame_number, height, width):
+    # A layered landscape whose waves drift one column per frame
+    rng = random.Random(seed)
+    horizon = rng.randint(height // 3, height // 2)
+    phase = rng.random() * 6.28
+    rows = []
+    for row in range(height):
+        cells = []
+        for col in range(width):
+            wave = (col + frame_number + int(3 * (1 + ((phase + row) % 1)))) % (7 + row % 5)
+            if row < horizon:
+                char = '*' if (col * 7 + row * 13 + int(phase * 10)) % 29 == 0 else ' '
+            else:
+                depth = (row - horizon) * (len(MOCK_PALETTE) - 1) // max(1, height - horizon)
+                char = MOCK_PALETTE[max(1, depth - (1 if wave == 0 else 0))]
+            cells.append(char)
+        rows.append(''.join(cells).rstrip())
+    return '\n'.join(rows)
+
+def mock_story(seed, topic):
+    rng = random.Random(seed)
+    subject = topic or rng.choice(["Clockwork Tides", "The Last Lighthouse", "Orbit of Embers"])
+    scenes = [
+        {
+            "name": f"{subject} - Part {number}",
+            "description": f"Part {number} of a story about {subject.lower()}.",
+            "caption": f"The story of {subject.lower()} continues.",
+            "num_frames": rng.randint(5, 15)
+        }
+        for number in range(1, rng.randint(5, 8) + 1)
+    ]
+    return {
+        "title": f"The {subject.title()} Chronicle",
+        "topic": topic or "",
+        "synopsis": f"A short deterministic story about {subject.lower()}, generated by the mock provider.",
+        "scenes": scenes
+    }
+
+class _Completions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model, messages, temperature=0.7, response_format=None, timeout=None, stream=False, **kwargs):
+        return self._client._complete(model, messages, temperature, response_format, timeout, stream)
+
+class _Chat:
+    def __init__(self, client):
+        self.completions = _Completions(client)
+
+class MockLLMClient:
+    """
+    In-process stand-in for an OpenAI-style chat client.
+
+    Output is a pure function of the prompt and seed: story prompts get a valid story,
+    frame prompts get ASCII art of the requested size, batch prompts get {"frames": [...]}.
+    Latency, jitter and failure rate are configurable to exercise the generation pipeline
+    without a live model. Failures are split between 429s carrying a Retry-After and 503s,
+    and calls slower than the request timeout fail with a 408. A fraction of frame responses
+    can be made invalid (prose before the art, or too many lines) to exercise validation.
+
+    :param latency: Float, seconds per call (default: $MOCK_LLM_LATENCY or 0.05)
+    :param jitter: Float, extra uniformly random seconds per call (default: $MOCK_LLM_JITTER or 0)
+    :param failure_rate: Float, fraction of calls that raise MockLLMError (default: $MOCK_LLM_FAILURE_RATE or 0)
+    :param seed: Int, seed for output, latency and failures (default: $MOCK_LLM_SEED or 0)
+    :param retry_after: Float, Retry-After seconds sent with simulated 429s (default: $MOCK_LLM_RETRY_AFTER or 1)
+    :param bad_frame_rate: Float, fraction of frame responses that are invalid (default: $MOCK_LLM_BAD_FRAME_RATE or 0)
+    """
+
+    def __init__(self, latency=None, jitter=None, failure_rate=None, seed=None, retry_after=None, bad_frame_rate=None):
+        self.latency = float(os.getenv('MOCK_LLM_LATENCY', '0.05')) if latency is None else latency
+        self.jitter = float(os.getenv('MOCK_LLM_JITTER', '0')) if jitter is None else jitter
+        self.failure_rate = float(os.getenv('MOCK_LLM_FAILURE_RATE', '0')) if failure_rate is None else failure_rate
+        self.seed = int(os.getenv('MOCK_LLM_SEED', '0')) if seed is None else seed
+        self.retry_after = float(os.getenv('MOCK_LLM_RETRY_AFTER', '1')) if retry_after is None else retry_after
+        self.bad_frame_rate = float(os.getenv('MOCK_LLM_BAD_FRAME_RATE', '0')) if bad_frame_rate is None else bad_frame_rate
+        self.chat = _Chat(self)
+        self.calls = 0
+        self.failures = 0
+        self.chars_sent = 0
+        self.call_seconds = []
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def _prompt_seed(self, prompt):
+        return int(hashlib.sha256(f"{self.seed}:{prompt}".encode('utf-8')).hexdigest()[:16], 16)
+
+    def _content(self, prompt, response_format, bad_frame=None):
+        prompt_seed = self._prompt_seed(prompt)
+        json_mode = bool(response_format) and response_format.get('type') == 'json_object'
+
+        if 'JSON template' in prompt:
+            topic = re.search(r'The topic is: (.+)', prompt)
+            return json.dumps(mock_story(prompt_seed, topic.group(1).strip() if topic else None), indent=2)
+
+        size = re.search(r'exactly (\d+) lines tall and (\d+) characters wide', prompt)
+        height, width = (int(size.group(1)), int(size.group(2))) if size else (12, 68)
+        scene = re.search(r'Scene: (.+)', prompt)
+        scene_seed = self._prompt_seed(scene.group(1) if scene else '')
+
+        batch = re.search(r'Frames (\d+) to (\d+) of', prompt)
+        if batch:
+            frames = [mock_art(scene_seed, number, height, width).split('\n') for number in range(int(batch.group(1)), int(batch.group(2)) + 1)]
+            return json.dumps({"frames": frames})
+
+        frame = re.search(r'Frame (\d+) of', prompt)
+        if frame:
+            art = mock_art(scene_seed, int(frame.group(1)), height, width)
+            if bad_frame == 'prose':
+                art = "Here's the next frame of the animation, with the waves moving to the right:\n\n" + art
+            elif bad_frame == 'overrun':
+                art = '\n'.join([art] * 3)
+            return json.dumps({"frame": art}) if json_mode else art
+
+        return json.dumps({"response": "mock"}) if json_mode else f"Mock response to a {len(prompt)} character prompt."
+
+    def _complete(self, model, messages, temperature, response_format, timeout=None, stream=False):
+        start = time.perf_counter()
+        prompt = "\n\n".join(str(m.get('content', '')) for m in messages)
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            fail = self._rng.random() < self.failure_rate
+            rate_limited = self._rng.random() < 0.5
+            bad_frame = self._rng.choice(('prose', 'overrun')) if self._rng.random() < self.bad_frame_rate else None
+
+        error = None
+        if timeout is not None and delay > timeout:
+            delay, error = timeout, MockLLMError("Simulated mock request timeout", status_code=408)
+        elif fail and rate_limited:
+            error = MockLLMError("Simulated mock rate limit", status_code=429, retry_after=self.retry_after)
+        elif fail:
+            error = MockLLMError("Simulated mock provider failure", status_code=503)
+
+        if error is not None:
+            time.sleep(delay)
+            with self._lock:
+                self.failures += 1
+                self.call_seconds.append(time.perf_counter() - start)
+            raise error
+
+        prompt_tokens = sum(estimate_tokens(str(m.get('content', ''))) for m in messages)
+        content = self._content(prompt, response_format, bad_frame)
+        if stream:
+            return _Stream(self, content, prompt_tokens, delay, start)
+
+        time.sleep(delay)
+        with self._lock:
+            self.chars_sent += len(content)
+            self.call_seconds.append(time.perf_counter() - start)
+        return _Response(model, content, prompt_tokens)
+
+    def _stream_closed(self, stream, start):
+        with self._lock:
+            self.chars_sent += stream.chars_sent
+            self.call_seconds.append(time.perf_counter() - start)
@@ -0,0 +1,243 @@
+# src/movie_pack.py
+
+import os
+import re
+import json
+import mmap
+import struct
+import threading
+from .frame_codec import encode_blocks, decode_block, is_block_record
+from .scene_manifest import read_manifest
+
+PACK_EXTENSION = '.asciimov'
+PACK_MAGIC = b'ASCIIMOV'
+PACK_VERSION = 1
+
+# Payloads are frame_codec blocks, each holding a run of frames compressed together,
+# instead of plain frame text
+PACK_FLAG_BLOCKS = 0x0001
+
+# magic, version, flags, story length, frame count, index offset
+HEADER = struct.Struct('<8sHHIIQ')
+# scene number, frame number, payload offset, payload length
+INDEX_ENTRY = struct.Struct('<HHQI')
+
+def is_pack_file(path):
+    return path.endswith(PACK_EXTENSION) and os.path.isfile(path)
+
+class MoviePackWriter:
+    """
+    Write frames into a single-file movie pack.
+
+    Layout: a fixed header, the story JSON, the concatenated frame payloads and a
+    fixed-size index of (scene, frame, offset, length) entries sorted by scene and frame.
+    The index sits after the payloads so frames can be appended as they are generated.
+    By default it and the header are rewritten after every frame, so the pack is readable
+    after each completed frame and can be reopened later to resume.
+
+    :param path: Path of the .asciimov file
+    :param story_data: Dictionary with the story, stored when the pack is created
+    :param flags: Int, PACK_FLAG_* bits stored when the pack is created
+    """
+
+    def __init__(self, path, story_data, flags=0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+
+        if os.path.exists(path):
+            self._file = open(path, 'r+b')
+            header = HEADER.unpack(self._file.read(HEADER.size))
+            if header[0] != PACK_MAGIC:
+                raise ValueError(f"Not a movie pack: {path}")
+            self.flags, frame_count, self._index_offset = header[2], header[4], header[5]
+            if self.flags & PACK_FLAG_BLOCKS:
+                self._file.close()
+                raise ValueError(f"Frames can't be appended to a block-compressed pack: {path}")
+            self._file.seek(self._index_offset)
+            index = self._file.read(frame_count * INDEX_ENTRY.size)
+            for scene_number, frame_number, offset, length in INDEX_ENTRY.iter_unpack(index):
+                self._entries[(scene_number, frame_number)] = (offset, length)
+        else:
+            story = {**story_data, 'scenes': [{k: v for k, v in scene.items() if k != 'output_dir'} for scene in story_data['scenes']]}
+            self._story = json.dumps(story).encode('utf-8')
+            self.flags = flags
+            self._file = open(path, 'w+b')
+            self._index_offset = HEADER.size + len(self._story)
+            self._file.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, flags, len(self._story), 0, self._index_offset))
+            self._file.write(self._story)
+            self._commit()
+
+    def add_frame(self, scene_number, frame_number, content, commit=True):
+        self.add_payload(scene_number, frame_number, content.encode('utf-8'), commit)
+
+    def add_payload(self, scene_number, frame_number, payload, commit=True):
+        with self._lock:
+            # Payloads go where the index was; the index is then rewritten after them
+            self._file.seek(self._index_offset)
+            self._file.write(payload)
+            self._entries[(scene_number, frame_number)] = (self._index_offset, len(payload))
+            self._index_offset += len(payload)
+            if commit:
+                self._commit()
+            else:
+                self._dirty = True
+
+    def _commit(self):
+        self._file.seek(self._index_offset)
+        self._file.write(b''.join(
+            INDEX_ENTRY.pack(scene_number, frame_number, offset, length)
+            for (scene_number, frame_number), (offset, length) in sorted(self._entries.items())
+        ))
+        self._file.truncate()
+        self._file.seek(0)
+        magic, version, flags, story_length, _, _ = HEADER.unpack(self._file.read(HEADER.size))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(magic, version, flags, story_length, len(self._entries), self._index_offset))
+        self._file.flush()
+        self._dirty = False
+
+    def close(self):
+        with self._lock:
+            if self._dirty:
+                self._commit()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+class PackedMovie:
+    """
+    Read a movie pack through mmap with constant-time access to any frame.
+
+    :param path: Path of the .asciimov file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._stat = os.fstat(self._file.fileno())
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, story_length, frame_count, index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"Not a movie pack: {path}")
+        if version > PACK_VERSION or flags & ~PACK_FLAG_BLOCKS:
+            raise ValueError(f"Unsupported movie pack version {version} (flags {flags:#x}): {path}")
+
+        self.flags = flags
+        self.story = json.loads(self._map[HEADER.size:HEADER.size + story_length])
+        self.frame_count = frame_count
+        self._index_offset = index_offset
+
+        # One pass over the index maps each frame to its entry; frame lookups then index
+        # straight into the mmap'd table, whatever gaps holds left in the numbering
+        self._block = None  # (position, frames) of the last decoded block
+        self._scenes = {}
+        self.payload_bytes = 0
+        for position in range(frame_count):
+            scene_number, frame_number, _, length = self._entry(position)
+            self._scenes.setdefault(scene_number, {})[frame_number] = position
+            self.payload_bytes += length
+
+    def _entry(self, position):
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + position * INDEX_ENTRY.size)
+
+    def scene_numbers(self):
+        return sorted(self._scenes)
+
+    def frame_numbers(self, scene_number):
+        # The index is sorted by scene and frame, so the positions are in frame order
+        return list(self._scenes.get(scene_number, {}))
+
+    def _position(self, scene_number, frame_number):
+        try:
+            return self._scenes[scene_number][frame_number]
+        except KeyError:
+            raise KeyError(f"Frame {frame_number} of scene {scene_number} not in {self.path}") from None
+
+    def payload(self, scene_number, frame_number):
+        return self._payload_at(self._position(scene_number, frame_number))
+
+    def _payload_at(self, position):
+        _, _, offset, length = self._entry(position)
+        return self._map[offset:offset + length]
+
+    def frame_holds(self, scene_number):
+        # Holds travel in the story, as {"frame number": ticks} per scene
+        scenes = self.story.get('scenes', [])
+        holds = scenes[scene_number - 1].get('holds', {}) if 0 < scene_number <= len(scenes) else {}
+        return {int(frame_number): ticks for frame_number, ticks in holds.items()}
+
+    def frame_key(self, scene_number, frame_number):
+        # Repacking replaces the file, which changes its size or mtime
+        return (self.path, self._stat.st_size, self._stat.st_mtime_ns, scene_number, frame_number)
+
+    def frame(self, scene_number, frame_number):
+        position = self._position(scene_number, frame_number)
+        if not self.flags & PACK_FLAG_BLOCKS:
+            return self._payload_at(position).decode('utf-8')
+
+        # A block is stored on its first frame and decoded once; sequential playback
+        # then serves the rest of its frames from memory
+        block = self._block
+        if block is None or not 0 <= position - block[0] < len(block[1]):
+            start = position
+            while not is_block_record(self._payload_at(start)):
+                start -= 1
+            block = self._block = (start, decode_block(self._payload_at(start)))
+        return block[1][position - block[0]]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def pack_movie_directory(movie_dir, pack_path=None, gop=0, compress=None):
+    """
+    Convert a movie directory (story.json plus scene_XX/ frame files) into a movie pack.
+
+    :param movie_dir: Path of the movie directory
+    :param pack_path: Output path (default: the movie directory plus .asciimov)
+    :param gop: Int, frames per compressed block (0: one block per scene)
+    :param compress: None for plain frame text, or 'zlib' or 'lzma' to store each scene
+                     (or each gop frames) as one compressed block
+    :return: Path of the written pack
+    """
+    pack_path = pack_path or movie_dir.rstrip(os.sep) + PACK_EXTENSION
+    with open(os.path.join(movie_dir, 'story.json'), 'r') as f:
+        story_data = json.load(f)
+
+    # Scenes with a manifest store only the frames it lists; their holds go in the story
+    manifests = {}
+    for scene_number, scene in enumerate(story_data['scenes'], 1):
+        manifest = read_manifest(movie_dir, scene_number)
+        if manifest is not None:
+            manifests[scene_number] = {frame_number for frame_number, _ in manifest}
+            scene['holds'] = {str(frame_number): ticks for frame_number, ticks in manifest if ticks > 1}
+
+    if os.path.exists(pack_path):
+        os.remove(pack_path)
+    writer = MoviePackWriter(pack_path, story_data, flags=PACK_FLAG_BLOCKS if compress else 0)
+    try:
+        for scene_dir in sorted(os.listdir(movie_dir)):
+            match = re.fullmatch(r'scene_(\d+)', scene_dir)
+            if not match or not os.path.isdir(os.path.join(movie_dir, scene_dir)):
+                continue
+            scene_number = int(match.group(1))
+            frames = {}
+            for frame_file in sorted(os.listdir(os.path.join(movie_dir, scene_dir))):
+                frame_match = re.fullmatch(rf'scene_{scene_number:02d}_frame_(\d+)\.txt', frame_file)
+                if not frame_match or (scene_number in manifests and int(frame_match.group(1)) not in manifests[scene_number]):
+                    continue
+                with open(os.path.join(movie_dir, scene_dir, frame_file), 'r') as f:
+                    frames[int(frame_match.group(1))] = f.read()
+
+            frame_numbers = sorted(frames)
+            if compress:
+                payloads = encode_blocks([frames[n] for n in frame_numbers], gop, compress)
+            else:
+                payloads = [frames[n].encode('utf-8') for n in frame_numbers]
+            for frame_number, payload in zip(frame_numbers, payloads):
+                writer.add_payload(scene_number, frame_number, payload, commit=False)
+    finally:
+        writer.close()
+    return pack_path
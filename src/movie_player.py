@@ -1,89 +1,133 @@
 # src/movie_player.py
 
 import os
-import time
 import sys
-import json
-
-def clear_screen():
-    # Clear the console screen
-    os.system('cls' if os.name == 'nt' else 'clear')
+import argparse
+from .terminal import TerminalRenderer, open_output
+from .prefetch import FramePrefetcher
+from .playback_clock import PlaybackClock
+from .movie_source import open_movie
+from .movie_pack import is_pack_file
 
 def read_frame(file_path):
     with open(file_path, 'r') as f:
         return f.read()
 
+def format_info(text, width):
+    return "\n".join(["=" * width, text.center(width), "=" * width])
+
 def display_info(text, width):
-    print("=" * width)
-    print(text.center(width))
-    print("=" * width)
-
-def get_frame_width(frame_path):
-    with open(frame_path, 'r') as f:
-        first_line = f.readline()
-    return len(first_line.rstrip())
-
-def play_movie(movie_dir, frame_delay=0.4):
-    # Load movie information
-    with open(os.path.join(movie_dir, 'story.json'), 'r') as f:
-        story_data = json.load(f)
+    print(format_info(text, width))
+
+def get_frame_width(frame_content, default=68):
+    # The separator above the caption is always exactly as wide as the frame, whatever
+    # the art above it looks like
+    lines = frame_content.split('\n')
+    separator = lines[-2] if len(lines) >= 2 else ''
+    return len(separator) if separator and set(separator) == {'-'} else default
+
+def render_stats(renderer):
+    return {
+        'bytes_written': renderer.bytes_written,
+        'compose_seconds': renderer.compose_seconds,
+        'write_seconds': renderer.write_seconds
+    }
+
+def play_movie(movie_dir, frame_delay=0.4, prefetch_frames=32, prompt=True, output=None):
+    """
+    Play a movie in the terminal.
+
+    :param prompt: Bool, wait for Enter before the movie and each scene
+    :param output: Text stream to render to (default: sys.stdout)
+    :return: Dictionary of prefetch, playback and render statistics
+    """
+    # Load movie information from a movie directory or a packed .asciimov file
+    movie = open_movie(movie_dir)
+    story_data = movie.story
     
-    scene_dirs = sorted([d for d in os.listdir(movie_dir) if os.path.isdir(os.path.join(movie_dir, d))])
+    scene_numbers = movie.scene_numbers()
 
-    if not scene_dirs:
+    if not scene_numbers:
         print("No scenes found in the movie directory.")
         sys.exit(1)
 
     # Get the width of the frames from the first frame of the first scene
-    first_scene_dir = os.path.join(movie_dir, scene_dirs[0])
-    first_frame_file = sorted([f for f in os.listdir(first_scene_dir) if f.endswith('.txt')])[0]
-    frame_width = get_frame_width(os.path.join(first_scene_dir, first_frame_file))
-    frame_width = 68
+    first_frame_number = movie.frame_numbers(scene_numbers[0])[0]
+    frame_width = get_frame_width(movie.frame(scene_numbers[0], first_frame_number))
+
+    holds = {}
 
-    clear_screen()
-    display_info(f"Movie: {story_data['title']}", frame_width)
-    print(f"\n{'Synopsis: ' + story_data['synopsis']}\n".center(frame_width))
-    input("Press Enter to start the movie...".center(frame_width))
+    def load_frame(scene_number, frame_number):
+        # Held frames are read once and come with their tick count
+        if scene_number not in holds:
+            holds[scene_number] = movie.frame_holds(scene_number)
+        return movie.frame(scene_number, frame_number), holds[scene_number].get(frame_number, 1)
 
+    # Load frames in the background while the intro and each frame are on screen
+    prefetcher = FramePrefetcher(scene_numbers, movie.frame_numbers, load_frame, depth=prefetch_frames).start()
+
+    clock = PlaybackClock(frame_delay)
+    renderer = TerminalRenderer(output)
+    renderer.open()
     try:
-        for scene_dir in scene_dirs:
-            scene_number = int(scene_dir.split('_')[1])
+        renderer.show("\n".join([
+            format_info(f"Movie: {story_data['title']}", frame_width),
+            f"\n{'Synopsis: ' + story_data['synopsis']}\n".center(frame_width)
+        ]))
+        if prompt:
+            input("Press Enter to start the movie...".center(frame_width))
+
+        for scene_number, frames in prefetcher.scenes():
             scene_data = story_data['scenes'][scene_number - 1]
             
-            clear_screen()
-            display_info(f"Scene {scene_number}: {scene_data['name']}", frame_width)
-            print(f"\n{scene_data['description']}".center(frame_width))
-            print(f"{scene_data['caption']}\n".center(frame_width))
-            input("Press Enter to start the scene...".center(frame_width))
-            
-            scene_path = os.path.join(movie_dir, scene_dir)
-            frame_files = sorted([f for f in os.listdir(scene_path) if f.endswith('.txt')])
+            renderer.show("\n".join([
+                format_info(f"Scene {scene_number}: {scene_data['name']}", frame_width),
+                f"\n{scene_data['description']}".center(frame_width),
+                f"{scene_data['caption']}\n".center(frame_width)
+            ]))
+            if prompt:
+                input("Press Enter to start the scene...".center(frame_width))
             
-            for frame_file in frame_files:
-                clear_screen()
-                frame_content = read_frame(os.path.join(scene_path, frame_file))
-                print(frame_content)
-                time.sleep(frame_delay)
+            clock.start()
+            for frame_content, ticks in frames:
+                if not clock.wait_for_next_frame(ticks):
+                    continue  # Behind schedule: skip this frame rather than drift
+                renderer.render(frame_content)
+            clock.finish()
         
-        clear_screen()
-        display_info("End of Movie", frame_width)
-        print(f"\n{'Thank you for watching ' + story_data['title']}!\n".center(frame_width))
+        renderer.show("\n".join([
+            format_info("End of Movie", frame_width),
+            f"\n{'Thank you for watching ' + story_data['title']}!\n".center(frame_width)
+        ]))
+        renderer.close()
         
     except KeyboardInterrupt:
+        renderer.close(keep_last=False)
         print("\nPlayback interrupted. Exiting...")
+    finally:
+        renderer.close(keep_last=False)  # No-op unless playback ended with an error
+        prefetcher.stop()
+        movie.close()
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python movie_player.py <path_to_movie_directory> [frame_delay]")
-        sys.exit(1)
-
-    movie_dir = sys.argv[1]
-    frame_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.4
+    return {'prefetch': prefetcher.stats(), 'playback': clock.report(), 'render': render_stats(renderer)}
 
-    if not os.path.isdir(movie_dir):
-        print(f"Error: {movie_dir} is not a valid directory.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play an ASCII movie")
+    parser.add_argument("movie_dir", help="Path to the movie directory or pack")
+    parser.add_argument("frame_delay", type=float, nargs="?", default=0.4, help="Delay between frames in seconds (default: 0.4)")
+    parser.add_argument("--no-prompt", action="store_true", help="Don't wait for Enter before the movie and each scene")
+    parser.add_argument("--sink", default="stdout", help="Where to render: stdout, null, or a file path (default: stdout)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.movie_dir) and not is_pack_file(args.movie_dir):
+        print(f"Error: {args.movie_dir} is not a valid movie directory or pack.")
         sys.exit(1)
 
-    play_movie(movie_dir, frame_delay)
+    output = open_output(args.sink)
+    try:
+        play_movie(args.movie_dir, args.frame_delay, prompt=not args.no_prompt, output=output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
 
 
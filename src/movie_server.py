@@ -0,0 +1,199 @@
+# src/movie_server.py
+
+import asyncio
+import textwrap
+from .movie_source import open_movie
+from .movie_player import format_info
+from .terminal import (
+    diff_rows, move_to, ALTERNATE_SCREEN_ON, ALTERNATE_SCREEN_OFF, HIDE_CURSOR, SHOW_CURSOR
+)
+from .utils import log_progress
+
+# Telnet: the server echoes (i.e. nothing, so keys typed by the viewer don't land on the
+# picture) and suppresses go-ahead, which puts telnet clients in character mode
+TELNET_NEGOTIATION = bytes([255, 251, 1, 255, 251, 3])
+
+class BroadcastMovie:
+    """
+    A movie laid out once as a timeline of screens, each precomposed into bytes, shared by
+    every viewer.
+
+    The title card, scene cards and end card are held for a while instead of waiting for
+    Enter. Every screen is stored twice: as a full repaint, and as the change from the
+    screen before it (see terminal.diff_rows). A viewer who saw the previous screen gets
+    the change, and one who skipped frames gets the full repaint.
+
+    :param movie_path: Path of a movie directory or .asciimov pack
+    :param frame_delay: Float, seconds each frame is shown
+    :param card_seconds: Float, seconds each title, scene or end card is shown
+    :param frame_width: Int, width used to lay out the cards
+    """
+
+    def __init__(self, movie_path, frame_delay=0.4, card_seconds=3.0, frame_width=68):
+        self.path = movie_path
+        self.screens = []
+        self.bytes = 0
+
+        movie = open_movie(movie_path)
+        try:
+            story = movie.story
+            self.title = story['title']
+            self._add_card(format_info(f"Movie: {story['title']}", frame_width) + "\n\n" + textwrap.fill('Synopsis: ' + story['synopsis'], frame_width), card_seconds)
+            for scene_number in movie.scene_numbers():
+                scene = story['scenes'][scene_number - 1]
+                self._add_card("\n".join([
+                    format_info(f"Scene {scene_number}: {scene['name']}", frame_width),
+                    "",
+                    textwrap.fill(scene['description'], frame_width),
+                    "",
+                    scene['caption'].center(frame_width)
+                ]), card_seconds)
+                holds = movie.frame_holds(scene_number)
+                for frame_number in movie.frame_numbers(scene_number):
+                    self._add(movie.frame(scene_number, frame_number).split("\n"), frame_delay * holds.get(frame_number, 1))
+            self._add_card(format_info("End of Movie", frame_width) + "\n\n" + f"Thank you for watching {story['title']}!".center(frame_width), card_seconds)
+        finally:
+            movie.close()
+
+        self.duration = sum(hold for _, _, hold in self.screens)
+
+    def _add_card(self, text, hold):
+        self._add(text.split("\n"), hold)
+
+    def _add(self, rows, hold):
+        previous_rows = self._rows if self.screens else None
+        full = (HIDE_CURSOR + diff_rows(None, rows) + move_to(len(rows))).encode('utf-8')
+        change = (diff_rows(previous_rows, rows) + move_to(len(rows))).encode('utf-8') if previous_rows is not None else full
+        self.screens.append((full, change, hold))
+        self.bytes += len(full) + len(change)
+        self._rows = rows
+
+class MovieServer:
+    """
+    Stream movies to any number of TCP/telnet viewers from one asyncio event loop.
+
+    Each movie is loaded and precomposed once (BroadcastMovie) and the same bytes are
+    written to every viewer. Every connection plays the playlist on its own clock from the
+    moment it connects. Writes never wait for a viewer: if a viewer's unsent output grows
+    beyond max_buffer bytes, or the loop falls a full frame behind, frames are skipped for
+    that viewer only and the next one sent is a full repaint; a viewer that has been
+    skipping for drop_after seconds is disconnected.
+
+    :param movie_paths: List of movie directories or packs, played in order
+    :param frame_delay: Float, seconds between frames
+    :param card_seconds: Float, seconds each title, scene or end card is shown
+    :param loop: Bool, start the playlist over instead of disconnecting at the end
+    :param max_buffer: Int, bytes of unsent output per viewer before frames are skipped
+    :param drop_after: Float, seconds of continuous skipping before a viewer is dropped
+    """
+
+    def __init__(self, movie_paths, frame_delay=0.4, card_seconds=3.0, loop=False, max_buffer=64 * 1024, drop_after=10.0):
+        self.movies = [BroadcastMovie(path, frame_delay, card_seconds) for path in movie_paths]
+        self.loop = loop
+        self.max_buffer = max_buffer
+        self.drop_after = drop_after
+        self.viewers = 0
+        self.peak_viewers = 0
+        self.connections = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.viewers_dropped = 0
+        self.bytes_sent = 0
+        self._server = None
+
+    async def _discard_input(self, reader):
+        # Drain telnet negotiation and keystrokes; the viewer leaves with q or by disconnecting
+        while True:
+            data = await reader.read(1024)
+            if not data or b'q' in data:
+                return
+
+    async def _play(self, writer):
+        transport = writer.transport
+        clock = asyncio.get_running_loop()
+        full_repaint = True
+        skipping_since = None
+
+        while True:
+            for movie in self.movies:
+                due = clock.time()
+                for full, change, hold in movie.screens:
+                    delay = due - clock.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    late = clock.time() >= due + hold
+                    due += hold
+
+                    if late or transport.get_write_buffer_size() > self.max_buffer:
+                        self.frames_skipped += 1
+                        full_repaint = True
+                        if skipping_since is None:
+                            skipping_since = clock.time()
+                        elif clock.time() - skipping_since > self.drop_after:
+                            # Discard what is still queued rather than flush it to a stalled viewer
+                            self.viewers_dropped += 1
+                            transport.abort()
+                            return
+                        continue
+
+                    skipping_since = None
+                    data = full if full_repaint else change
+                    writer.write(data)
+                    full_repaint = False
+                    self.frames_sent += 1
+                    self.bytes_sent += len(data)
+            if not self.loop:
+                return
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self.viewers += 1
+        self.peak_viewers = max(self.peak_viewers, self.viewers)
+        writer.write(TELNET_NEGOTIATION + (ALTERNATE_SCREEN_ON + HIDE_CURSOR).encode('utf-8'))
+
+        play = asyncio.ensure_future(self._play(writer))
+        listen = asyncio.ensure_future(self._discard_input(reader))
+        try:
+            await asyncio.wait([play, listen], return_when=asyncio.FIRST_COMPLETED)
+            if play.done() and not writer.is_closing():
+                writer.write((SHOW_CURSOR + ALTERNATE_SCREEN_OFF).encode('utf-8'))
+        except asyncio.CancelledError:
+            pass  # Server shutting down
+        finally:
+            play.cancel()
+            listen.cancel()
+            self.viewers -= 1
+            writer.close()
+
+    async def start(self, host='0.0.0.0', port=2323):
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=1024)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def stats(self):
+        return {
+            'viewers': self.viewers,
+            'peak_viewers': self.peak_viewers,
+            'connections': self.connections,
+            'frames_sent': self.frames_sent,
+            'frames_skipped': self.frames_skipped,
+            'viewers_dropped': self.viewers_dropped,
+            'bytes_sent': self.bytes_sent,
+        }
+
+    async def report(self, interval):
+        # Log viewer and throughput counters every interval seconds
+        previous_bytes = 0
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.stats()
+            log_progress(
+                f"{stats['viewers']} viewers (peak {stats['peak_viewers']}, {stats['connections']} total), "
+                f"{stats['frames_sent']} frames sent, {stats['frames_skipped']} skipped, {stats['viewers_dropped']} dropped, "
+                f"{(stats['bytes_sent'] - previous_bytes) / interval / 1024:.0f} KB/s"
+            )
+            previous_bytes = stats['bytes_sent']
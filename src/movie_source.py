@@ -0,0 +1,81 @@
+# src/movie_source.py
+
+import os
+import re
+import json
+from .movie_pack import PackedMovie, is_pack_file
+from .scene_manifest import read_manifest
+
+class DirectoryMovie:
+    """
+    Read a movie stored as story.json plus one file per frame under scene_XX/.
+
+    :param movie_dir: Path of the movie directory
+    """
+
+    def __init__(self, movie_dir):
+        self.path = movie_dir
+        with open(os.path.join(movie_dir, 'story.json'), 'r') as f:
+            self.story = json.load(f)
+        self._manifests = {}
+
+    def _scene_dir(self, scene_number):
+        return os.path.join(self.path, f"scene_{scene_number:02d}")
+
+    def scene_numbers(self):
+        return sorted(
+            int(match.group(1))
+            for match in (re.fullmatch(r'scene_(\d+)', d) for d in os.listdir(self.path))
+            if match and os.path.isdir(os.path.join(self.path, match.group(0)))
+        )
+
+    def _manifest(self, scene_number):
+        # Read once per scene; None for scenes generated without holds
+        if scene_number not in self._manifests:
+            self._manifests[scene_number] = read_manifest(self.path, scene_number)
+        return self._manifests[scene_number]
+
+    def frame_numbers(self, scene_number):
+        manifest = self._manifest(scene_number)
+        if manifest is not None:
+            return [frame_number for frame_number, _ in manifest]
+        pattern = re.compile(rf'scene_{scene_number:02d}_frame_(\d+)\.txt')
+        return sorted(
+            int(match.group(1))
+            for match in (pattern.fullmatch(f) for f in os.listdir(self._scene_dir(scene_number)))
+            if match
+        )
+
+    def _frame_path(self, scene_number, frame_number):
+        return os.path.join(self._scene_dir(scene_number), f"scene_{scene_number:02d}_frame_{frame_number:03d}.txt")
+
+    def frame(self, scene_number, frame_number):
+        with open(self._frame_path(scene_number, frame_number), 'r') as f:
+            return f.read()
+
+    def frame_holds(self, scene_number):
+        # Frames shown for more than one frame delay, as {frame number: ticks}
+        return {frame_number: ticks for frame_number, ticks in self._manifest(scene_number) or () if ticks > 1}
+
+    def frame_key(self, scene_number, frame_number):
+        # Changes whenever the frame file is rewritten, for caching what is derived from it
+        path = self._frame_path(scene_number, frame_number)
+        stat = os.stat(path)
+        return (path, stat.st_size, stat.st_mtime_ns)
+
+    def close(self):
+        pass
+
+def open_movie(path):
+    """
+    Open a movie directory or a packed .asciimov file for playback.
+
+    :param path: Path of the movie
+    :return: DirectoryMovie or PackedMovie, both exposing story, scene_numbers(),
+             frame_numbers(scene_number), frame_holds(scene_number),
+             frame(scene_number, frame_number), frame_key(scene_number, frame_number)
+             and close()
+    """
+    if is_pack_file(path):
+        return PackedMovie(path)
+    return DirectoryMovie(path)
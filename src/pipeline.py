@@ -0,0 +1,83 @@
+# src/pipeline.py
+
+import time
+import queue
+import threading
+import contextvars
+from .story_generator import stream_story, save_story
+from .frame_generator import generate_frames
+from .movie_pack import PACK_EXTENSION, pack_movie_directory
+from .utils import create_movie_directory, log_progress
+
+def generate_movie_pipelined(data_dir, debug_dir, client, model, provider, topic=None, pack=False, unique=False, **frame_options):
+    """
+    Stream the story and start generating each scene's frames as soon as that scene is
+    complete, instead of waiting for the whole story.
+
+    The story streams on a background thread. The movie directory is created once the
+    title has arrived, and scene numbers are fed to generate_frames through a queue, so
+    with several workers later scenes start while earlier ones are still rendering.
+
+    :param pack: Bool, also write a .asciimov pack once all frames are done
+    :param unique: Bool, never reuse an existing movie directory
+    :param frame_options: Further keyword arguments for generate_frames
+    :return: Tuple of (story dictionary, movie directory)
+    """
+    start = time.perf_counter()
+    ready = queue.Queue()
+    story_data = {'scenes': []}
+    arrived = {'scenes': []}  # The story as streamed so far, without frame generation's keys
+    result = {}
+
+    def on_header(header):
+        story_data.update(header)
+        arrived.update(header)
+        result['movie_dir'] = create_movie_directory(data_dir, header.get('title') or 'untitled', unique=unique)
+        ready.put(('movie', result['movie_dir']))
+
+    def on_scene(scene_number, scene):
+        if scene_number == 1:
+            log_progress(f"First scene ready after {time.perf_counter() - start:.1f} s")
+        # Saved before the scene is handed off, so a run killed mid-story can be resumed
+        # with the scenes that had arrived
+        arrived['scenes'].append(scene)
+        save_story(arrived, result['movie_dir'])
+        # Frame generation adds its own keys to the scene, so it gets a copy
+        story_data['scenes'].append(dict(scene))
+        ready.put(('scene', scene_number))
+
+    def run_story():
+        try:
+            result['story'] = stream_story(debug_dir, client, model, provider, topic, on_header, on_scene)
+            save_story(result['story'], result['movie_dir'])
+        except BaseException as e:  # Including SystemExit from error_exit
+            result['error'] = e
+        finally:
+            ready.put(('done', None))
+
+    story_thread = threading.Thread(target=contextvars.copy_context().run, args=(run_story,), daemon=True)
+    story_thread.start()
+
+    kind, movie_dir = ready.get()
+    if kind != 'movie':
+        story_thread.join()
+        raise result['error']
+    log_progress(f"Streaming story: {story_data.get('title')}")
+
+    def scene_numbers():
+        while True:
+            kind, scene_number = ready.get()
+            if kind == 'done':
+                break
+            yield scene_number
+        # Raised inside generate_frames, so a story that failed halfway isn't journaled
+        # as a complete movie
+        if 'error' in result:
+            raise result['error']
+
+    generate_frames(story_data, movie_dir, client=client, model=model, provider=provider, scene_numbers=scene_numbers(), **frame_options)
+
+    if pack:
+        pack_movie_directory(movie_dir, movie_dir + PACK_EXTENSION)
+    log_progress(f"Story and frames done after {time.perf_counter() - start:.1f} s")
+    return result['story'], movie_dir
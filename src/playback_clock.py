@@ -0,0 +1,84 @@
+# src/playback_clock.py
+
+import time
+from .utils import percentile
+
+class PlaybackClock:
+    """
+    Schedule frames against absolute presentation timestamps on time.monotonic().
+
+    Frame N of a run is due at start + N * frame_delay, so time spent loading and
+    rendering doesn't accumulate into drift. A frame whose slot has fully passed is
+    dropped instead of being shown late. A held frame takes several slots (ticks) and is
+    dropped only once all of them have passed. A frame_delay of 0 plays as fast as
+    possible and never drops.
+
+    :param frame_delay: Float, seconds between frames
+    """
+
+    def __init__(self, frame_delay):
+        self.frame_delay = max(0.0, frame_delay)
+        self.frames_presented = 0
+        self.ticks_presented = 0
+        self.frames_dropped = 0
+        self.playing_seconds = 0.0
+        self._lateness = []
+        self._origin = None
+        self._index = 0
+
+    def start(self):
+        # Begin a run of frames, e.g. a scene after its intro prompt
+        self._origin = time.monotonic()
+        self._index = 0
+
+    def wait_for_next_frame(self, ticks=1):
+        """
+        Sleep until the next frame is due.
+
+        :param ticks: Int, frame delays the frame stays on screen
+        :return: True if the frame should be shown now, False if it should be dropped
+        """
+        if self._origin is None:
+            self.start()
+
+        due = self._origin + self._index * self.frame_delay
+        self._index += ticks
+        now = time.monotonic()
+
+        if self.frame_delay > 0 and now >= due + ticks * self.frame_delay:
+            self.frames_dropped += 1
+            return False
+
+        if due > now:
+            time.sleep(due - now)
+            now = time.monotonic()
+
+        self._lateness.append(now - due)
+        self.frames_presented += 1
+        self.ticks_presented += ticks
+        return True
+
+    def finish(self):
+        # Hold the last frame for its full slot, then close the run
+        if self._origin is None:
+            return
+        end = self._origin + self._index * self.frame_delay
+        now = time.monotonic()
+        if end > now:
+            time.sleep(end - now)
+            now = end
+        self.playing_seconds += now - self._origin
+        self._origin = None
+
+    def report(self):
+        lateness_ms = [seconds * 1000 for seconds in self._lateness]
+        return {
+            'target_fps': 1 / self.frame_delay if self.frame_delay > 0 else None,
+            # Holds count once per tick, so a movie with holds still plays at the target rate
+            'achieved_fps': self.ticks_presented / self.playing_seconds if self.playing_seconds > 0 else 0.0,
+            'frames_presented': self.frames_presented,
+            'frames_dropped': self.frames_dropped,
+            'jitter_p50_ms': percentile(lateness_ms, 0.50),
+            'jitter_p95_ms': percentile(lateness_ms, 0.95),
+            'jitter_p99_ms': percentile(lateness_ms, 0.99)
+        }
@@ -0,0 +1,136 @@
+# src/prefetch.py
+
+import time
+import queue
+import threading
+
+class _SceneStart:
+    def __init__(self, scene):
+        self.scene = scene
+
+class _SceneEnd:
+    pass
+
+class _MovieEnd:
+    pass
+
+class _LoadError:
+    def __init__(self, error):
+        self.error = error
+
+class FramePrefetcher:
+    """
+    Load frames on a background thread ahead of playback.
+
+    A producer thread lists and reads frames scene by scene into a bounded queue while
+    the player displays the current frame or waits on a prompt, so file I/O never sits
+    between two frames. Counters on queue depth and stalls help size the buffer.
+
+    :param scenes: List of scene keys, in playback order
+    :param list_frames: Callable(scene) returning the scene's frame keys in order
+    :param read_frame: Callable(scene, frame) returning the frame content
+    :param depth: Int, maximum number of frames loaded ahead
+    """
+
+    def __init__(self, scenes, list_frames, read_frame, depth=32):
+        self.depth = depth
+        self.frames_loaded = 0
+        self.frames_played = 0
+        self.stalls = 0
+        self.stall_seconds = 0.0
+        self.load_seconds = 0.0
+        self.max_queue_depth = 0
+        self._queue_depth_total = 0
+        self._queue_depth_samples = 0
+        self._scenes = scenes
+        self._list_frames = list_frames
+        self._read_frame = read_frame
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            for scene in self._scenes:
+                if not self._put(_SceneStart(scene)):
+                    return
+                load_start = time.perf_counter()
+                frames = self._list_frames(scene)
+                self.load_seconds += time.perf_counter() - load_start
+                for frame in frames:
+                    load_start = time.perf_counter()
+                    content = self._read_frame(scene, frame)
+                    self.load_seconds += time.perf_counter() - load_start
+                    if not self._put(content):
+                        return
+                    self.frames_loaded += 1
+                self._put(_SceneEnd())
+            self._put(_MovieEnd())
+        except Exception as e:
+            self._put(_LoadError(e))
+
+    def _get(self, is_frame=False):
+        if is_frame:
+            queue_depth = self._queue.qsize()
+            self._queue_depth_total += queue_depth
+            self._queue_depth_samples += 1
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+            if queue_depth == 0:
+                # The player is waiting on I/O: the buffer is too shallow or storage too slow
+                self.stalls += 1
+                stall_start = time.monotonic()
+                item = self._queue.get()
+                self.stall_seconds += time.monotonic() - stall_start
+                return item
+        return self._queue.get()
+
+    def _scene_frames(self):
+        while True:
+            item = self._get(is_frame=True)
+            if isinstance(item, _SceneEnd):
+                return
+            if isinstance(item, _LoadError):
+                raise item.error
+            self.frames_played += 1
+            yield item
+
+    def scenes(self):
+        """
+        Iterate over (scene, frames) pairs, where frames yields each loaded frame in order.
+        Each scene's frames must be consumed before moving on to the next scene.
+        """
+        while True:
+            item = self._get()
+            if isinstance(item, _MovieEnd):
+                return
+            if isinstance(item, _LoadError):
+                raise item.error
+            yield item.scene, self._scene_frames()
+
+    def stats(self):
+        return {
+            'depth': self.depth,
+            'frames_loaded': self.frames_loaded,
+            'frames_played': self.frames_played,
+            'stalls': self.stalls,
+            'stall_seconds': self.stall_seconds,
+            'load_seconds': self.load_seconds,
+            'max_queue_depth': self.max_queue_depth,
+            'mean_queue_depth': self._queue_depth_total / self._queue_depth_samples if self._queue_depth_samples else 0.0
+        }
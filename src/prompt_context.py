@@ -0,0 +1,74 @@
+# src/prompt_context.py
+
+CONTEXT_MODES = ('full', 'rle')
+
+# Runs shorter than this are cheaper to send as-is than as {c*n}
+RLE_MIN_RUN = 4
+
+def rle_encode_frame(frame, min_run=RLE_MIN_RUN):
+    """
+    Run-length encode each row of a frame, writing runs of min_run or more identical
+    characters as {c*n}.
+    """
+    rows = []
+    for row in frame.split('\n'):
+        parts = []
+        index = 0
+        while index < len(row):
+            end = index
+            while end < len(row) and row[end] == row[index]:
+                end += 1
+            run = end - index
+            parts.append(f"{{{row[index]}*{run}}}" if run >= min_run else row[index:end])
+            index = end
+        rows.append(''.join(parts))
+    return '\n'.join(rows)
+
+def next_frame_guidelines(ascii_art_height, frame_width):
+    # Identical for every frame of a movie, so it goes first in the prompt where Ollama's
+    # KV cache can reuse it across calls
+    return f"""You generate the next frame of a detailed ASCII art animation.
+
+ASCII Art Guidelines:
+1. The ASCII art must be exactly {ascii_art_height} lines tall and {frame_width} characters wide.
+2. Maintain the overall composition and style of the previous frame.
+3. Make subtle changes to create a smooth animation effect. Focus on small movements or changes in details.
+4. Ensure consistency in the use of ASCII characters for specific elements across frames.
+5. Pay attention to lighting and shading changes if applicable to the scene.
+6. Keep the main elements of the scene easily recognizable throughout the animation.
+7. Use a variety of ASCII characters to maintain depth and detail.
+8. Continue to employ negative space effectively.
+9. Preserve the sense of foreground, midground, and background.
+10. Do not include any caption or text at the bottom of the ASCII art.
+
+The previous frame is given in a compact form. Always answer with the complete new frame,
+written out in full, never in the compact form.
+
+Only return the ASCII art frame, nothing else. No explanations or additional text."""
+
+class FrameContext:
+    """
+    Build next-frame prompts with a compact representation of the previous frame.
+
+    'full' sends the previous frame as-is (create_frame_prompt). 'rle' sends it run-length
+    encoded.
+
+    :param mode: String, one of CONTEXT_MODES
+    """
+
+    def __init__(self, mode='full'):
+        if mode not in CONTEXT_MODES:
+            raise ValueError(f"Unsupported context mode: {mode}")
+        self.mode = mode
+
+    def messages(self, scene, frame_number, total_frames, ascii_art_height, frame_width, previous_frame):
+        previous = (
+            "Previous frame, run-length encoded ({c*n} stands for the character c repeated n times):\n"
+            + rle_encode_frame(previous_frame)
+        )
+        user = f"""{previous}
+
+Scene: {scene['name']}
+Description: {scene['description']}
+Frame {frame_number} of {total_frames}"""
+        return [{"role": "system", "content": next_frame_guidelines(ascii_art_height, frame_width)}, {"role": "user", "content": user}]
@@ -0,0 +1,116 @@
+# src/rate_limit.py
+
+import os
+import time
+import threading
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def estimate_tokens(text):
+    # Roughly four characters per token, close enough for English prose and ASCII art
+    return max(1, len(text) // 4)
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute, holding at most a minute's worth.
+
+    acquire() reserves tokens and sleeps off any deficit, so concurrent callers queue up
+    in order instead of polling.
+
+    :param rate_per_minute: Float, tokens added per minute
+    """
+
+    def __init__(self, rate_per_minute):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def adjust(self, amount):
+        # Correct an earlier reservation once the real cost is known (negative refunds)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+
+class RateLimiter:
+    """
+    Client-side request and token limits for one provider.
+
+    :param requests_per_minute: Int, 0 for no request limit
+    :param tokens_per_minute: Int, 0 for no token limit
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.blocked_until = 0.0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        # A Retry-After from the provider applies to every caller, not just the one that got it
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def acquire(self, estimated_tokens):
+        waited = 0.0
+        with self._lock:
+            blocked = self.blocked_until - time.monotonic()
+        if blocked > 0:
+            time.sleep(blocked)
+            waited += blocked
+        if self.requests is not None:
+            waited += self.requests.acquire(1)
+        if self.tokens is not None:
+            waited += self.tokens.acquire(estimated_tokens)
+        with self._lock:
+            self.waited_seconds += waited
+        return waited
+
+    def settle(self, estimated_tokens, actual_tokens):
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+
+def _env_limit(provider, name):
+    return int(os.getenv(f'{provider.upper()}_{name}', '0'))
+
+def configure_rate_limiter(provider, requests_per_minute=None, tokens_per_minute=None):
+    """
+    Set the request and token limits used for every call to the given provider.
+
+    :param provider: String, 'openai', 'anthropic', 'ollama', or 'mock'
+    :param requests_per_minute: Int, 0 for no request limit (default: $<PROVIDER>_RPM)
+    :param tokens_per_minute: Int, 0 for no token limit (default: $<PROVIDER>_TPM)
+    :return: RateLimiter
+    """
+    if requests_per_minute is None:
+        requests_per_minute = _env_limit(provider, 'RPM')
+    if tokens_per_minute is None:
+        tokens_per_minute = _env_limit(provider, 'TPM')
+    with _limiters_lock:
+        _limiters[provider] = RateLimiter(requests_per_minute, tokens_per_minute)
+        return _limiters[provider]
+
+def get_rate_limiter(provider):
+    # Fall back to <PROVIDER>_RPM / <PROVIDER>_TPM when nothing was configured explicitly
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(_env_limit(provider, 'RPM'), _env_limit(provider, 'TPM'))
+        return _limiters[provider]
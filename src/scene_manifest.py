@@ -0,0 +1,35 @@
+# src/scene_manifest.py
+
+import os
+import json
+
+MANIFEST_FILE = 'manifest.json'
+
+def manifest_path(movie_dir, scene_number):
+    return os.path.join(movie_dir, f"scene_{scene_number:02d}", MANIFEST_FILE)
+
+def manifest_content(runs, threshold):
+    """
+    Serialize a scene manifest: the frames that are played, each held for a number of
+    ticks (frame delays), so runs of near-identical frames are stored once.
+
+    :param runs: List of (frame number, ticks) pairs in playback order
+    :param threshold: Float, fraction of changed cells below which frames were folded
+    :return: String of JSON
+    """
+    return json.dumps({
+        'threshold': threshold,
+        'ticks': sum(ticks for _, ticks in runs),
+        'frames': [{'frame': frame_number, 'hold': ticks} for frame_number, ticks in runs]
+    }, indent=2)
+
+def read_manifest(movie_dir, scene_number):
+    """
+    :return: List of (frame number, ticks) pairs, or None if the scene has no manifest
+    """
+    try:
+        with open(manifest_path(movie_dir, scene_number), 'r') as f:
+            manifest = json.load(f)
+        return [(entry['frame'], entry['hold']) for entry in manifest['frames']]
+    except (IOError, ValueError, KeyError, TypeError):
+        return None
@@ -3,8 +3,14 @@
 import os
 import json
 import re
-from .llm_config import get_llm_completion, get_ollama_json_completion
-from .utils import log_progress, error_exit
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .llm_config import get_llm_completion, get_ollama_json_completion, stream_llm_completion, StreamAborted
+from .story_stream import StoryStreamParser
+from .utils import atomic_write, log_progress, error_exit
+from .catalog import catalog_story
+from .telemetry import call_tags
 
 def create_story_template():
     return {
@@ -41,6 +47,39 @@ Ensure all fields are filled and the JSON structure is maintained.
 """
     return prompt
 
+# Temperatures for hedged story requests, in order; spreading them makes it less likely
+# that every request fails the same way
+HEDGE_TEMPERATURES = (0.7, 0.9, 0.5, 1.0, 0.3)
+
+def validate_story(story_data):
+    """
+    Check a parsed story against the template: a title, a synopsis and 5-8 scenes that
+    each have a name, description, caption and num_frames.
+
+    :return: None if the story is usable, otherwise the reason it isn't
+    """
+    if not isinstance(story_data, dict):
+        return "no JSON object"
+    for field in ('title', 'synopsis'):
+        if not isinstance(story_data.get(field), str) or not story_data[field].strip():
+            return f"missing {field}"
+    scenes = story_data.get('scenes')
+    if not isinstance(scenes, list):
+        return "missing scenes"
+    scenes = [scene for scene in scenes if isinstance(scene, dict) and scene.get('name')]
+    if not 5 <= len(scenes) <= 8:
+        return f"{len(scenes)} scenes, expected 5-8"
+    for number, scene in enumerate(scenes, 1):
+        for field in ('description', 'caption'):
+            if not isinstance(scene.get(field), str) or not scene[field].strip():
+                return f"scene {number} is missing its {field}"
+        if not isinstance(scene.get('num_frames'), int) or isinstance(scene['num_frames'], bool):
+            return f"scene {number} has no frame count"
+    return None
+
+def clamp_scene(scene):
+    return {**scene, 'num_frames': max(5, min(15, scene.get('num_frames', 10)))}
+
 def generate_story(output_dir, client, model, provider, topic=None):
     template = create_story_template()
     if topic:
@@ -50,11 +89,13 @@ def generate_story(output_dir, client, model, provider, topic=None):
     try:
         messages = [{"role": "user", "content": prompt}]
         if provider == 'ollama':
-            story_data = get_ollama_json_completion(client, messages)
+            with call_tags(stage='story'):
+                story_data = get_ollama_json_completion(client, messages)
             #print("Raw Ollama response:")
             #print(json.dumps(story_data, indent=2))
         else:
-            content = get_llm_completion(client, provider, messages)
+            with call_tags(stage='story'):
+                content = get_llm_completion(client, provider, messages)
             # Extract JSON content for non-Ollama providers
             json_match = re.search(r'(\{.*\})', content, re.DOTALL)
             if json_match:
@@ -80,25 +121,170 @@ def generate_story(output_dir, client, model, provider, topic=None):
     # Process story data
     try:
         # Remove any empty scenes and ensure num_frames is within bounds
-        story_data['scenes'] = [
-            {**scene, 'num_frames': max(5, min(15, scene.get('num_frames', 10)))}
-            for scene in story_data['scenes']
-            if scene['name']
-        ]
+        story_data['scenes'] = [clamp_scene(scene) for scene in story_data['scenes'] if scene['name']]
         return story_data
     except KeyError as e:
         error_exit(f"Invalid story structure. Missing key: {str(e)}. Check {raw_output_file} for raw output.")
         return None
 
+def stream_story(output_dir, client, model, provider, topic=None, on_header=None, on_scene=None):
+    """
+    Generate a story with a streamed request, handing over its parts as soon as they are
+    complete: on_header(header) once the fields before the scenes have arrived, then
+    on_scene(scene_number, scene) for each non-empty scene, in order.
+
+    If the scenes can't be picked out while streaming (e.g. the model put the title after
+    them), the callbacks run once the complete story has been parsed.
+
+    :return: Story dictionary with the scenes that were handed over
+    """
+    template = create_story_template()
+    if topic:
+        template['topic'] = topic
+    messages = [{"role": "user", "content": create_story_prompt(template)}]
+
+    parser = StoryStreamParser()
+    header = None
+    scenes = []
+
+    def hand_over(new_header, new_scenes):
+        nonlocal header
+        if header is None:
+            header = {key: value for key, value in new_header.items() if key != 'scenes'}
+            if on_header is not None:
+                on_header(header)
+        for scene in new_scenes:
+            if isinstance(scene, dict) and scene.get('name'):
+                scenes.append(clamp_scene(scene))
+                if on_scene is not None:
+                    on_scene(len(scenes), scenes[-1])
+
+    def on_text(text):
+        new_scenes = parser.feed(text)
+        if parser.header is not None:
+            hand_over(parser.header, new_scenes)
+        return None
+
+    try:
+        with call_tags(stage='story'):
+            content = stream_llm_completion(client, provider, messages, on_text, json_mode=True)
+    except Exception as e:
+        error_exit(f"Failed to generate story: {str(e)}")
+        return None
+
+    json_match = re.search(r'(\{.*\})', content, re.DOTALL)
+    try:
+        story_data = json.loads(json_match.group(1)) if json_match else None
+    except json.JSONDecodeError:
+        story_data = None
+
+    # Save raw API output
+    raw_output_file = os.path.join(output_dir, 'raw_story_output.json')
+    try:
+        with open(raw_output_file, 'w') as f:
+            f.write(json.dumps(story_data, indent=2) if story_data is not None else content)
+    except IOError as e:
+        error_exit(f"Failed to save raw output: {str(e)}")
+
+    if header is None and isinstance(story_data, dict) and isinstance(story_data.get('scenes'), list):
+        # Nothing could be handed over while streaming: fall back to the complete story
+        hand_over(story_data, story_data['scenes'])
+    if not scenes:
+        error_exit(f"Failed to parse scenes from the streamed story. Check {raw_output_file} for raw output.")
+        return None
+
+    # The scenes that were handed over are the ones being animated, so they win over
+    # the final parse if the two disagree
+    if isinstance(story_data, dict):
+        header = {key: value for key, value in story_data.items() if key != 'scenes'}
+    return {**header, 'scenes': scenes}
+
+def generate_story_hedged(output_dir, clients, topic=None, hedges=2):
+    """
+    Send several story requests at once, spread over temperatures and providers, and keep
+    the first story that passes validate_story. The other requests are streamed, so they
+    are cancelled as soon as they produce another token.
+
+    :param clients: List of (provider, client) pairs, used in turn
+    :param hedges: Int, number of parallel requests
+    :return: Story dictionary
+    """
+    template = create_story_template()
+    if topic:
+        template['topic'] = topic
+    messages = [{"role": "user", "content": create_story_prompt(template)}]
+    requests = [
+        (number, *clients[(number - 1) % len(clients)], HEDGE_TEMPERATURES[(number - 1) % len(HEDGE_TEMPERATURES)])
+        for number in range(1, hedges + 1)
+    ]
+    won = threading.Event()
+    lock = threading.Lock()
+
+    def request_story(number, provider, client, temperature):
+        def on_text(text):
+            return "another story request won" if won.is_set() else None
+
+        with call_tags(stage='story', hedge=number):
+            content = stream_llm_completion(client, provider, messages, on_text, temperature, json_mode=True)
+        json_match = re.search(r'(\{.*\})', content, re.DOTALL)
+        try:
+            story_data = json.loads(json_match.group(1)) if json_match else None
+        except json.JSONDecodeError:
+            story_data = None
+        reason = validate_story(story_data)
+        if reason:
+            raise ValueError(reason)
+        with lock:
+            if won.is_set():
+                return None
+            won.set()
+        return story_data
+
+    executor = ThreadPoolExecutor(max_workers=len(requests))
+    futures = {executor.submit(contextvars.copy_context().run, request_story, *request): request for request in requests}
+    story_data = None
+    try:
+        for future in as_completed(futures):
+            number, provider, _, temperature = futures[future]
+            try:
+                result = future.result()
+            except StreamAborted:
+                continue
+            except Exception as e:
+                log_progress(f"Story request {number} ({provider}, temperature {temperature}) failed: {str(e)}")
+                continue
+            if result is not None:
+                log_progress(f"Using story request {number} ({provider}, temperature {temperature})")
+                story_data = result
+                break
+    finally:
+        # Don't wait for the losing requests; they stop at their next token
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if story_data is None:
+        error_exit(f"None of the {hedges} story requests returned a valid story.")
+        return None
+
+    raw_output_file = os.path.join(output_dir, 'raw_story_output.json')
+    try:
+        with open(raw_output_file, 'w') as f:
+            json.dump(story_data, f, indent=2)
+    except IOError as e:
+        error_exit(f"Failed to save raw output: {str(e)}")
+
+    story_data['scenes'] = [clamp_scene(scene) for scene in story_data['scenes'] if scene.get('name')]
+    return story_data
+
 def save_story(story_data, output_dir):
     story_file = os.path.join(output_dir, 'story.json')
     try:
-        with open(story_file, 'w') as f:
-            json.dump(story_data, f, indent=2)
+        atomic_write(story_file, json.dumps(story_data, indent=2))
         #log_progress(f"Processed story saved to {story_file}")
     except IOError as e:
         error_exit(f"Failed to save story: {str(e)}")
 
+    catalog_story(output_dir, story_data)
+
 if __name__ == "__main__":
     from .llm_config import create_llm_client
     
@@ -0,0 +1,85 @@
+# src/story_stream.py
+
+import json
+
+class StoryStreamParser:
+    """
+    Pick complete pieces out of a story JSON object while it is still streaming in.
+
+    Tracks string/escape state and bracket nesting character by character, so text
+    before the object (e.g. a "Here is your story:" preamble) and braces inside strings
+    don't confuse it. Once the "scenes" array opens, the fields before it become the
+    header; after that, each scene object is returned by feed() as soon as its closing
+    brace arrives.
+    """
+
+    def __init__(self):
+        self.header = None
+        self._text = []
+        self._length = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._key = None
+        self._object_start = None
+        self._in_scenes = False
+        self._scene_start = None
+
+    def _source(self, start, end):
+        return ''.join(self._text)[start:end]
+
+    def feed(self, text):
+        """
+        :return: List of scene dictionaries completed by this piece of text
+        """
+        scenes = []
+        base = self._length
+        self._text.append(text)
+        self._length += len(text)
+
+        for offset, char in enumerate(text):
+            position = base + offset
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_string = self._source(self._string_start + 1, position)
+                continue
+
+            if char == '"' and self._stack:
+                self._in_string = True
+                self._string_start = position
+            elif char == ':' and len(self._stack) == 1:
+                self._key = self._last_string
+            elif char in '{[':
+                if not self._stack:
+                    if char != '{':
+                        continue  # Not inside the story object yet
+                    self._object_start = position
+                elif char == '[' and len(self._stack) == 1 and self._key == 'scenes':
+                    self._in_scenes = True
+                    if self.header is None:
+                        try:
+                            self.header = json.loads(self._source(self._object_start, position + 1) + ']}')
+                        except json.JSONDecodeError:
+                            pass  # Malformed header; the caller falls back to the complete story
+                elif char == '{' and self._in_scenes and len(self._stack) == 2:
+                    self._scene_start = position
+                self._stack.append(char)
+            elif char in '}]' and self._stack:
+                self._stack.pop()
+                if char == '}' and self._in_scenes and len(self._stack) == 2 and self._scene_start is not None:
+                    try:
+                        scenes.append(json.loads(self._source(self._scene_start, position + 1)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._scene_start = None
+                elif char == ']' and len(self._stack) == 1:
+                    self._in_scenes = False
+        return scenes
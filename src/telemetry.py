@@ -0,0 +1,160 @@
+# src/telemetry.py
+
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from .utils import percentile
+
+TELEMETRY_FILE = 'llm_calls.jsonl'
+
+_telemetry = None
+
+# Scene/frame tags for the calls made in the current thread. Generation hands each worker
+# task a copy of the submitting context, so it inherits outer tags (e.g. job) while tags
+# it sets for its own scene never leak into another
+_call_tags = contextvars.ContextVar('llm_call_tags', default={})
+
+@contextmanager
+def call_tags(**tags):
+    """
+    Tag every LLM call made inside the block, e.g. with call_tags(scene=2, frame=7).
+    Nested blocks add to (and override) the enclosing tags.
+    """
+    token = _call_tags.set({**_call_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _call_tags.reset(token)
+
+def usage_tokens(response):
+    # OpenAI-style clients report prompt/completion tokens, Anthropic input/output tokens
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return None, None
+    prompt_tokens = getattr(usage, 'prompt_tokens', None)
+    if prompt_tokens is None:
+        prompt_tokens = getattr(usage, 'input_tokens', None)
+    completion_tokens = getattr(usage, 'completion_tokens', None)
+    if completion_tokens is None:
+        completion_tokens = getattr(usage, 'output_tokens', None)
+    return prompt_tokens, completion_tokens
+
+def cached_prompt_tokens(response):
+    # Prompt tokens served from the provider's prefix cache, where the provider reports them
+    usage = getattr(response, 'usage', None)
+    details = getattr(usage, 'prompt_tokens_details', None)
+    if details is not None:
+        return getattr(details, 'cached_tokens', None)
+    return getattr(usage, 'cache_read_input_tokens', None)
+
+class CallTelemetry:
+    """
+    Record one line per LLM call: wall time, token usage, retries, provider and model,
+    tagged with the scene and frame being generated.
+
+    Records made before open() (e.g. the story call, before the movie directory exists)
+    are kept in memory and written out when the file is opened.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.records = []
+        self._file = None
+        self._lock = threading.Lock()
+
+    def open(self, path):
+        # Append, so a resumed movie keeps the telemetry of earlier runs
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self.path = path
+            self._file = open(path, 'a')
+            for record in self.records:
+                self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+
+    def record(self, provider, model, wall_seconds, prompt_tokens=None, completion_tokens=None, retries=0, cached=False, error=None, cached_prompt_tokens=None):
+        record = {
+            'time': round(time.time(), 3),
+            **_call_tags.get(),
+            'provider': provider,
+            'model': model,
+            'wall_ms': round(wall_seconds * 1000, 1),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'cached_prompt_tokens': cached_prompt_tokens,
+            'retries': retries,
+            'cached': cached,
+            'error': error,
+        }
+        with self._lock:
+            self.records.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record) + '\n')
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def summary(self):
+        """
+        Aggregate the calls recorded in this process.
+
+        :return: Dictionary of totals plus a per-scene breakdown, keyed by scene number
+        """
+        with self._lock:
+            records = list(self.records)
+
+        live = [r for r in records if not r['cached']]
+        wall_ms = [r['wall_ms'] for r in live]
+        llm_seconds = sum(wall_ms) / 1000
+        completion_tokens = sum(r['completion_tokens'] or 0 for r in live)
+
+        scenes = {}
+        for r in records:
+            if 'scene' not in r:
+                continue
+            scene = scenes.setdefault(r['scene'], {
+                'calls': 0, 'seconds': 0.0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                'prompt_estimate': 0, 'full_prompt_estimate': 0
+            })
+            scene['calls'] += 1
+            scene['seconds'] += 0.0 if r['cached'] else r['wall_ms'] / 1000
+            scene['prompt_tokens'] += r['prompt_tokens'] or 0
+            scene['completion_tokens'] += r['completion_tokens'] or 0
+            # Estimated prompt size as sent vs. with the full previous frame (see FrameContext)
+            scene['prompt_estimate'] += r.get('prompt_estimate', 0)
+            scene['full_prompt_estimate'] += r.get('full_prompt_estimate', 0)
+
+        return {
+            'calls': len(records),
+            'cached': len(records) - len(live),
+            'errors': sum(1 for r in records if r['error']),
+            'retries': sum(r['retries'] for r in records),
+            'llm_seconds': llm_seconds,
+            'latency_p50_ms': percentile(wall_ms, 0.50),
+            'latency_p99_ms': percentile(wall_ms, 0.99),
+            'prompt_tokens': sum(r['prompt_tokens'] or 0 for r in live),
+            'completion_tokens': completion_tokens,
+            'cached_prompt_tokens': sum(r.get('cached_prompt_tokens') or 0 for r in live),
+            'prompt_estimate': sum(scene['prompt_estimate'] for scene in scenes.values()),
+            'full_prompt_estimate': sum(scene['full_prompt_estimate'] for scene in scenes.values()),
+            'completion_tokens_per_second': completion_tokens / llm_seconds if llm_seconds else 0.0,
+            'scenes': scenes,
+        }
+
+def configure_telemetry():
+    # Start a fresh recorder for this process; LLM calls are only recorded once configured
+    global _telemetry
+    if _telemetry is not None:
+        _telemetry.close()
+    _telemetry = CallTelemetry()
+    return _telemetry
+
+def get_telemetry():
+    return _telemetry
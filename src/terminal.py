@@ -0,0 +1,190 @@
+# src/terminal.py
+
+import os
+import sys
+import time
+
+CURSOR_HOME = "\x1b[H"
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_TO_END_OF_LINE = "\x1b[K"
+CLEAR_BELOW = "\x1b[J"
+ALTERNATE_SCREEN_ON = "\x1b[?1049h"
+ALTERNATE_SCREEN_OFF = "\x1b[?1049l"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+
+def enable_ansi():
+    # Windows consoles only interpret escape sequences once VT processing is switched on,
+    # which any call to system() does as a side effect
+    if os.name == 'nt':
+        os.system('')
+
+def move_to(row, col=0):
+    return f"\x1b[{row + 1};{col + 1}H"
+
+class NullOutput:
+    # Output sink that discards everything, for benchmarks and headless runs
+    @property
+    def buffer(self):
+        return self  # Takes precomposed bytes as well
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+def open_output(sink):
+    """
+    Open a playback output sink.
+
+    :param sink: 'stdout', 'null', or a file path to record the escape sequences to
+    :return: Text stream; close it when done unless it is sys.stdout
+    """
+    if sink in (None, 'stdout'):
+        return sys.stdout
+    if sink == 'null':
+        return NullOutput()
+    return open(sink, 'w', encoding='utf-8')
+
+def clear_screen(stream=None):
+    stream = stream or sys.stdout
+    stream.write(CURSOR_HOME + CLEAR_SCREEN)
+    stream.flush()
+
+def diff_rows(previous_rows, rows):
+    """
+    Build the escape sequences that turn previous_rows into rows on screen.
+
+    Unchanged rows are skipped, and a changed row is rewritten only from its first to
+    its last differing character.
+
+    :param previous_rows: List of strings currently on screen, or None to repaint everything
+    :param rows: List of strings to display
+    :return: String of output to write
+    """
+    if previous_rows is None:
+        return CURSOR_HOME + CLEAR_SCREEN + "".join(
+            move_to(index) + row for index, row in enumerate(rows)
+        )
+
+    output = []
+    for index, row in enumerate(rows):
+        previous = previous_rows[index] if index < len(previous_rows) else ""
+        if row == previous:
+            continue
+
+        start = 0
+        shortest = min(len(row), len(previous))
+        while start < shortest and row[start] == previous[start]:
+            start += 1
+
+        if len(row) == len(previous):
+            end = len(row)
+            while end > start and row[end - 1] == previous[end - 1]:
+                end -= 1
+            output.append(move_to(index, start) + row[start:end])
+        else:
+            output.append(move_to(index, start) + row[start:] + CLEAR_TO_END_OF_LINE)
+
+    if len(rows) < len(previous_rows):
+        output.append(move_to(len(rows)) + CLEAR_BELOW)
+
+    return "".join(output)
+
+class TerminalRenderer:
+    """
+    Draw frames in the terminal's alternate screen buffer, repainting only what changed.
+
+    Each frame goes out as one buffered write, with no subprocess and no full-screen clear,
+    so playback doesn't flicker and stays cheap over SSH.
+
+    :param stream: Text stream to write to (default: sys.stdout)
+    :param alternate_screen: Bool, draw in the alternate screen buffer
+    """
+
+    def __init__(self, stream=None, alternate_screen=True):
+        self.stream = stream or sys.stdout
+        self.alternate_screen = alternate_screen
+        self.bytes_written = 0
+        self.compose_seconds = 0.0
+        self.write_seconds = 0.0
+        self._rows = None
+        self._last_text = None
+        self._last_key = None
+        self._closed = True
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write(self, output):
+        start = time.perf_counter()
+        if isinstance(output, bytes):
+            # Precomposed output goes straight to the binary layer when the stream has one
+            buffer = getattr(self.stream, 'buffer', None)
+            if buffer is None:
+                output = output.decode('utf-8')
+            else:
+                self.stream.flush()
+                buffer.write(output)
+                buffer.flush()
+        if isinstance(output, str):
+            self.stream.write(output)
+            self.stream.flush()
+        self.write_seconds += time.perf_counter() - start
+        self.bytes_written += len(output)
+
+    def open(self):
+        enable_ansi()
+        self._closed = False
+        self._write((ALTERNATE_SCREEN_ON if self.alternate_screen else "") + HIDE_CURSOR + CURSOR_HOME + CLEAR_SCREEN)
+
+    def show(self, text):
+        # Repaint from scratch and leave the cursor after the text, e.g. for an input() prompt
+        self._write(CURSOR_HOME + CLEAR_SCREEN + SHOW_CURSOR + text + "\n")
+        self._rows = None
+        self._last_text = text
+        self._last_key = None
+
+    def render(self, frame):
+        start = time.perf_counter()
+        rows = frame.split("\n")
+        output = HIDE_CURSOR + diff_rows(self._rows, rows) + move_to(len(rows))
+        self.compose_seconds += time.perf_counter() - start
+        self._write(output)
+        self._rows = rows
+        self._last_text = frame
+        self._last_key = None
+
+    def render_composed(self, frame):
+        """
+        Draw a frame precomposed by compositor.FrameCompositor: its change bytes if the
+        frame it was diffed against is on screen, otherwise its full repaint.
+        """
+        change = frame.change
+        if change is not None and self._rows is not None and change[0] == self._last_key:
+            self._write(change[1])
+        else:
+            self._write(frame.full)
+        self._rows = frame.rows
+        self._last_text = frame.text
+        self._last_key = frame.key
+
+    def close(self, keep_last=True):
+        if self._closed:
+            return
+        self._closed = True
+        output = SHOW_CURSOR
+        if self.alternate_screen:
+            output += ALTERNATE_SCREEN_OFF
+            # The alternate buffer disappears on exit, so repeat the final screen on the main one
+            if keep_last and self._last_text is not None:
+                output += self._last_text + "\n"
+        self._write(output)
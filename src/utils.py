@@ -11,11 +11,35 @@ def sanitize_dirname(title):
     # Remove leading/trailing underscores and convert to lowercase
     return sanitized.strip('_').lower()
 
-def create_movie_directory(base_dir, movie_title):
+def create_movie_directory(base_dir, movie_title, unique=False):
     sanitized_title = sanitize_dirname(movie_title)
     movie_dir = os.path.join(base_dir, sanitized_title)
-    os.makedirs(movie_dir, exist_ok=True)
-    return movie_dir
+    if not unique:
+        os.makedirs(movie_dir, exist_ok=True)
+        return movie_dir
+
+    # Never reuse an existing directory: add a numeric suffix until creation succeeds,
+    # which is atomic even with several generators picking names at once
+    suffix = 1
+    while True:
+        try:
+            os.makedirs(movie_dir)
+            return movie_dir
+        except FileExistsError:
+            suffix += 1
+            movie_dir = os.path.join(base_dir, f"{sanitized_title}_{suffix}")
+
+def atomic_write(file_path, text):
+    """
+    Write a file so that readers (and a resume after a crash) see either the old content
+    or the complete new content, never a partial write.
+    """
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, file_path)
 
 def load_story(file_path):
     with open(file_path, 'r') as f:
@@ -32,6 +56,13 @@ def ensure_directory(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
 
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
 def log_progress(message):
     print(f"[PROGRESS] {message}")
 